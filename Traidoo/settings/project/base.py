@@ -5,6 +5,10 @@ import environ
 env = environ.Env()
 
 CART_LIFESPAN = 60
+CART_RELEASE_CHUNK_SIZE = 500
+REGION_CACHE_TTL = env("REGION_CACHE_TTL", default=60, cast=int)
+# Seconds between two log lines of the counters of a process
+METRICS_LOG_INTERVAL = env("METRICS_LOG_INTERVAL", default=300, cast=int)
 UNVERIFIED_USER_LIFE_HOURS = 72
 EARLIEST_DELIVERY_DATE_DAYS_RANGE = (1, 14)
 NON_COOPERATIVE_MEMBERS_PLATFORM_FEE = Decimal(
@@ -1 +1,13 @@
+import environ
+
+env = environ.Env()
+
 DOCUMENTS_EXPIRATION_TIME = 1
+# Seconds before expiry after which a signed URL is no longer handed out
+DOCUMENTS_SIGNED_URL_MARGIN = 10
+DOCUMENTS_SIGNED_URL_CACHE_SIZE = 1024
+DOCUMENTS_STREAM_CHUNK_SIZE = 256 * 1024
+DOCUMENTS_RENDER_WORKERS = env("DOCUMENTS_RENDER_WORKERS", default=8, cast=int)
+DOCUMENTS_RENDER_ATTEMPTS = 3
+# Milliseconds, doubled after every failed attempt
+DOCUMENTS_RENDER_RETRY_WAIT = 1000
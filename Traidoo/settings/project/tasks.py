@@ -0,0 +1,7 @@
+import environ
+
+env = environ.Env()
+
+# `core.tasks.backends.LocalTasksBackend` runs tasks in the current process
+TASKS_BACKEND = env("TASKS_BACKEND", default="core.tasks.backends.CloudTasksBackend")
+TASKS_SEND_WORKERS = env("TASKS_SEND_WORKERS", default=8, cast=int)
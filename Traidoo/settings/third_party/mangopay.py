@@ -4,3 +4,21 @@ env = environ.Env()
 
 MANGOPAY_URL = env("MANGOPAY_URL")
 MANGOPAY_CLIENT_ID = env("MANGOPAY_CLIENT_ID")
+MANGOPAY_POOL_SIZE = env.int("MANGOPAY_POOL_SIZE", default=10)
+# Seconds to connect and to wait for a response
+MANGOPAY_CONNECT_TIMEOUT = env.float("MANGOPAY_CONNECT_TIMEOUT", default=5)
+MANGOPAY_READ_TIMEOUT = env.float("MANGOPAY_READ_TIMEOUT", default=60)
+# Retries of failed connections, e.g. keep-alive connections closed by Mangopay
+MANGOPAY_RETRIES = env.int("MANGOPAY_RETRIES", default=2)
+# Seconds after which a webhook event still being processed is considered
+# abandoned and may be processed again
+MANGOPAY_WEBHOOK_PROCESSING_TIMEOUT = env.int(
+    "MANGOPAY_WEBHOOK_PROCESSING_TIMEOUT", default=600
+)
+# Mangopay requests issued at the same time by a payout batch, should not be
+# more than MANGOPAY_POOL_SIZE
+MANGOPAY_PAYOUT_WORKERS = env.int("MANGOPAY_PAYOUT_WORKERS", default=4)
+# Seconds after which a webhook event not processed yet is enqueued again
+MANGOPAY_WEBHOOK_PENDING_TIMEOUT = env.int(
+    "MANGOPAY_WEBHOOK_PENDING_TIMEOUT", default=300
+)
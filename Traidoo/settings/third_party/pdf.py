@@ -4,3 +4,12 @@ env = environ.Env()
 
 
 HTML2PDF_BACKEND = env("HTML2PDF_BACKEND")
+HTML2PDF_POOL_SIZE = env.int("HTML2PDF_POOL_SIZE", default=10)
+# Seconds to connect and to wait for the rendered PDF
+HTML2PDF_CONNECT_TIMEOUT = env.float("HTML2PDF_CONNECT_TIMEOUT", default=5)
+HTML2PDF_READ_TIMEOUT = env.float("HTML2PDF_READ_TIMEOUT", default=120)
+# Retries of failed connections, e.g. keep-alive connections closed by the
+# backend. Error responses are retried by the documents task.
+HTML2PDF_RETRIES = env.int("HTML2PDF_RETRIES", default=2)
+# Number of rendered HTML hashes remembered with the blob of their PDF
+HTML2PDF_CACHE_SIZE = env.int("HTML2PDF_CACHE_SIZE", default=1024)
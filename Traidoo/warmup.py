@@ -2,8 +2,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from documents.jinja2_utils import warmup_templates
+
 
 @api_view(["GET"])
 @permission_classes((AllowAny,))
 def warmup(request):
+    warmup_templates()
     return Response({"message": "Ready!"})
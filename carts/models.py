@@ -7,11 +7,11 @@ from django.utils.functional import cached_property
 
 from core.calculators.item_calculator import ItemCalculatorMixin
 from core.calculators.order_calculator import OrderCalculatorMixin
-from core.calculators.utils import round_float
+from core.calculators.value import sum_net_cents
 from core.db.base import BaseAbstractModel
 from delivery_addresses.models import DeliveryAddress
 from delivery_options.models import DeliveryOption
-from items.models import Item
+from items.models import Item, ProductAvailability
 from products.models import Product
 from django.utils.translation import gettext_lazy as _
 
@@ -70,14 +70,16 @@ class Cart(OrderCalculatorMixin, BaseAbstractModel):
     def buyer_region_settings(self):
         return self.user.region.setting
 
-    @property
+    @cached_property
     def total_price_central_delivery(self) -> Decimal:
-        prices = []
-        for item in self.cart_items:
-            if item.is_central_logistic_delivery:
-                prices.append(item.price.netto)
-
-        return round_float(sum(prices))
+        return (
+            sum_net_cents(
+                item.price
+                for item in self.cart_items
+                if item.is_central_logistic_delivery
+            )
+            / 100
+        )
 
     class Meta:
         verbose_name = _("Cart")
@@ -120,6 +122,8 @@ class CartItem(ItemCalculatorMixin, BaseAbstractModel):
                 latest_delivery_date=latest_delivery_date or self.latest_delivery_date,
                 quantity=quantity or self.quantity,
             )
+        else:
+            ProductAvailability.refresh([product_id or self.product.id])
 
     @cached_property
     def setting(self):
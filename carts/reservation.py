@@ -0,0 +1,237 @@
+import datetime
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from carts.models import Cart, CartItem
+from items.models import Item, ProductAvailability
+from products.models import Product
+
+StockKey = Tuple[int, datetime.date]
+
+
+def return_to_stock(quantities: Dict[StockKey, int]):
+    """
+    Adds quantities back to product items with a single upsert, creating
+    product items which no longer exist.
+
+    `quantities` maps `(product_id, latest_delivery_date)` to a quantity.
+    """
+    quantities = {key: quantity for key, quantity in quantities.items() if quantity}
+
+    if not quantities:
+        return
+
+    table = connection.ops.quote_name(Item._meta.db_table)
+    now = timezone.now()
+    params = []
+
+    for (product_id, latest_delivery_date), quantity in quantities.items():
+        params += [product_id, latest_delivery_date, quantity, now, now]
+
+    values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(quantities))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} "
+            f"(product_id, latest_delivery_date, quantity, created_at, updated_at) "
+            f"VALUES {values} "
+            f"ON CONFLICT (product_id, latest_delivery_date) DO UPDATE SET "
+            f"quantity = {table}.quantity + EXCLUDED.quantity, "
+            f"updated_at = EXCLUDED.updated_at",
+            params,
+        )
+
+    ProductAvailability.refresh(product_id for product_id, _ in quantities)
+
+
+def _lock_carts(cart_ids):
+    """
+    Locks the carts until the end of the transaction, so they are not
+    released as expired while their items change.
+    """
+    list(Cart.objects.select_for_update().filter(id__in=cart_ids).values_list("id"))
+
+
+def reserve(cart: Cart, product: Product, quantity: int) -> int:
+    """
+    Moves up to `quantity` units of the product from its product items to the
+    cart, earliest delivery dates first. Returns the quantity which is not
+    available.
+
+    Product items are locked while reserving, so concurrent buyers cannot
+    take the same units.
+    """
+    with transaction.atomic():
+        _lock_carts([cart.id])
+        product_items = Item.objects.select_for_update().filter(
+            product=product,
+            quantity__gt=0,
+            latest_delivery_date__gt=datetime.datetime.utcnow().date(),
+        )
+
+        reserved = {}
+        emptied = []
+        remaining = None
+
+        for product_item in product_items.order_by("latest_delivery_date"):
+            if quantity == 0:
+                break
+
+            item_quantity = min(quantity, product_item.quantity)
+            reserved[product_item.latest_delivery_date] = item_quantity
+            quantity -= item_quantity
+
+            if item_quantity == product_item.quantity:
+                emptied.append(product_item.id)
+            else:
+                remaining = (product_item.id, product_item.quantity - item_quantity)
+
+        if not reserved:
+            return quantity
+
+        if emptied:
+            Item.objects.filter(id__in=emptied).delete()
+
+        if remaining:
+            Item.objects.filter(id=remaining[0]).update(
+                quantity=remaining[1], updated_at=timezone.now()
+            )
+
+        ProductAvailability.refresh([product.id])
+        _add_to_cart(cart, product, reserved)
+
+    return quantity
+
+
+def _add_to_cart(cart: Cart, product: Product, quantities: Dict[datetime.date, int]):
+    cart_items = CartItem.objects.filter(
+        cart=cart, product=product, latest_delivery_date__in=quantities
+    )
+    existing = {cart_item.latest_delivery_date: cart_item for cart_item in cart_items}
+
+    now = timezone.now()
+    for latest_delivery_date, cart_item in existing.items():
+        cart_item.quantity += quantities[latest_delivery_date]
+        cart_item.updated_at = now
+
+    if existing:
+        CartItem.objects.bulk_update(existing.values(), ["quantity", "updated_at"])
+
+    new_dates = [date for date in quantities if date not in existing]
+
+    if new_dates:
+        delivery_option = product.first_available_delivery_option()
+        CartItem.objects.bulk_create(
+            CartItem(
+                cart=cart,
+                product=product,
+                latest_delivery_date=latest_delivery_date,
+                quantity=quantities[latest_delivery_date],
+                delivery_option=delivery_option,
+            )
+            for latest_delivery_date in new_dates
+        )
+
+
+def release(cart: Cart, product: Product, quantity: int) -> int:
+    """
+    Moves up to `quantity` units of the product from the cart back to its
+    product items, latest delivery dates first. Returns the quantity which
+    was not in the cart.
+    """
+    with transaction.atomic():
+        _lock_carts([cart.id])
+        cart_items = CartItem.objects.select_for_update().filter(
+            cart=cart, product=product
+        )
+
+        released = {}
+        emptied = []
+        updated = []
+        now = timezone.now()
+
+        for cart_item in cart_items.order_by("-latest_delivery_date"):
+            if quantity == 0:
+                break
+
+            quantity_to_release = min(quantity, cart_item.quantity)
+            released[(product.id, cart_item.latest_delivery_date)] = quantity_to_release
+            quantity -= quantity_to_release
+            cart_item.quantity -= quantity_to_release
+
+            if cart_item.quantity == 0:
+                emptied.append(cart_item.id)
+            else:
+                cart_item.updated_at = now
+                updated.append(cart_item)
+
+        if emptied:
+            CartItem.objects.filter(id__in=emptied).delete()
+
+        if updated:
+            CartItem.objects.bulk_update(updated, ["quantity", "updated_at"])
+
+        return_to_stock(released)
+
+    return quantity
+
+
+def release_cart_items(cart_items):
+    """
+    Returns the quantities of the given cart items to stock and deletes them.
+    """
+    with transaction.atomic():
+        _lock_carts(cart_items.values("cart_id"))
+        released = {}
+
+        for product_id, latest_delivery_date, quantity in cart_items.values_list(
+            "product_id", "latest_delivery_date", "quantity"
+        ):
+            key = (product_id, latest_delivery_date)
+            released[key] = released.get(key, 0) + quantity
+
+        return_to_stock(released)
+        cart_items.delete()
+
+
+def release_expired_carts(updated_before: datetime.datetime) -> Dict[str, int]:
+    """
+    Returns the stock of all carts not updated since `updated_before` and
+    deletes them, `CART_RELEASE_CHUNK_SIZE` carts at a time. Carts whose
+    items are being reserved or released are locked, see `_lock_carts`; they
+    are skipped and expire on the next run.
+    """
+    released_carts = 0
+    released_units = 0
+
+    while True:
+        with transaction.atomic():
+            cart_ids = list(
+                Cart.objects.select_for_update(skip_locked=True)
+                .filter(updated_at__lt=updated_before)
+                .order_by("id")
+                .values_list("id", flat=True)[: settings.CART_RELEASE_CHUNK_SIZE]
+            )
+
+            if not cart_ids:
+                break
+
+            quantities = {
+                (row["product_id"], row["latest_delivery_date"]): row["quantity"]
+                for row in CartItem.objects.filter(cart_id__in=cart_ids)
+                .order_by()
+                .values("product_id", "latest_delivery_date")
+                .annotate(quantity=Sum("quantity"))
+            }
+
+            return_to_stock(quantities)
+            Cart.objects.filter(id__in=cart_ids).delete()
+
+        released_carts += len(cart_ids)
+        released_units += sum(quantities.values())
+
+    return {"carts": released_carts, "units": released_units}
@@ -1,4 +1,5 @@
 import datetime
+from unittest import mock
 
 import pytest
 from django.conf import settings
@@ -6,6 +7,7 @@ from django.utils import timezone
 from freezegun import freeze_time
 from model_bakery import baker
 
+from carts import reservation
 from carts.models import Cart, CartItem
 from items.models import Item
 
@@ -71,3 +73,72 @@ def test_delete_inactive_carts(
 
     assert not Cart.objects.all()
     assert not CartItem.objects.all()
+
+
+@pytest.mark.django_db
+def test_delete_inactive_carts_in_chunks(client_anonymous, products, settings):
+    settings.CART_RELEASE_CHUNK_SIZE = 2
+    latest_delivery_date = datetime.date.today() + datetime.timedelta(days=3)
+    baker.make(
+        Item, product=products[0], latest_delivery_date=latest_delivery_date, quantity=1
+    )
+
+    for _ in range(5):
+        cart = baker.make(Cart, user=baker.make_recipe("users.user"))
+        baker.make(
+            CartItem,
+            cart=cart,
+            product=products[0],
+            latest_delivery_date=latest_delivery_date,
+            quantity=2,
+        )
+
+    updated_at = timezone.now() + datetime.timedelta(minutes=settings.CART_LIFESPAN + 1)
+    active_cart = baker.make(Cart, user=baker.make_recipe("users.user"))
+    Cart.objects.filter(id=active_cart.id).update(updated_at=updated_at)
+
+    with freeze_time(updated_at):
+        response = client_anonymous.get(
+            "/carts/cron/delete-inactive-carts", **{"HTTP_X_APPENGINE_CRON": True}
+        )
+
+    assert response.json() == {"carts": 5, "units": 10}
+    assert Item.objects.get(product=products[0]).quantity == 11
+    assert list(Cart.objects.all()) == [active_cart]
+    assert not CartItem.objects.exists()
+
+
+def test_keep_released_chunks_when_a_later_chunk_fails(
+    transactional_db, client_anonymous, products, settings
+):
+    settings.CART_RELEASE_CHUNK_SIZE = 2
+    latest_delivery_date = datetime.date.today() + datetime.timedelta(days=3)
+    carts = [baker.make(Cart, user=baker.make_recipe("users.user")) for _ in range(4)]
+    for cart in carts:
+        baker.make(
+            CartItem,
+            cart=cart,
+            product=products[0],
+            latest_delivery_date=latest_delivery_date,
+            quantity=1,
+        )
+
+    updated_at = timezone.now() + datetime.timedelta(minutes=settings.CART_LIFESPAN + 1)
+
+    return_to_stock = reservation.return_to_stock
+
+    def fail_in_second_chunk(quantities):
+        if Cart.objects.count() < len(carts):
+            raise RuntimeError("Boom")
+        return_to_stock(quantities)
+
+    with freeze_time(updated_at), mock.patch.object(
+        reservation, "return_to_stock", side_effect=fail_in_second_chunk
+    ):
+        with pytest.raises(RuntimeError):
+            client_anonymous.get(
+                "/carts/cron/delete-inactive-carts", **{"HTTP_X_APPENGINE_CRON": True}
+            )
+
+    assert list(Cart.objects.order_by("id")) == carts[2:]
+    assert Item.objects.get(product=products[0]).quantity == 2
@@ -0,0 +1,204 @@
+import datetime
+import threading
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+
+from carts import reservation
+from carts.models import Cart, CartItem
+from carts.reservation import (
+    release,
+    release_expired_carts,
+    reserve,
+    return_to_stock,
+)
+from items.models import Item
+
+pytestmark = pytest.mark.django_db
+
+
+def _date(days):
+    return datetime.date.today() + datetime.timedelta(days=days)
+
+
+@pytest.fixture
+def product(traidoo_region):
+    return baker.make_recipe("products.product")
+
+
+@pytest.fixture
+def cart(buyer):
+    return baker.make_recipe("carts.cart", user=buyer)
+
+
+def test_reserve_earliest_delivery_dates_first(cart, product):
+    baker.make_recipe(
+        "items.item", product=product, quantity=3, latest_delivery_date=_date(3)
+    )
+    baker.make_recipe(
+        "items.item", product=product, quantity=2, latest_delivery_date=_date(2)
+    )
+    baker.make_recipe(
+        "items.item", product=product, quantity=5, latest_delivery_date=_date(-1)
+    )
+
+    assert reserve(cart, product, 4) == 0
+
+    assert not Item.objects.filter(latest_delivery_date=_date(2)).exists()
+    assert Item.objects.get(latest_delivery_date=_date(3)).quantity == 1
+    assert Item.objects.get(latest_delivery_date=_date(-1)).quantity == 5
+    assert dict(CartItem.objects.values_list("latest_delivery_date", "quantity")) == {
+        _date(2): 2,
+        _date(3): 2,
+    }
+
+
+def test_reserve_returns_not_available_quantity(cart, product):
+    baker.make_recipe(
+        "items.item", product=product, quantity=3, latest_delivery_date=_date(2)
+    )
+    baker.make_recipe(
+        "carts.cartitem",
+        cart=cart,
+        product=product,
+        quantity=1,
+        latest_delivery_date=_date(2),
+    )
+
+    assert reserve(cart, product, 5) == 2
+
+    assert not Item.objects.exists()
+    assert CartItem.objects.get().quantity == 4
+
+
+def test_reserve_without_stock(cart, product):
+    assert reserve(cart, product, 5) == 5
+    assert not CartItem.objects.exists()
+
+
+def test_reserve_with_constant_queries(cart, product):
+    query_counts = []
+
+    for days in (10, 20):
+        for day in range(days):
+            baker.make_recipe(
+                "items.item",
+                product=product,
+                quantity=2,
+                latest_delivery_date=_date(day + 1),
+            )
+
+        # Deleting an emptied item refreshes the availability of its product,
+        # so both runs empty the same number of items
+        with CaptureQueriesContext(connection) as context:
+            reserve(cart, product, 3)
+        query_counts.append(len(context.captured_queries))
+
+        Item.objects.all().delete()
+        CartItem.objects.all().delete()
+
+    assert query_counts[0] == query_counts[1]
+
+
+def test_release_latest_delivery_dates_first(cart, product):
+    baker.make_recipe(
+        "carts.cartitem",
+        cart=cart,
+        product=product,
+        quantity=2,
+        latest_delivery_date=_date(2),
+    )
+    baker.make_recipe(
+        "carts.cartitem",
+        cart=cart,
+        product=product,
+        quantity=2,
+        latest_delivery_date=_date(3),
+    )
+    baker.make_recipe(
+        "items.item", product=product, quantity=1, latest_delivery_date=_date(3)
+    )
+
+    assert release(cart, product, 3) == 0
+
+    assert dict(Item.objects.values_list("latest_delivery_date", "quantity")) == {
+        _date(2): 1,
+        _date(3): 3,
+    }
+    assert dict(CartItem.objects.values_list("latest_delivery_date", "quantity")) == {
+        _date(2): 1
+    }
+
+
+def test_release_returns_quantity_not_in_cart(cart, product):
+    baker.make_recipe(
+        "carts.cartitem",
+        cart=cart,
+        product=product,
+        quantity=2,
+        latest_delivery_date=_date(2),
+    )
+
+    assert release(cart, product, 5) == 3
+
+    assert not CartItem.objects.exists()
+    assert Item.objects.get().quantity == 2
+
+
+def test_return_to_stock_with_a_single_upsert(product):
+    baker.make_recipe(
+        "items.item", product=product, quantity=1, latest_delivery_date=_date(2)
+    )
+
+    with CaptureQueriesContext(connection) as context:
+        return_to_stock({(product.id, _date(2)): 2, (product.id, _date(3)): 4})
+
+    # The upsert and the availability refresh
+    assert len(context.captured_queries) == 2
+    assert dict(Item.objects.values_list("latest_delivery_date", "quantity")) == {
+        _date(2): 3,
+        _date(3): 4,
+    }
+
+
+def test_do_not_release_cart_while_reserving(transactional_db, cart, product):
+    baker.make_recipe(
+        "items.item", product=product, quantity=5, latest_delivery_date=_date(1)
+    )
+    adding = threading.Event()
+    released = threading.Event()
+    add_to_cart = reservation._add_to_cart
+
+    def add_to_cart_after_release(*args):
+        adding.set()
+        released.wait(5)
+        add_to_cart(*args)
+
+    def reserve_in_thread():
+        try:
+            reserve(cart, product, 2)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=reserve_in_thread)
+
+    with mock.patch.object(reservation, "_add_to_cart", add_to_cart_after_release):
+        thread.start()
+        assert adding.wait(5)
+        expired = release_expired_carts(timezone.now() + datetime.timedelta(days=1))
+        released.set()
+        thread.join()
+
+    assert expired == {"carts": 0, "units": 0}
+    assert CartItem.objects.get(cart=cart).quantity == 2
+
+    assert release_expired_carts(timezone.now() + datetime.timedelta(days=1)) == {
+        "carts": 1,
+        "units": 2,
+    }
+    assert not Cart.objects.exists()
+    assert Item.objects.get(product=product).quantity == 5
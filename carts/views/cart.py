@@ -1,6 +1,6 @@
 import datetime
 
-from django.db.models import F, Sum, Window, OuterRef, Value, Subquery, Q
+from django.db.models import F, Sum, Window
 from django.db.models.functions import Coalesce
 from rest_framework import status
 from rest_framework.request import Request
@@ -8,9 +8,10 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from carts.models import Cart, CartItem
+from carts.reservation import release, release_cart_items, reserve
 from core.permissions.buyer_or_seller import IsBuyerOrSellerUser
 from delivery_addresses.models import DeliveryAddress
-from items.models import Item
+from items.models import available_quantity
 from products.models import Product
 
 from ..serializers import (
@@ -25,75 +26,10 @@ class CartView(APIView):
     permission_classes = [IsBuyerOrSellerUser]
 
     def _add(self, cart: Cart, product: Product, quantity: int):
-        for product_item in product.items.filter(
-            quantity__gt=0, latest_delivery_date__gt=datetime.datetime.utcnow().date()
-        ).order_by("latest_delivery_date"):
-            item_quantity = (
-                quantity if quantity <= product_item.quantity else product_item.quantity
-            )
-
-            cart_item, created = CartItem.objects.get_or_create(
-                cart=cart,
-                product=product,
-                latest_delivery_date=product_item.latest_delivery_date,
-                defaults={
-                    "quantity": item_quantity,
-                    "delivery_option": product.first_available_delivery_option(),
-                },
-            )
-
-            if not created:
-                cart_item.quantity += item_quantity
-                cart_item.save()
-
-            product_item.quantity -= item_quantity
-
-            if product_item.quantity == 0:
-                product_item.delete()
-            else:
-                product_item.save()
-
-            quantity -= item_quantity
-
-            if quantity == 0:
-                break
-
-        # TODO: bulk save?
-
-        return quantity
+        return reserve(cart, product, quantity)
 
     def _remove(self, cart: Cart, product: Product, quantity: int):
-        cart_items = CartItem.objects.filter(cart=cart, product=product).order_by(
-            "-latest_delivery_date"
-        )
-
-        for cart_item in cart_items:
-            quantity_to_release = (
-                quantity if cart_item.quantity >= quantity else cart_item.quantity
-            )
-
-            product_item, created = Item.objects.get_or_create(
-                product=product,
-                latest_delivery_date=cart_item.latest_delivery_date,
-                defaults={"quantity": quantity_to_release},
-            )
-
-            if not created:
-                product_item.quantity += quantity_to_release
-                product_item.save()
-
-            quantity -= quantity_to_release
-            cart_item.quantity -= quantity_to_release
-
-            if cart_item.quantity == 0:
-                cart_item.delete()
-            else:
-                cart_item.save()
-
-            if quantity == 0:
-                break
-
-        return quantity
+        return release(cart, product, quantity)
 
     def get(self, request: Request, format: str = None):
         try:
@@ -101,19 +37,6 @@ class CartView(APIView):
         except Cart.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        utcnow = datetime.datetime.utcnow().date()
-
-        subquery_items = (
-            Item.objects.filter(product_id=OuterRef("product_id"))
-            .order_by()
-            .values("product")
-        )
-        subquery_quantity = subquery_items.annotate(
-            total=Coalesce(
-                Sum("quantity", filter=Q(latest_delivery_date__gt=utcnow)), Value(0)
-            )
-        ).values("total")
-
         items = (
             cart.items.annotate(
                 total_quantity=Window(
@@ -121,7 +44,7 @@ class CartView(APIView):
                     expression=Sum("quantity"),
                 )
             )
-            .annotate(items_available=Subquery(subquery_quantity))
+            .annotate(items_available=available_quantity("product"))
             .order_by("product", "created_at")
             .distinct("product")
         )
@@ -193,18 +116,7 @@ class CartView(APIView):
         else:
             cart_items = CartItem.objects.filter(cart=cart)
 
-        for cart_item in cart_items:
-            product_item, created = Item.objects.get_or_create(
-                product=cart_item.product,
-                latest_delivery_date=cart_item.latest_delivery_date,
-                defaults={"quantity": cart_item.quantity},
-            )
-
-            if not created:
-                product_item.quantity += cart_item.quantity
-                product_item.save()
-
-        cart_items.delete()
+        release_cart_items(cart_items)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -1,16 +1,20 @@
 import datetime
 
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from rest_framework import status, views
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from core.permissions.cron import IsCron
 
-from ..models import Cart
+from ..reservation import release_expired_carts
 
 
+# Every chunk of carts is committed on its own
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
 class DeleteInactiveCartsView(views.APIView):
     permission_classes = (AllowAny, IsCron)
 
@@ -20,9 +24,4 @@ class DeleteInactiveCartsView(views.APIView):
 
     @classmethod
     def get(cls, request, format=None):
-        carts = Cart.objects.filter(updated_at__lt=cls.get_latest_update_time())
-        for cart in carts:
-            for item in cart.items.all():
-                item.release_product_item()
-            cart.delete()
-        return Response()
+        return Response(release_expired_carts(cls.get_latest_update_time()))
@@ -0,0 +1,74 @@
+# Generated by Django 2.2.15 on 2026-10-18 14:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_category_ancestors(apps, schema_editor):
+    Category = apps.get_model("categories", "Category")
+    CategoryAncestor = apps.get_model("categories", "CategoryAncestor")
+    parents = dict(Category.objects.values_list("id", "parent_id"))
+    rows = []
+
+    for category_id in parents:
+        ancestor_id = category_id
+        depth = 0
+        while ancestor_id is not None and depth <= len(parents):
+            rows.append(
+                CategoryAncestor(
+                    category_id=category_id, ancestor_id=ancestor_id, depth=depth
+                )
+            )
+            ancestor_id = parents.get(ancestor_id)
+            depth += 1
+
+    CategoryAncestor.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0010_auto_20200806_1109"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryAncestor",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("depth", models.PositiveIntegerField(verbose_name="Depth")),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendants",
+                        to="categories.Category",
+                        verbose_name="Ancestor",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestors",
+                        to="categories.Category",
+                        verbose_name="Category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Category ancestor",
+                "verbose_name_plural": "Category ancestors",
+                "unique_together": {("category", "ancestor")},
+            },
+        ),
+        migrations.RunPython(build_category_ancestors, migrations.RunPython.noop),
+    ]
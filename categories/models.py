@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from core.db.base import BaseAbstractModel
@@ -37,3 +39,56 @@ class Category(BaseAbstractModel):
     class Meta:
         verbose_name = _("Category")
         verbose_name_plural = _("Categories")
+
+
+class CategoryAncestor(models.Model):
+    """
+    Closure table of the category tree with one row for every category and
+    each of its ancestors, including the category itself at depth 0.
+
+    Rebuilt whenever a category is saved or deleted.
+    """
+
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="ancestors",
+        verbose_name=_("Category"),
+    )
+    ancestor = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="descendants",
+        verbose_name=_("Ancestor"),
+    )
+    depth = models.PositiveIntegerField(verbose_name=_("Depth"))
+
+    class Meta:
+        unique_together = (("category", "ancestor"),)
+        verbose_name = _("Category ancestor")
+        verbose_name_plural = _("Category ancestors")
+
+    @classmethod
+    def rebuild(cls):
+        parents = dict(Category.objects.values_list("id", "parent_id"))
+        rows = []
+
+        for category_id in parents:
+            ancestor_id = category_id
+            depth = 0
+            # A broken tree must not loop forever
+            while ancestor_id is not None and depth <= len(parents):
+                rows.append(
+                    cls(category_id=category_id, ancestor_id=ancestor_id, depth=depth)
+                )
+                ancestor_id = parents.get(ancestor_id)
+                depth += 1
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def rebuild_category_ancestors(sender, **kwargs):
+    CategoryAncestor.rebuild()
@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+from model_bakery import baker
+
+from categories.models import CategoryAncestor
+from items.models import Item
+from products.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+def _ancestors(category):
+    return list(
+        CategoryAncestor.objects.filter(category=category)
+        .order_by("depth")
+        .values_list("ancestor_id", flat=True)
+    )
+
+
+def _category_chain(length):
+    categories = [baker.make_recipe("categories.category")]
+    for _ in range(length - 1):
+        categories.append(
+            baker.make_recipe("categories.category", parent=categories[-1])
+        )
+    return categories
+
+
+def test_ancestors_follow_category_changes():
+    root, child, grandchild = _category_chain(3)
+    other_root = baker.make_recipe("categories.category")
+
+    assert _ancestors(grandchild) == [grandchild.id, child.id, root.id]
+
+    child.parent = other_root
+    child.save()
+    assert _ancestors(grandchild) == [grandchild.id, child.id, other_root.id]
+
+    child.delete()
+    assert not CategoryAncestor.objects.filter(category=grandchild).exists()
+    assert _ancestors(root) == [root.id]
+
+
+def test_products_of_deeply_nested_categories(client_anonymous, traidoo_region):
+    categories = _category_chain(6)
+    product = baker.make(Product, category=categories[-1], region=traidoo_region)
+    baker.make(Product, region=traidoo_region)
+
+    response = client_anonymous.get(f"/products?category__id={categories[0].id}")
+
+    assert [product["id"] for product in response.json()["results"]] == [product.id]
+
+
+def test_categories_of_deeply_nested_products(client_anonymous, traidoo_region):
+    categories = _category_chain(6)
+    baker.make_recipe("categories.category")
+    product = baker.make(Product, category=categories[-1], region=traidoo_region)
+    tomorrow = datetime.datetime.utcnow().date() + datetime.timedelta(days=1)
+    baker.make(Item, product=product, quantity=5, latest_delivery_date=tomorrow)
+
+    response = client_anonymous.get("/categories?has_products=true")
+
+    assert sorted(category["id"] for category in response.json()) == [
+        category.id for category in categories
+    ]
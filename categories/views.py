@@ -1,12 +1,11 @@
 import datetime
 
-from django.db.models import Q
 from django.db.models.deletion import ProtectedError
 from rest_framework import viewsets
 from rest_framework.fields import BooleanField
 from rest_framework.permissions import AllowAny
 
-from categories.models import Category
+from categories.models import Category, CategoryAncestor
 from categories.serializers import CategorySerializer
 from core.errors.exceptions import ProtectedEntityException
 from core.permissions.admin import IsAdminUser
@@ -44,38 +43,11 @@ class CategoryViewSet(GetPermissionsMixin, viewsets.ModelViewSet):
         ):
             queryset = Category.objects.all()
         else:
-            queryset = (
-                Category.objects.select_related()
-                .filter(
-                    (
-                        Q(product__items__quantity__gte=1)
-                        & Q(
-                            product__items__latest_delivery_date__gt=datetime.datetime.utcnow().date()
-                        )
-                    )
-                    | (
-                        Q(subcategories__product__items__quantity__gte=1)
-                        & Q(
-                            subcategories__product__items__latest_delivery_date__gt=datetime.datetime.utcnow().date()
-                        )
-                    )
-                    | (
-                        Q(subcategories__subcategories__product__items__quantity__gte=1)
-                        & Q(
-                            subcategories__subcategories__product__items__latest_delivery_date__gt=datetime.datetime.utcnow().date()
-                        )
-                    )
-                    | (
-                        Q(
-                            subcategories__subcategories__subcategories__product__items__quantity__gte=1
-                        )
-                        & Q(
-                            subcategories__subcategories__subcategories__product__items__latest_delivery_date__gt=datetime.datetime.utcnow().date()
-                        )
-                    )
-                )
-                .distinct()
-            )
+            categories_with_products = CategoryAncestor.objects.filter(
+                category__product__items__quantity__gte=1,
+                category__product__items__latest_delivery_date__gt=datetime.datetime.utcnow().date(),
+            ).values("ancestor_id")
+            queryset = Category.objects.filter(id__in=categories_with_products)
 
         return queryset
 
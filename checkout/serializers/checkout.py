@@ -1,4 +1,3 @@
-import itertools
 from decimal import Decimal
 from payments.calculations.delivery_options import calculate_delivery_options_prices
 from typing import Dict, List, Union
@@ -8,7 +7,7 @@ from rest_framework import serializers
 from carts.models import Cart, CartItem
 from core.calculators.order_calculator import OrderCalculatorMixin
 from core.calculators.utils import round_float
-from core.calculators.value import Value
+from core.calculators.value import group_by_vat
 from delivery_options.serializers import DeliveryOptionSerializer
 from products.models import Product
 from products.serializers import ProductSerializer
@@ -155,17 +154,12 @@ class CartSerializer(OrderCalculatorMixin, serializers.ModelSerializer):
             items_values.append(cart_item._delivery_fee())
             items_values.append(cart_item.buyer_platform_fee)
             items_values.append(cart_item.container_deposit)
-        items_values = sorted(items_values, key=lambda item: item.vat_rate)
+        values_by_vat_rate = group_by_vat(items_values)
         vat_mounts_by_rates = {}
-        for vat_rate, items_for_vat_rate in itertools.groupby(
-            items_values, lambda item: item.vat_rate
-        ):
-            sum_net_value = sum(value.netto for value in items_for_vat_rate)
-            total_value = Value(sum_net_value, vat_rate)
-            vat_mounts_by_rates[float(vat_rate)] = total_value.vat
-
-        total_vat_amount = sum(list(vat_mounts_by_rates.values()))
-        total_vat_amount = round_float(total_vat_amount)
+        for vat_rate in sorted(values_by_vat_rate):
+            vat_mounts_by_rates[float(vat_rate)] = values_by_vat_rate[vat_rate].vat
+
+        total_vat_amount = round_float(sum(list(vat_mounts_by_rates.values())))
 
         return vat_mounts_by_rates, total_vat_amount
 
@@ -0,0 +1,79 @@
+"""
+Query count and latency of the checkout for carts of different sizes.
+Not collected by default, run with:
+
+    pytest checkout/tests/benchmark_checkout.py -s
+"""
+import datetime
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from orders.models import Order
+
+pytestmark = pytest.mark.django_db
+
+SELLERS = 10
+
+
+@pytest.fixture
+def make_cart(buyer, traidoo_region, delivery_address, delivery_options, categories):
+    def make_cart(lines):
+        sellers = baker.make_recipe(
+            "users.user", region=traidoo_region, _quantity=SELLERS
+        )
+        container = baker.make("containers.container", deposit=3.2)
+        cart = baker.make(
+            "carts.cart",
+            user=buyer,
+            delivery_address=delivery_address,
+            earliest_delivery_date=datetime.date.today() + datetime.timedelta(days=2),
+        )
+
+        for line in range(lines):
+            product = baker.make(
+                "products.product",
+                seller=sellers[line % SELLERS],
+                region=traidoo_region,
+                category=categories[line % 2],
+                container_type=container,
+                price=10 + line % 7,
+                amount=1,
+                vat=[7, 19][line % 2],
+                delivery_charge=1,
+                delivery_options=delivery_options,
+            )
+            baker.make(
+                "carts.cartitem",
+                cart=cart,
+                product=product,
+                quantity=1 + line % 3,
+                delivery_option=delivery_options[line % 2],
+                latest_delivery_date=datetime.date.today()
+                + datetime.timedelta(days=5),
+            )
+
+        return cart
+
+    return make_cart
+
+
+@pytest.mark.parametrize("lines", [10, 100, 500])
+def test_benchmark_checkout(client_buyer, make_cart, lines):
+    make_cart(lines)
+
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = client_buyer.post("/checkout")
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert Order.objects.get().items.count() == lines
+
+    print(
+        f"\ncheckout of {lines} lines: {len(context.captured_queries)} queries, "
+        f"{elapsed * 1000:.0f} ms"
+    )
@@ -0,0 +1,64 @@
+from typing import List
+
+from carts.models import Cart
+from core.calculators.value import cents_to_decimal
+from orders.calculation import OrderCalculation
+from orders.models import Order, OrderItem
+from products.models import Product
+
+
+def load_products(product_ids) -> List[Product]:
+    """Loads products with everything their snapshots and fees need"""
+    return list(
+        Product.objects.filter(id__in=product_ids)
+        .select_related(
+            "seller", "container_type", "category__icon", "category__parent"
+        )
+        .prefetch_related(
+            "region",
+            "regions",
+            "delivery_options",
+            "seller__groups",
+            "seller__user_permissions",
+            "seller__region__settings",
+        )
+    )
+
+
+def create_order_items(order: Order, cart: Cart) -> List[OrderItem]:
+    """
+    Turns cart items into order items with product snapshots and delivery
+    fees calculated in memory, stores them with a single bulk insert and
+    sets up the order calculation for them.
+    """
+    cart_items = list(cart.items.all())
+    products = {
+        product.id: product
+        for product in load_products({item.product_id for item in cart_items})
+    }
+    snapshots = Product.create_snapshots(products.values())
+
+    order_items = [
+        OrderItem(
+            product=products[cart_item.product_id],
+            order=order,
+            latest_delivery_date=cart_item.latest_delivery_date,
+            quantity=cart_item.quantity,
+            delivery_address=cart.delivery_address,
+            delivery_option=cart_item.delivery_option,
+            product_snapshot=snapshots[cart_item.product_id],
+        )
+        for cart_item in cart_items
+    ]
+
+    calculation = OrderCalculation(order, order_items)
+    for order_item in order_items:
+        delivery_fee = order_item._delivery_fee(
+            calculation.total_price_central_delivery
+        )
+        order_item.delivery_fee = cents_to_decimal(delivery_fee.net_cents)
+
+    order_items = OrderItem.objects.bulk_create(order_items)
+    order.calculation = calculation
+
+    return order_items
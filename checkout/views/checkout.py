@@ -9,10 +9,11 @@ from core.currencies import CURRENT_CURRENCY_CODE
 from core.permissions.buyer_or_seller import IsBuyerOrSellerUser
 from core.tasks.mixin import TasksMixin
 from delivery_options.models import DeliveryOption
-from orders.models import Order, OrderItem
+from orders.models import Order
 from orders.serializers.order import OrderSerializer
 
 from ..serializers.checkout import CartSerializer
+from ..utils import create_order_items
 
 
 class CheckoutView(TasksMixin, views.APIView):
@@ -26,18 +27,7 @@ class CheckoutView(TasksMixin, views.APIView):
                 Cart.objects.filter(user=self.request.user)
                 .order_by("-created_at")
                 .select_related("user", "delivery_address")
-                .prefetch_related(
-                    "items__product",
-                    "items__product__container_type",
-                    "items__delivery_option",
-                    "items__product__seller",
-                    "items__product__region",
-                    "items__product__regions",
-                    "items__product__category",
-                    "items__product__category__icon",
-                    "user__region__settings",
-                    "items__product__delivery_options",
-                )
+                .prefetch_related("items__delivery_option")
                 .first()
             )
         except Cart.DoesNotExist:
@@ -73,73 +63,49 @@ class CheckoutView(TasksMixin, views.APIView):
             region=request.region,
         )
 
-        third_party_delivery = False
-
-        order_items = []
-        for cart_item in cart.items.all():
-            order_item = OrderItem(
-                product=cart_item.product,
-                order=order,
-                latest_delivery_date=cart_item.latest_delivery_date,
-                quantity=cart_item.quantity,
-                delivery_address=cart.delivery_address,
-                delivery_option_id=cart_item.delivery_option.id,
-            )
-            order_item.product_snapshot = order_item.product.create_snapshot()
-            order_items.append(order_item)
+        order_items = create_order_items(order, cart)
+        order.total_price = order.price_gross
+        order.save()
+
+        cart.delete()
 
-        order_items = OrderItem.objects.bulk_create(order_items)
+        tasks = []
 
         if settings.FEATURES["routes"]:
-            for order_item in order_items:
-                if (
-                    order_item.product.third_party_delivery
-                    and order_item.delivery_option_id == DeliveryOption.SELLER
-                ):
-                    third_party_delivery = True
-
-                    self.send_task(
-                        f"/jobs/create/{order_item.id}",
+            tasks = [
+                (
+                    f"/jobs/create/{order_item.id}",
+                    dict(
                         queue_name="routes",
                         http_method="POST",
                         schedule_time=30,
                         headers={"Region": request.region.slug},
-                    )
-
-        # WARNING: It's required. The changes should be stored in the DB before we run recalculate_items_delivery_fee method.
-        # FIXME: It should not work like this.
-        order.save()
-
-        order = Order.objects.prefetch_related(
-            "items__delivery_option",
-            "items__product__container_type",
-            "items__product__region__settings__logistics_company",
-            "items__product__category",
-            "items__product__seller__region__settings",
-            "items__delivery_option",
-            "items__product__regions",
-            "buyer__region__settings",
-            "items__order__region__settings",
-            "region__settings",
-        ).get(id=order.id)
-
-        order.recalculate_items_delivery_fee()
-        order.total_price = order.price_gross
-        order.save()
-
-        cart.delete()
-
-        if not third_party_delivery:
-            self.send_task(
-                f"/documents/queue/{order.id}/all",
-                queue_name="documents",
-                http_method="POST",
-                schedule_time=60,
-                headers={"Region": request.region.slug},
+                    ),
+                )
+                for order_item in order_items
+                if order_item.product.third_party_delivery
+                and order_item.delivery_option_id == DeliveryOption.SELLER
+            ]
+
+        if not tasks:
+            tasks.append(
+                (
+                    f"/documents/queue/{order.id}/all",
+                    dict(
+                        queue_name="documents",
+                        http_method="POST",
+                        schedule_time=60,
+                        headers={"Region": request.region.slug},
+                    ),
+                )
             )
         else:
             logger.debug(f"Third party delivery. Order ID: {order.id}")
 
+        errors = self.send_tasks([dict(url=url, **options) for url, options in tasks])
+        # Roll back the order like a failing `send_task` did
+        self.raise_first_error(errors)
+
         return Response(OrderSerializer(order, context={"request": request}).data)
 
     def get(self, request, pk: int = None, format=None):
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.functional import cached_property
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -45,3 +47,10 @@ class Region(BaseAbstractModel):
     class Meta:
         verbose_name = _("Region")
         verbose_name_plural = _("Regions")
+
+
+@receiver([post_save, post_delete], sender=Region)
+def clear_region_cache(sender, **kwargs):
+    from common.utils import region_cache
+
+    region_cache.clear()
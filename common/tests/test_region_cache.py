@@ -0,0 +1,67 @@
+from unittest import mock
+
+import pytest
+
+from common.utils import RegionCache
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def region_cache():
+    return RegionCache()
+
+
+def test_region_is_loaded_once(region_cache, traidoo_region, django_assert_num_queries):
+    with django_assert_num_queries(4):
+        region = region_cache.get(traidoo_region.slug)
+
+    with django_assert_num_queries(0):
+        assert region_cache.get(traidoo_region.slug) is region
+        assert region.setting.platform_user
+
+    assert region_cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_unknown_region_is_cached(region_cache, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert region_cache.get("unknown") is None
+        assert region_cache.get("unknown") is None
+
+
+def test_region_expires(region_cache, traidoo_region, settings):
+    settings.REGION_CACHE_TTL = 60
+
+    with mock.patch("common.utils.time.monotonic", return_value=1000):
+        region = region_cache.get(traidoo_region.slug)
+    with mock.patch("common.utils.time.monotonic", return_value=1059):
+        assert region_cache.get(traidoo_region.slug) is region
+    with mock.patch("common.utils.time.monotonic", return_value=1061):
+        assert region_cache.get(traidoo_region.slug) is not region
+
+    assert region_cache.stats()["misses"] == 2
+
+
+def test_log_stats(region_cache, traidoo_region, settings):
+    settings.METRICS_LOG_INTERVAL = 0
+
+    with mock.patch("core.metrics.logger") as logger:
+        region_cache.get(traidoo_region.slug)
+        region_cache.get(traidoo_region.slug)
+
+    logger.info.assert_called_with("Region cache: {'hits': 0, 'misses': 1, 'size': 1}")
+
+
+def test_region_cache_cleared_on_save(traidoo_region, traidoo_settings):
+    from common.utils import region_cache
+
+    region = region_cache.get(traidoo_region.slug)
+
+    traidoo_settings.min_purchase_value = 100
+    traidoo_settings.save()
+    region = region_cache.get(traidoo_region.slug)
+    assert region.setting.min_purchase_value == 100
+
+    traidoo_region.name = "Other"
+    traidoo_region.save()
+    assert region_cache.get(traidoo_region.slug).name == "Other"
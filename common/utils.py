@@ -1,10 +1,74 @@
-from typing import Union
+import time
+from typing import Dict, Optional, Tuple, Union
 
+from django.conf import settings
 from rest_framework.request import Request
 
+from core.metrics import PeriodicLog
+
 from .models import Region
 
 
+class RegionCache:
+    """
+    Process-local cache of regions with their settings by slug.
+
+    Entries expire after `REGION_CACHE_TTL` seconds and the whole cache is
+    cleared when a region or region setting is saved or deleted in this
+    process. Other processes pick up changes once their entries expire.
+    Hits and misses are logged every `METRICS_LOG_INTERVAL` seconds.
+    """
+
+    def __init__(self):
+        self._regions: Dict[str, Tuple[float, Optional[Region]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._log = PeriodicLog("Region cache", self.stats)
+
+    def get(self, slug: str) -> Optional[Region]:
+        self._log.tick()
+        now = time.monotonic()
+
+        try:
+            expires_at, region = self._regions[slug]
+        except KeyError:
+            pass
+        else:
+            if now < expires_at:
+                self.hits += 1
+                return region
+
+        self.misses += 1
+        region = self._load(slug)
+        self._regions[slug] = (now + settings.REGION_CACHE_TTL, region)
+
+        return region
+
+    def clear(self):
+        self._regions = {}
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._regions)}
+
+    @staticmethod
+    def _load(slug: str) -> Optional[Region]:
+        try:
+            region = Region.objects.prefetch_related(
+                "settings", "settings__platform_user", "settings__logistics_company"
+            ).get(slug=slug)
+        except Region.DoesNotExist:
+            return None
+
+        # Same as `Region.setting`, but from the prefetched settings
+        region.setting = min(
+            region.settings.all(), key=lambda setting: setting.id, default=None
+        )
+        return region
+
+
+region_cache = RegionCache()
+
+
 def get_region(request: Request) -> Union[Region, None]:
     """
     Base on header in HTTP request get a valid region or None incase
@@ -16,11 +80,4 @@ def get_region(request: Request) -> Union[Region, None]:
     if not region_slug:
         return None
 
-    try:
-        region = Region.objects.prefetch_related(
-            "settings", "settings__platform_user", "settings__logistics_company"
-        ).get(slug=region_slug)
-    except Region.DoesNotExist:
-        region = None
-
-    return region
+    return region_cache.get(region_slug)
@@ -5,7 +5,7 @@ from decimal import Decimal
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
-from core.calculators.value import Value
+from core.calculators.value import Value, cents_to_decimal
 from core.payments.transport_insurance import calculate_transport_insurance_rate
 
 
@@ -60,12 +60,12 @@ class ItemCalculatorMixin:
     @property
     def buyer_platform_fee(self) -> Value:
         value = (
-            Decimal(str(self.price.netto))
+            cents_to_decimal(self.price.net_cents)
             * self.buyer.buyer_platform_fee_rate
             / Decimal("100")
         )
         platform_fee = value.quantize(Decimal(".01"), "ROUND_HALF_UP")
-        return Value(float(platform_fee), self.setting.platform_fee_vat)
+        return Value(platform_fee, self.setting.platform_fee_vat)
 
     @property
     def is_central_logistic_delivery(self):
@@ -91,19 +91,30 @@ class ItemCalculatorMixin:
 
     @property
     def transport_insurance(self) -> Decimal:
+        return self.calculate_transport_insurance(self.total_price_central_delivery)
+
+    def calculate_transport_insurance(self, total_price_central_delivery) -> Decimal:
         """
-        Calculates transport insurance
+        Calculates transport insurance for the net total of all items
+        delivered by central logistics
         """
 
-        price_net = Decimal(str(self.price_net))
+        price_net = cents_to_decimal(self.price.net_cents)
         insurance = price_net * calculate_transport_insurance_rate(
-            self.total_price_central_delivery
+            total_price_central_delivery
         )
         return insurance.quantize(Decimal(".01"), "ROUND_HALF_UP")
 
     @property
     def central_logistic_delivery_fee(self) -> Value:
-        value = self.transport_insurance
+        return self.calculate_central_logistic_delivery_fee(
+            self.total_price_central_delivery
+        )
+
+    def calculate_central_logistic_delivery_fee(
+        self, total_price_central_delivery
+    ) -> Value:
+        value = self.calculate_transport_insurance(total_price_central_delivery)
 
         return Value(
             value.quantize(Decimal(".01"), "ROUND_HALF_UP"),
@@ -117,9 +128,13 @@ class ItemCalculatorMixin:
             self.setting.mc_swiss_delivery_fee_vat,
         )
 
-    def _delivery_fee(self) -> Value:
+    def _delivery_fee(self, total_price_central_delivery=None) -> Value:
         if self.is_central_logistic_delivery:
-            return self.central_logistic_delivery_fee
+            if total_price_central_delivery is None:
+                return self.central_logistic_delivery_fee
+            return self.calculate_central_logistic_delivery_fee(
+                total_price_central_delivery
+            )
         elif self.is_seller_delivery:
             return self.seller_delivery_fee
         return Value(0)
@@ -1,10 +1,7 @@
 import abc
-import collections
-import itertools
 from decimal import Decimal
 
-from core.calculators.utils import round_float
-from core.calculators.value import Value
+from core.calculators.value import Value, cents_to_decimal, group_by_vat, sum_net_cents
 
 
 class OrderCalculatorMixin:
@@ -32,33 +29,29 @@ class OrderCalculatorMixin:
         pass
 
     @staticmethod
-    def calculate_gross_value_of_items(calc_items):
-        items_values = [item.value for item in calc_items]
-        items_values = sorted(items_values, key=lambda item: item.vat_rate)
-        gross = Decimal("0")
-        for vat_rate, lines_by_vat_rate in itertools.groupby(
-            items_values, lambda item_value: item_value.vat_rate
-        ):
-            sum_net_value = sum(value.netto for value in lines_by_vat_rate)
-            total_value = Value(sum_net_value, vat_rate)
-            gross += Decimal(str(total_value.brutto))
-        return gross
+    def calculate_gross_cents_of_items(calc_items) -> int:
+        values_by_vat_rate = group_by_vat(item.value for item in calc_items)
+        return sum(value.brutto_cents for value in values_by_vat_rate.values())
+
+    @classmethod
+    def calculate_gross_value_of_items(cls, calc_items) -> Decimal:
+        return cents_to_decimal(cls.calculate_gross_cents_of_items(calc_items))
 
     @property
     def price(self):
-        total = sum(item.value.netto for item in self.calc_items)
-        return round_float(total)
+        return sum_net_cents(item.value for item in self.calc_items) / 100
 
     @property
     def price_gross(self) -> float:
-        gross = Decimal("0")
-        items = sorted(self.calc_items, key=lambda item: item.seller)
-        for seller_id, items in itertools.groupby(items, lambda item: item.seller):
-            gross_per_seller = self.calculate_gross_value_of_items(items)
-            gross += gross_per_seller
-
-        return round_float(gross)
+        return self.price_gross_cents / 100
 
     @property
-    def price_gross_cents(self):
-        return int(round(self.price_gross * 100, 0))
+    def price_gross_cents(self) -> int:
+        items_by_seller = {}
+        for item in self.calc_items:
+            items_by_seller.setdefault(item.seller, []).append(item)
+
+        return sum(
+            self.calculate_gross_cents_of_items(items)
+            for items in items_by_seller.values()
+        )
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark of the order calculations, cents based `Value` against the
+legacy Decimal/float implementation. Not collected by default, run with:
+
+    pytest core/calculators/tests/benchmark_value.py -s
+"""
+import random
+import timeit
+
+import pytest
+
+from core.calculators.tests.legacy import (
+    LegacyValue,
+    legacy_price,
+    legacy_price_gross,
+)
+from core.calculators.tests.test_value_parity import Order, random_order_items
+from core.calculators.value import Value
+
+REPEAT = 5
+
+
+def best_of(statement, number):
+    return min(timeit.repeat(statement, number=number, repeat=REPEAT)) / number
+
+
+@pytest.mark.parametrize("lines", [10, 100, 500])
+def test_benchmark_order_totals(lines):
+    order = Order(random_order_items(random.Random(lines), lines))
+
+    current = best_of(lambda: (order.price, order.price_gross), number=20)
+    legacy = best_of(
+        lambda: (legacy_price(order.items), legacy_price_gross(order.items)),
+        number=20,
+    )
+
+    print(
+        f"\norder totals, {lines} lines: {current * 1000:.3f} ms "
+        f"(legacy {legacy * 1000:.3f} ms, x{legacy / current:.1f})"
+    )
+
+
+def test_benchmark_value_arithmetic():
+    numbers = [round(random.uniform(0, 300), 2) for _ in range(1000)]
+
+    def current():
+        values = [Value(number, 19) for number in numbers]
+        total = sum(values)
+        return total.brutto
+
+    def legacy():
+        values = [LegacyValue(number, 19) for number in numbers]
+        total = sum(values)
+        return total.brutto
+
+    current_time = best_of(current, number=10)
+    legacy_time = best_of(legacy, number=10)
+
+    print(
+        f"\n1000 values created and summed: {current_time * 1000:.3f} ms "
+        f"(legacy {legacy_time * 1000:.3f} ms, x{legacy_time / current_time:.1f})"
+    )
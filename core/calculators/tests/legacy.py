@@ -0,0 +1,105 @@
+"""
+Reference copy of the Decimal/float based calculations which were used before
+`Value` switched to integer cents. Parity tests and benchmarks compare the
+current implementation against it.
+"""
+import itertools
+from decimal import Decimal
+
+from core.calculators.utils import round_float
+from core.payments.transport_insurance import calculate_transport_insurance_rate
+
+
+class LegacyValue(object):
+    def __init__(self, netto, vat=0):
+
+        self.netto = float(
+            Decimal(str(netto)).quantize(Decimal(".01"), "ROUND_HALF_UP")
+        )
+
+        self.vat_rate = vat
+        self.vat = Decimal(str(netto)) * Decimal(str(vat)) / Decimal("100")
+        self.vat = self.vat.quantize(Decimal(".01"), "ROUND_HALF_UP")
+        self.vat = float(self.vat)
+
+    def __add__(self, other):
+        if self.vat_rate != other.vat_rate:
+            raise ValueError(
+                "Cannot add values of different VAT rates. {} != {}".format(
+                    self.vat_rate, other.vat_rate
+                )
+            )
+
+        value = Decimal(str(self.netto)) + Decimal(str(other.netto))
+        value = float(value)
+        value = LegacyValue(value, self.vat_rate)
+        value.vat = float(Decimal(str(self.vat)) + Decimal(str(other.vat)))
+
+        return value
+
+    def __iadd__(self, other):
+
+        self.netto = float(Decimal(str(self.netto)) + Decimal(str(other.netto)))
+        self.vat = float(Decimal(str(self.vat)) + Decimal(str(other.vat)))
+
+        return self
+
+    def __radd__(self, other):
+        if other == 0:
+            return self
+        else:
+            return self.__add__(other)
+
+    @property
+    def brutto(self):
+        return float(Decimal(str(self.netto)) + Decimal(str(self.vat)))
+
+
+def legacy_item_value(item):
+    return LegacyValue(
+        Decimal(item.price) * Decimal(item.count) * Decimal(item.amount),
+        Decimal(item.vat),
+    )
+
+
+def legacy_gross_value_of_items(calc_items):
+    items_values = [legacy_item_value(item) for item in calc_items]
+    items_values = sorted(items_values, key=lambda item: item.vat_rate)
+    gross = Decimal("0")
+    for vat_rate, lines_by_vat_rate in itertools.groupby(
+        items_values, lambda item_value: item_value.vat_rate
+    ):
+        sum_net_value = sum(value.netto for value in lines_by_vat_rate)
+        total_value = LegacyValue(sum_net_value, vat_rate)
+        gross += Decimal(str(total_value.brutto))
+    return gross
+
+
+def legacy_price(calc_items):
+    total = sum(legacy_item_value(item).netto for item in calc_items)
+    return round_float(total)
+
+
+def legacy_price_gross(calc_items):
+    gross = Decimal("0")
+    items = sorted(calc_items, key=lambda item: item.seller)
+    for seller_id, items in itertools.groupby(items, lambda item: item.seller):
+        gross += legacy_gross_value_of_items(items)
+
+    return round_float(gross)
+
+
+def legacy_buyer_platform_fee(price, fee_rate, fee_vat):
+    value = (
+        Decimal(str(LegacyValue(price).netto)) * fee_rate / Decimal("100")
+    )
+    platform_fee = value.quantize(Decimal(".01"), "ROUND_HALF_UP")
+    return LegacyValue(float(platform_fee), fee_vat)
+
+
+def legacy_transport_insurance(price, total_price_central_delivery):
+    price_net = Decimal(str(LegacyValue(price).netto))
+    insurance = price_net * calculate_transport_insurance_rate(
+        total_price_central_delivery
+    )
+    return insurance.quantize(Decimal(".01"), "ROUND_HALF_UP")
@@ -0,0 +1,178 @@
+import random
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from core.calculators.item_calculator import ItemCalculatorMixin
+from core.calculators.order_calculator import OrderCalculatorMixin
+from core.calculators.tests.legacy import (
+    LegacyValue,
+    legacy_buyer_platform_fee,
+    legacy_gross_value_of_items,
+    legacy_price,
+    legacy_price_gross,
+    legacy_transport_insurance,
+)
+from core.calculators.value import Value, group_by_vat, sum_values
+
+VAT_RATES = [0, 5, 5.5, 7, 10.7, 19, 19.0, Decimal("7"), Decimal("10.7"), Decimal(10.7)]
+
+
+def random_order_items(rnd, count):
+    return [
+        OrderCalculatorMixin.Item(
+            price=rnd.choice(
+                [
+                    round(rnd.uniform(0.01, 300), 2),
+                    round(rnd.uniform(0.01, 30), 3),
+                    rnd.randint(1, 100),
+                ]
+            ),
+            count=rnd.choice([rnd.randint(1, 50), round(rnd.uniform(0.1, 5), 2)]),
+            vat=rnd.choice(VAT_RATES),
+            amount=rnd.choice([1, 0.5, 2.5, round(rnd.uniform(0.1, 10), 2)]),
+            seller=rnd.randint(1, 4),
+        )
+        for _ in range(count)
+    ]
+
+
+class Order(OrderCalculatorMixin):
+    def __init__(self, items):
+        self.items = items
+
+    @property
+    def calc_items(self):
+        return self.items
+
+
+class Item(ItemCalculatorMixin):
+    product_price = None
+    amount = None
+    product_vat = None
+    container_deposit_net = None
+    product_delivery_charge = None
+    setting = None
+    total_price_central_delivery = None
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_value_parity(seed):
+    rnd = random.Random(seed)
+
+    for _ in range(200):
+        netto = rnd.choice(
+            [
+                rnd.uniform(-50, 500),
+                round(rnd.uniform(0, 500), 3),
+                Decimal(rnd.uniform(0, 500)),
+                rnd.randint(0, 500),
+            ]
+        )
+        vat_rate = rnd.choice(VAT_RATES)
+
+        value = Value(netto, vat_rate)
+        legacy = LegacyValue(netto, vat_rate)
+
+        assert value.netto == legacy.netto
+        assert value.vat == legacy.vat
+        assert value.brutto == legacy.brutto
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_sum_parity(seed):
+    rnd = random.Random(seed)
+    numbers = [round(rnd.uniform(0, 300), rnd.randint(0, 4)) for _ in range(30)]
+
+    values = [Value(number, 19) for number in numbers]
+    legacy_values = [LegacyValue(number, 19) for number in numbers]
+
+    total = sum(values)
+    legacy_total = sum(legacy_values)
+    assert (total.netto, total.vat, total.brutto) == (
+        legacy_total.netto,
+        legacy_total.vat,
+        legacy_total.brutto,
+    )
+
+    summed = sum_values(values)
+    assert (summed.netto, summed.vat) == (legacy_total.netto, legacy_total.vat)
+
+    accumulated = Value(0, 19)
+    legacy_accumulated = LegacyValue(0, 19)
+    for value, legacy_value in zip(values, legacy_values):
+        accumulated += value
+        legacy_accumulated += legacy_value
+    assert accumulated.brutto == legacy_accumulated.brutto
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_order_calculator_parity(seed):
+    rnd = random.Random(seed)
+    order = Order(random_order_items(rnd, rnd.randint(1, 120)))
+
+    assert order.price == legacy_price(order.items)
+    assert order.price_gross == legacy_price_gross(order.items)
+    assert order.price_gross_cents == int(round(legacy_price_gross(order.items) * 100))
+    assert order.calculate_gross_value_of_items(
+        order.items
+    ) == legacy_gross_value_of_items(order.items)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_item_calculator_parity(seed):
+    rnd = random.Random(seed)
+    setting = SimpleNamespace(platform_fee_vat=Decimal("19"))
+    buyer = SimpleNamespace(buyer_platform_fee_rate=Decimal("3.5"))
+
+    for _ in range(100):
+        item = Item(
+            quantity=rnd.randint(1, 40),
+            product_price=Decimal(str(round(rnd.uniform(0.01, 200), 2))),
+            amount=Decimal(str(rnd.choice([1, 0.25, 2.5, 3]))),
+            product_vat=rnd.choice(VAT_RATES),
+            buyer=buyer,
+            setting=setting,
+            total_price_central_delivery=round(rnd.uniform(0, 2000), 2),
+        )
+        price = item.quantity * item.product_price * item.amount
+        legacy_fee = legacy_buyer_platform_fee(
+            price, buyer.buyer_platform_fee_rate, setting.platform_fee_vat
+        )
+
+        assert item.price_net == LegacyValue(price, item.product_vat).netto
+        assert item.price_gross == LegacyValue(price, item.product_vat).brutto
+        assert item.buyer_platform_fee.brutto == legacy_fee.brutto
+        assert item.transport_insurance == legacy_transport_insurance(
+            price, item.total_price_central_delivery
+        )
+
+
+def test_group_by_vat_keeps_float_accumulated_vat():
+    # 0.49 + 24.24 + 4.77 accumulates to 29.499999999999996 as a float,
+    # 19% VAT of it has always been rounded down to 5.60
+    items = [
+        OrderCalculatorMixin.Item(price=price, count=1, vat=19, seller=1)
+        for price in (0.49, 24.24, 4.77)
+    ]
+
+    values_by_vat_rate = group_by_vat(item.value for item in items)
+
+    assert values_by_vat_rate[19].netto == 29.5
+    assert values_by_vat_rate[19].vat == 5.6
+    assert Order(items).price_gross == legacy_price_gross(items) == 35.1
+
+
+def test_sum_values_of_different_vat_rates():
+    with pytest.raises(ValueError):
+        sum_values([Value(1, 7), Value(1, 19)])
+
+
+def test_sum_values_without_values():
+    total = sum_values([], 19)
+
+    assert (total.netto, total.vat, total.vat_rate) == (0, 0, 19)
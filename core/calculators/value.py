@@ -1,17 +1,75 @@
+import functools
 from decimal import Decimal
 
+CENT = Decimal(".01")
+HUNDRED = Decimal("100")
+
+
+@functools.lru_cache(maxsize=1024, typed=True)
+def _rate_to_decimal(rate) -> Decimal:
+    return Decimal(str(rate))
+
+
+def to_decimal(number) -> Decimal:
+    """
+    Converts a number the same way `Decimal(str(number))` does, without
+    the string round trip for values which are already exact.
+    """
+    if isinstance(number, (Decimal, int)):
+        return Decimal(number)
+    return Decimal(str(number))
+
+
+def to_cents(number) -> int:
+    """Rounds a number half up to an integer amount of cents."""
+    return int(to_decimal(number).quantize(CENT, "ROUND_HALF_UP").scaleb(2))
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
 
 class Value(object):
-    def __init__(self, netto, vat=0):
+    """
+    Net amount and its VAT, both kept as integer cents.
 
-        self.netto = float(
-            Decimal(str(netto)).quantize(Decimal(".01"), "ROUND_HALF_UP")
-        )
+    Numbers are converted once when a value is created, all additions are
+    done on integers afterwards. `netto`, `vat` and `brutto` are exposed as
+    floats rounded to cents, like before.
+    """
+
+    __slots__ = ("net_cents", "vat_cents", "vat_rate")
+
+    def __init__(self, netto, vat=0):
+        netto = to_decimal(netto)
 
         self.vat_rate = vat
-        self.vat = Decimal(str(netto)) * Decimal(str(vat)) / Decimal("100")
-        self.vat = self.vat.quantize(Decimal(".01"), "ROUND_HALF_UP")
-        self.vat = float(self.vat)
+        self.net_cents = int(netto.quantize(CENT, "ROUND_HALF_UP").scaleb(2))
+        self.vat_cents = to_cents(netto * _rate_to_decimal(vat) / HUNDRED)
+
+    @classmethod
+    def from_cents(cls, net_cents: int, vat_cents: int, vat_rate=0) -> "Value":
+        value = cls.__new__(cls)
+        value.net_cents = net_cents
+        value.vat_cents = vat_cents
+        value.vat_rate = vat_rate
+        return value
+
+    @property
+    def netto(self) -> float:
+        return self.net_cents / 100
+
+    @property
+    def vat(self) -> float:
+        return self.vat_cents / 100
+
+    @property
+    def brutto_cents(self) -> int:
+        return self.net_cents + self.vat_cents
+
+    @property
+    def brutto(self) -> float:
+        return self.brutto_cents / 100
 
     def __add__(self, other):
         if self.vat_rate != other.vat_rate:
@@ -21,20 +79,17 @@ class Value(object):
                 )
             )
 
-        value = Decimal(str(self.netto)) + Decimal(str(other.netto))
-        value = float(value)
-        value = Value(value, self.vat_rate)
-
         # we do not want to include rounding errors which were lost when each
         # of Values vat was calculated
-        value.vat = float(Decimal(str(self.vat)) + Decimal(str(other.vat)))
-
-        return value
+        return Value.from_cents(
+            self.net_cents + other.net_cents,
+            self.vat_cents + other.vat_cents,
+            self.vat_rate,
+        )
 
     def __iadd__(self, other):
-
-        self.netto = float(Decimal(str(self.netto)) + Decimal(str(other.netto)))
-        self.vat = float(Decimal(str(self.vat)) + Decimal(str(other.vat)))
+        self.net_cents += other.net_cents
+        self.vat_cents += other.vat_cents
 
         return self
 
@@ -44,9 +99,49 @@ class Value(object):
         else:
             return self.__add__(other)
 
-    @property
-    def brutto(self):
-        return float(Decimal(str(self.netto)) + Decimal(str(self.vat)))
-
     def __str__(self):
         return f"{self.netto} net / {self.brutto} gross {self.vat_rate} VAT"
+
+
+def sum_values(values, vat_rate=0) -> Value:
+    """
+    Adds up values of the same VAT rate in one pass over integer cents.
+    Returns an empty value with `vat_rate` if there is nothing to add.
+    """
+    net_cents = 0
+    vat_cents = 0
+    for index, value in enumerate(values):
+        if index == 0:
+            vat_rate = value.vat_rate
+        elif value.vat_rate != vat_rate:
+            raise ValueError(
+                "Cannot add values of different VAT rates. {} != {}".format(
+                    vat_rate, value.vat_rate
+                )
+            )
+        net_cents += value.net_cents
+        vat_cents += value.vat_cents
+    return Value.from_cents(net_cents, vat_cents, vat_rate)
+
+
+def sum_net_cents(values) -> int:
+    return sum(value.net_cents for value in values)
+
+
+def group_by_vat(values) -> dict:
+    """
+    Groups values by VAT rate and returns one value per rate, with VAT
+    calculated once on the net total of the rate.
+
+    The net total used for the VAT is accumulated as a float, in the order
+    of `values`, exactly like invoices have always been calculated. It keeps
+    the totals of documents which were already issued unchanged.
+    """
+    net_totals = {}
+    for value in values:
+        net_totals[value.vat_rate] = net_totals.get(value.vat_rate, 0) + value.netto
+
+    return {
+        vat_rate: Value(net_total, vat_rate)
+        for vat_rate, net_total in net_totals.items()
+    }
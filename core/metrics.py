@@ -0,0 +1,31 @@
+import threading
+import time
+from typing import Callable, Dict
+
+from django.conf import settings
+from loguru import logger
+
+
+class PeriodicLog:
+    """
+    Logs the summary of process-local counters at most every
+    `METRICS_LOG_INTERVAL` seconds, whenever `tick` is called. Every instance
+    logs its own counters.
+    """
+
+    def __init__(self, name: str, summary: Callable[[], Dict]):
+        self.name = name
+        self.summary = summary
+        self._lock = threading.Lock()
+        self._logged_at = time.monotonic()
+
+    def tick(self):
+        now = time.monotonic()
+
+        with self._lock:
+            if now - self._logged_at < settings.METRICS_LOG_INTERVAL:
+                return
+
+            self._logged_at = now
+
+        logger.info(f"{self.name}: {self.summary()}")
@@ -11,13 +11,27 @@ from common.utils import get_region
 ADMIN_REQUEST_RE = re.compile(r"/[a-z]{2}/admin")
 
 
-def is_admin_request(request):
-
-    return bool(ADMIN_REQUEST_RE.findall(request.path)) or bool(
-        ADMIN_REQUEST_RE.findall(request.META.get("HTTP_REFERER", ""))
+def compile_exempt_paths():
+    """
+    One pattern for all paths which are served without a region: admin
+    pages, the Mangopay webhook, App Engine warmup, favicon and robots.txt.
+    """
+    return re.compile(
+        "|".join(
+            [
+                rf".*?{ADMIN_REQUEST_RE.pattern}",
+                re.escape(reverse("webhook")),
+                re.escape("/_ah/warmup"),
+                r"(?:/favicon\.ico|/robots\.txt)\Z",
+            ]
+        )
     )
 
 
+def is_admin_referer(request):
+    return bool(ADMIN_REQUEST_RE.search(request.META.get("HTTP_REFERER", "")))
+
+
 def is_task_queue_or_cron(request):
     return request.META.get("HTTP_X_APPENGINE_CRON") or request.META.get(
         "HTTP_X_APPENGINE_QUEUENAME"
@@ -25,18 +39,17 @@ def is_task_queue_or_cron(request):
 
 
 def region_middleware(get_response):
+    exempt_paths = compile_exempt_paths()
+
     def middleware(request):
 
+        if exempt_paths.match(request.path):
+            request.region = None
+            return get_response(request)
+
         region = get_region(request)
 
-        if not (
-            is_task_queue_or_cron(request)
-            or is_admin_request(request)
-            or request.path.startswith(reverse("webhook"))
-            or request.path.startswith("/_ah/warmup")
-            or request.path in ("/favicon.ico", "/robots.txt")
-            or region
-        ):
+        if not (region or is_task_queue_or_cron(request) or is_admin_referer(request)):
             return JsonResponse(
                 {
                     "message": "Could not satisfy the request Region header.",
@@ -0,0 +1,50 @@
+"""
+Request throughput of the middleware stack around a view which does
+nothing. Not collected by default, run with:
+
+    pytest core/middleware/tests/benchmark_middleware.py -s
+"""
+import time
+
+import pytest
+from django.conf import settings as django_settings
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+
+from common.utils import region_cache
+
+pytestmark = pytest.mark.django_db
+
+REQUESTS = 10000
+
+
+def middleware_stack():
+    handler = lambda request: HttpResponse()
+
+    for middleware_path in reversed(django_settings.MIDDLEWARE):
+        handler = import_string(middleware_path)(handler)
+
+    return handler
+
+
+@pytest.mark.parametrize(
+    "path,cache_ttl",
+    [("/_ah/warmup", 60), ("/products", 60), ("/products", 0)],
+)
+def test_benchmark_middleware(traidoo_region, settings, path, cache_ttl):
+    settings.REGION_CACHE_TTL = cache_ttl
+    region_cache.clear()
+    handler = middleware_stack()
+    request_factory = RequestFactory(HTTP_REGION=traidoo_region.slug)
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = handler(request_factory.get(path))
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    print(
+        f"\n{path} (region cache ttl {cache_ttl}s): "
+        f"{REQUESTS / elapsed:.0f} requests/s"
+    )
@@ -0,0 +1,40 @@
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from core.middleware.region import compile_exempt_paths
+
+
+@pytest.mark.parametrize(
+    "path,exempt",
+    [
+        ("/de/admin/", True),
+        ("/en/admin_tools/menu", True),
+        ("/_ah/warmup", True),
+        ("/favicon.ico", True),
+        ("/robots.txt", True),
+        ("/robots.txt/more", False),
+        ("/products", False),
+        ("/products/admin", False),
+    ],
+)
+def test_exempt_paths(path, exempt):
+    assert bool(compile_exempt_paths().match(path)) is exempt
+
+
+def test_exempt_paths_skip_region_resolution():
+    with mock.patch("core.middleware.region.get_region") as get_region:
+        response = APIClient().get("/_ah/warmup", HTTP_REGION="traidoo")
+
+    assert response.status_code == 200
+    get_region.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_admin_referer_does_not_need_region():
+    response = APIClient().get(
+        "/categories", HTTP_REFERER="https://api.traidoo.com/de/admin/"
+    )
+
+    assert response.status_code == 200
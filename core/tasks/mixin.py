@@ -1,17 +1,13 @@
-import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 from django.conf import settings
-from django.utils import timezone
-from google.cloud import tasks_v2
-from google.protobuf import timestamp_pb2
+from loguru import logger
 
+from core.tasks.backends import get_backend
 
-class TasksMixin:
-    @property
-    def _cloud_tasks_client(self):
-        return tasks_v2.CloudTasksClient()
 
+class TasksMixin:
     def send_task(
         self,
         url,
@@ -21,39 +17,47 @@ class TasksMixin:
         schedule_time=None,
         headers=None
     ):
-        parent = self._cloud_tasks_client.queue_path(
-            settings.GOOGLE_CLOUD_PROJECT,
-            settings.GOOGLE_CLOUD_PROJECT_LOCATION,
-            queue_name,
+        get_backend().send(
+            url,
+            queue_name=queue_name,
+            http_method=http_method,
+            payload=payload,
+            schedule_time=schedule_time,
+            headers=headers,
         )
 
-        task = {
-            "app_engine_http_request": {
-                "http_method": http_method,
-                "relative_uri": url
-            }
-        }
-
-        if headers:
-            task["app_engine_http_request"]["headers"] = headers
-
-        if isinstance(payload, dict):
-            payload = json.dumps(payload)
-
-        if payload is not None:
-            converted_payload = payload.encode()
-
-            task["app_engine_http_request"]["body"] = converted_payload
-
-        if schedule_time is not None:
-            # Convert "seconds from now" into an rfc3339 datetime string.
-            d = timezone.now() + datetime.timedelta(seconds=schedule_time)
-
-            # Create Timestamp protobuf.
-            timestamp = timestamp_pb2.Timestamp()
-            timestamp.FromDatetime(d)  # pylint: disable=maybe-no-member
-
-            # Add the timestamp to the tasks.
-            task["schedule_time"] = timestamp
-
-        self._cloud_tasks_client.create_task(parent, task)
+    def _send_batched_task(self, task: Dict) -> Optional[Exception]:
+        options = {key: value for key, value in task.items() if key != "url"}
+
+        try:
+            self.send_task(task["url"], **options)
+        except Exception as error:
+            logger.exception(f"Could not send task {task['url']}.")
+            return error
+
+        return None
+
+    def send_tasks(self, tasks: List[Dict]) -> List[Optional[Exception]]:
+        """
+        Sends a batch of tasks, each given as the arguments of `send_task`,
+        at most `TASKS_SEND_WORKERS` at a time if the backend allows it. A
+        task which cannot be sent does not stop the others. Returns the
+        exception of every task, None if it was sent.
+        """
+        if len(tasks) < 2 or not get_backend().concurrent:
+            return [self._send_batched_task(task) for task in tasks]
+
+        with ThreadPoolExecutor(
+            max_workers=min(settings.TASKS_SEND_WORKERS, len(tasks))
+        ) as executor:
+            return list(executor.map(self._send_batched_task, tasks))
+
+    @staticmethod
+    def raise_first_error(errors: List[Optional[Exception]]):
+        """
+        Raises the first exception returned by `send_tasks`, if any.
+        """
+        error = next((error for error in errors if error is not None), None)
+
+        if error is not None:
+            raise error
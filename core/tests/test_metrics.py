@@ -0,0 +1,20 @@
+from unittest import mock
+
+from core.metrics import PeriodicLog
+
+
+def test_log_summary_once_per_interval(settings):
+    settings.METRICS_LOG_INTERVAL = 60
+
+    with mock.patch("core.metrics.time.monotonic", return_value=1000):
+        log = PeriodicLog("Counters", lambda: {"hits": 1})
+
+    with mock.patch("core.metrics.logger") as logger:
+        for now in (1059, 1061, 1062, 1122):
+            with mock.patch("core.metrics.time.monotonic", return_value=now):
+                log.tick()
+
+    assert logger.info.call_args_list == [
+        mock.call("Counters: {'hits': 1}"),
+        mock.call("Counters: {'hits': 1}"),
+    ]
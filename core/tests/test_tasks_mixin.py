@@ -0,0 +1,126 @@
+import datetime
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+from model_bakery import baker
+
+from core.tasks.backends import TaskError
+from core.tasks.mixin import TasksMixin
+from items.models import Item
+
+# The original, `send_task` is mocked for all tests
+SEND_TASK = TasksMixin.send_task
+
+
+@pytest.fixture(autouse=True)
+def backends():
+    with mock.patch("core.tasks.backends._backends", {}) as backends:
+        yield backends
+
+
+@pytest.fixture
+def local_backend(settings):
+    settings.TASKS_BACKEND = "core.tasks.backends.LocalTasksBackend"
+
+    with mock.patch.object(TasksMixin, "send_task", SEND_TASK):
+        yield
+
+
+@mock.patch.object(TasksMixin, "send_task", SEND_TASK)
+@mock.patch("core.tasks.backends.tasks_v2.CloudTasksClient")
+def test_send_tasks_with_one_client(client):
+    errors = TasksMixin().send_tasks(
+        [{"url": "/first"}, {"url": "/second", "queue_name": "documents-emails"}]
+    )
+    TasksMixin().send_task("/third")
+
+    assert errors == [None, None]
+    client.assert_called_once_with()
+    assert client.return_value.create_task.call_count == 3
+    client.return_value.queue_path.assert_any_call(
+        mock.ANY, mock.ANY, "documents-emails"
+    )
+
+
+def test_send_tasks_despite_errors(send_task):
+    error = RuntimeError("Boom")
+
+    def send(url, **options):
+        if url == "/second":
+            raise error
+
+    send_task.side_effect = send
+
+    errors = TasksMixin().send_tasks(
+        [{"url": "/first"}, {"url": "/second"}, {"url": "/third"}]
+    )
+
+    assert errors == [None, error, None]
+    assert send_task.call_count == 3
+
+
+def test_send_tasks_concurrently(send_task, settings):
+    settings.TASKS_SEND_WORKERS = 3
+    lock = threading.Lock()
+    running = [0]
+    most_running = [0]
+
+    def send(url, **options):
+        with lock:
+            running[0] += 1
+            most_running[0] = max(most_running[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    send_task.side_effect = send
+
+    errors = TasksMixin().send_tasks([{"url": f"/{index}"} for index in range(9)])
+
+    assert errors == [None] * 9
+    assert most_running[0] == 3
+
+
+def test_local_backend_runs_task(local_backend, db, seller, mailoutbox):
+    yesterday = timezone.now().date() - datetime.timedelta(days=1)
+    baker.make(
+        Item,
+        product__seller=seller,
+        product__region=seller.region,
+        quantity=1,
+        latest_delivery_date=yesterday,
+    )
+
+    errors = TasksMixin().send_tasks(
+        [
+            {
+                "url": f"/orders/cron/find-unsold-items/{seller.id}",
+                "queue_name": "unsold-items",
+                "headers": {"Region": seller.region.slug},
+            }
+        ]
+    )
+
+    assert errors == [None]
+    assert not Item.objects.exists()
+    assert [email.to for email in mailoutbox] == [[seller.email]]
+
+
+def test_local_backend_raises_for_failed_task(local_backend, db, traidoo_region):
+    with pytest.raises(TaskError):
+        TasksMixin().send_task(
+            "/orders/cron/unknown", headers={"Region": traidoo_region.slug}
+        )
+
+
+def test_raise_first_error():
+    first, second = RuntimeError("First"), RuntimeError("Second")
+
+    TasksMixin.raise_first_error([None, None])
+    with pytest.raises(RuntimeError) as error:
+        TasksMixin.raise_first_error([None, first, second])
+
+    assert error.value is first
@@ -0,0 +1,74 @@
+import io
+import zipfile
+from typing import Iterable, Iterator
+
+from django.utils import timezone
+from loguru import logger
+
+from documents.models import Document
+from documents.storage import BaseDocumentStorage
+
+
+class ZipStream(io.RawIOBase):
+    """
+    Write-only, unseekable file for `zipfile.ZipFile`, which hands out what
+    was written since the last `pop`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def zip_documents(
+    documents: Iterable[Document], storage: BaseDocumentStorage
+) -> Iterator[bytes]:
+    """
+    Zip archive of the PDFs of the documents, generated while the PDFs are
+    read from storage chunk by chunk. PDFs are compressed already, so they
+    are stored as they are. Documents without a PDF are skipped.
+    """
+    return (data for data in _zip_documents(documents, storage) if data)
+
+
+def _zip_documents(
+    documents: Iterable[Document], storage: BaseDocumentStorage
+) -> Iterator[bytes]:
+    stream = ZipStream()
+
+    with zipfile.ZipFile(stream, mode="w") as archive:
+        for document in documents:
+            if not document.blob_name:
+                continue
+
+            try:
+                chunks = storage.read_chunks(document.blob_name)
+            except FileNotFoundError:
+                logger.warning(f"PDF of document {document.id} not found.")
+                continue
+
+            entry = zipfile.ZipInfo(
+                document.pdf_file_name,
+                date_time=timezone.localtime(document.created_at).timetuple()[:6],
+            )
+
+            with archive.open(entry, mode="w") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    yield stream.pop()
+
+            yield stream.pop()
+
+    yield stream.pop()
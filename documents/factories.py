@@ -1,15 +1,15 @@
 import abc
 import collections
-import itertools
 from typing import Dict, List
 
 from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
 from loguru import logger
 
 from common.models import Region
 from delivery_options.models import DeliveryOption
+from documents.loaders import OrderLoader, item_job
 from documents.models import Document
-from jobs.models import Job
 from orders.models import Order, OrderItem
 
 User = get_user_model()
@@ -36,7 +36,7 @@ class DocumentFactory(abc.ABC):
             "is_certified_organic_producer": user.is_certified_organic_producer,
             "organic_control_body": user.organic_control_body,
             "user_id": user.id,
-            "region_id": user.region.id,
+            "region_id": user.region_id,
         }
 
     @staticmethod
@@ -50,34 +50,25 @@ class DocumentFactory(abc.ABC):
             "email": user.email,
             "invoice_email": user.invoice_email,
             "phone": user.phone,
-            "region_id": user.region.id,
+            "region_id": user.region_id,
         }
 
-    def __init__(self, order: Order, region: Region, seller: User = None):
+    def __init__(
+        self,
+        order: Order,
+        region: Region,
+        seller: User = None,
+        loader: OrderLoader = None,
+    ):
         self._order = order
         self._region = region
         self._seller_user = seller
         self._settings = order.setting
+        self._loader = loader or OrderLoader(order)
 
-    @property
+    @cached_property
     def _items(self) -> List[OrderItem]:
-        items = self._order.items.order_by("product__id", "created_at")
-
-        if self._filters:
-            items = items.filter(**self._filters)
-
-        items = items.all()
-
-        unique_order_items = []
-        for product, order_items in itertools.groupby(
-            items, lambda order_item: order_item.product.id
-        ):
-            order_items = tuple(order_items)
-            quantity = sum([item.quantity for item in order_items])
-            order_items[0].quantity = quantity
-            unique_order_items.append(order_items[0])
-
-        return unique_order_items
+        return self._loader.merged_items(self._include)
 
     @property
     def product_lines(self) -> List:
@@ -131,7 +122,7 @@ class DocumentFactory(abc.ABC):
                 "category": "Pfand",
                 "seller_user_id": container.seller_user_id,
             }
-            for container in self._order.containers(self._filters)
+            for container in self._loader.containers(self._include)
         ]
 
     @property
@@ -151,34 +142,36 @@ class DocumentFactory(abc.ABC):
         else:
             return self.buyer
 
-    @property
-    def _filters(self):
-        return {}
+    def _include(self, item: OrderItem) -> bool:
+        return True
 
     @property
     def central_platform_user(self) -> User:
-        return User.central_platform_user()
+        return self._loader.central_platform_user
+
+    def _new_document(self, **kwargs) -> Document:
+        document = Document(
+            order=self._order, document_type=self.DOCUMENT_TYPE.value[0], **kwargs
+        )
+        document.update_totals()
+        return document
 
     def compose(self):
         document_type = self.DOCUMENT_TYPE.value[0]
 
-        try:
-            document = Document.objects.get(
-                order_id=self._order.id,
-                document_type=document_type,
-                buyer__user_id=self.buyer["user_id"],
-                seller__user_id=self.seller["user_id"],
-            )
+        document = self._loader.document(
+            document_type, self.buyer["user_id"], self.seller["user_id"]
+        )
+
+        if document:
             logger.info(f"{document_type} already exist for order {self._order.id}")
             return document
-        except Document.DoesNotExist:
-            return Document(
+        else:
+            return self._new_document(
                 buyer=self.buyer,
                 seller=self.seller,
                 lines=self.lines,
-                order=self._order,
                 delivery_address=self.delivery_address,
-                document_type=document_type,
             )
 
 
@@ -293,11 +286,9 @@ class DeliveryOverviewBuyerFactory(DocumentFactory):
                 )
 
                 if order_item.product.third_party_delivery:
-                    try:
-                        job = Job.objects.get(order_item=order_item, user__isnull=False)
-                    except Job.DoesNotExist:
-                        pass
-                    else:
+                    job = item_job(order_item)
+
+                    if job and job.user:
                         logger.debug(f"Job claimed, ID: {job.id}.")
                         return job.user.company_name, job.user_id
 
@@ -350,9 +341,8 @@ class DeliveryOverviewSellerFactory(DocumentFactory):
         """
         return self.as_company(self._seller_user)
 
-    @property
-    def _filters(self):
-        return {"product__seller__id": self._seller_user.id}
+    def _include(self, item: OrderItem) -> bool:
+        return item.product.seller_id == self._seller_user.id
 
     @property
     def lines(self):
@@ -447,7 +437,7 @@ class OrderConfirmationBuyerFactory(DocumentFactory):
 
         if not self._order.buyer.is_cooperative_member:
             # add a line for platform fee only if buyer is not cooperative member
-            central_platform_user = User.central_platform_user()
+            central_platform_user = self.central_platform_user
             lines.append(
                 {
                     "number": "",
@@ -477,15 +467,16 @@ class ThirdPartyLogisticsInvoiceFactory(DocumentFactory):
     def buyer(self) -> Dict:
         return self.as_company(self._order.buyer)
 
-    @property
-    def _filters(self):
-        return {
-            "delivery_fee__gt": 0,
-            "product__third_party_delivery": True,
-            "delivery_option__id": 1,
-            "job__user__isnull": False,
-            "product__region__id": self._region.id,
-        }
+    def _include(self, item: OrderItem) -> bool:
+        job = item_job(item)
+        return (
+            item.delivery_fee > 0
+            and item.product.third_party_delivery
+            and item.delivery_option_id == DeliveryOption.SELLER
+            and job is not None
+            and job.user_id is not None
+            and item.product.region_id == self._region.id
+        )
 
     def supplier(self, user: User) -> Dict:
         return self.as_dict(user)
@@ -497,7 +488,7 @@ class ThirdPartyLogisticsInvoiceFactory(DocumentFactory):
         for item in self._items:
             logger.debug("Third party delivery.")
 
-            job = Job.objects.get(order_item=item)
+            job = item.job
             logger.debug(f"Job claimed, ID: {job.id}.")
             producer = job.user.company_name
             seller_user_id = job.user.id
@@ -527,13 +518,11 @@ class ThirdPartyLogisticsInvoiceFactory(DocumentFactory):
 
     def compose(self):
         return (
-            Document(
+            self._new_document(
                 buyer=self.buyer,
                 seller=lines["seller_data"],
                 lines=lines["lines"],
-                order=self._order,
                 delivery_address=self.delivery_address,
-                document_type=self.DOCUMENT_TYPE.value[0],
             )
             for lines in self.lines.values()
         )
@@ -550,13 +539,12 @@ class LogisticsInvoiceFactory(DocumentFactory):
     def buyer(self) -> Dict:
         return self.as_company(self._order.buyer)
 
-    @property
-    def _filters(self):
-        return {
-            "delivery_fee__gt": 0,
-            "product__region__id": self._region.id,
-            "delivery_option__id": DeliveryOption.CENTRAL_LOGISTICS,
-        }
+    def _include(self, item: OrderItem) -> bool:
+        return (
+            item.delivery_fee > 0
+            and item.product.region_id == self._region.id
+            and item.delivery_option_id == DeliveryOption.CENTRAL_LOGISTICS
+        )
 
     @property
     def lines(self):
@@ -588,9 +576,8 @@ class ProducerInvoiceFactory(DocumentFactory):
     def buyer(self) -> Dict:
         return self.as_company(self._order.buyer)
 
-    @property
-    def _filters(self):
-        return {"product__seller__id": self._seller_user.id}
+    def _include(self, item: OrderItem) -> bool:
+        return item.product.seller_id == self._seller_user.id
 
     @property
     def delivery_fee_lines(self):
@@ -604,13 +591,10 @@ class ProducerInvoiceFactory(DocumentFactory):
                 if item.product.third_party_delivery:
                     logger.debug("Third party delivery.")
 
-                    try:
-                        job = Job.objects.get(order_item=item)
-                    except Job.DoesNotExist:
-                        pass
-                    else:
-                        if job.user:
-                            continue
+                    job = item_job(item)
+
+                    if job and job.user:
+                        continue
 
                 lines.append(
                     {
@@ -1,7 +1,12 @@
+import functools
 import os
+import time
 from decimal import Decimal
+from typing import Dict
 
 import jinja2
+from django.conf import settings
+from loguru import logger
 
 from core.calculators.utils import round_float
 from core.calculators.value import Value
@@ -39,11 +44,12 @@ def sum_lines_vat_amount(lines):
     return lines_sum.vat
 
 
-def setup_env():
+def setup_env(auto_reload=True):
     env = jinja2.Environment(
         loader=jinja2.FileSystemLoader(
             os.path.join(os.path.dirname(__file__), "templates")
-        )
+        ),
+        auto_reload=auto_reload,
     )
 
     env.filters["format_price"] = format_price
@@ -54,8 +60,38 @@ def setup_env():
     return env
 
 
+@functools.lru_cache(maxsize=None)
+def get_env() -> jinja2.Environment:
+    """
+    Environment shared by all documents of the process, which keeps the
+    compiled templates in memory. Templates are only checked for changes in
+    debug mode.
+    """
+    return setup_env(auto_reload=settings.DEBUG)
+
+
+def warmup_templates() -> Dict[str, float]:
+    """
+    Loads every document template into the shared environment and returns
+    the seconds each of them took.
+    """
+    env = get_env()
+    timings = {}
+
+    for template_name in env.list_templates(
+        filter_func=lambda name: name.endswith(".html")
+    ):
+        started = time.perf_counter()
+        env.get_template(template_name)
+        timings[template_name] = time.perf_counter() - started
+
+    logger.info(
+        "Document templates loaded: "
+        + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items())
+    )
+    return timings
+
+
 def render_template(template_path):
-    # TODO: do it better
-    jinja = setup_env()
-    html = jinja.get_template(template_path)
+    html = get_env().get_template(template_path)
     return html.render()
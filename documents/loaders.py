@@ -0,0 +1,138 @@
+import copy
+import itertools
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
+
+from common.models import Region
+from documents.models import Document
+from jobs.models import Job
+from orders.calculation import Container, calculate_containers
+from orders.models import Order, OrderItem
+from settings.models import Setting
+
+User = get_user_model()
+
+ItemFilter = Callable[[OrderItem], bool]
+
+
+def item_job(item: OrderItem) -> Optional[Job]:
+    try:
+        return item.job
+    except Job.DoesNotExist:
+        return None
+
+
+class OrderLoader:
+    """
+    Everything the document factories of an order read from the database.
+
+    Items are loaded once together with their products, sellers, regions,
+    region settings, delivery addresses and jobs. Factories sharing a loader
+    filter and merge them in memory, so the number of queries does not grow
+    with the number of sellers.
+    """
+
+    def __init__(self, order: Order):
+        self.order = order
+
+    @cached_property
+    def items(self) -> List[OrderItem]:
+        settings = Setting.objects.select_related("logistics_company", "platform_user")
+        items = list(
+            self.order.items.select_related(
+                "delivery_option",
+                "delivery_address",
+                "product__region",
+                "product__seller__region",
+                "job__user",
+            )
+            .prefetch_related(
+                Prefetch("product__region__settings", queryset=settings),
+                Prefetch("product__seller__region__settings", queryset=settings),
+            )
+            .order_by("product__id", "created_at")
+        )
+
+        for item in items:
+            if item.product:
+                self._set_region_setting(item.product.region)
+                self._set_region_setting(item.product.seller.region)
+
+        return items
+
+    @staticmethod
+    def _set_region_setting(region: Optional[Region]):
+        # Same as `Region.setting`, but from the prefetched settings
+        if region and "setting" not in region.__dict__:
+            region.setting = min(
+                region.settings.all(), key=lambda setting: setting.id, default=None
+            )
+
+    @cached_property
+    def sellers(self) -> List[User]:
+        sellers = {}
+        for item in self.items:
+            sellers.setdefault(item.product.seller.id, item.product.seller)
+        return list(sellers.values())
+
+    @cached_property
+    def central_platform_user(self) -> User:
+        return User.central_platform_user()
+
+    @cached_property
+    def documents(self) -> Dict[Tuple[str, int, int], Document]:
+        documents = {}
+        for document in Document.objects.filter(order_id=self.order.id).order_by("id"):
+            key = (
+                document.document_type,
+                document.buyer.get("user_id"),
+                document.seller.get("user_id"),
+            )
+            documents.setdefault(key, document)
+        return documents
+
+    def document(
+        self, document_type: str, buyer_user_id: int, seller_user_id: int
+    ) -> Optional[Document]:
+        return self.documents.get((document_type, buyer_user_id, seller_user_id))
+
+    def filter_items(self, include: ItemFilter = None) -> List[OrderItem]:
+        return [item for item in self.items if include is None or include(item)]
+
+    def product_regions(self, include: ItemFilter = None) -> List[Region]:
+        regions = {}
+        for item in self.filter_items(include):
+            regions.setdefault(item.product.region.id, item.product.region)
+        return list(regions.values())
+
+    def merged_items(self, include: ItemFilter = None) -> List[OrderItem]:
+        """
+        Items matching `include`, one per product, with the quantity of all
+        matching items of the product. Merged items are copies and must not
+        be saved.
+        """
+        merged = []
+
+        for _, product_items in itertools.groupby(
+            self.filter_items(include), lambda item: item.product_id
+        ):
+            product_items = list(product_items)
+            item = product_items[0]
+
+            if len(product_items) > 1:
+                item = copy.copy(item)
+                item.quantity = sum(
+                    product_item.quantity for product_item in product_items
+                )
+
+            merged.append(item)
+
+        return merged
+
+    def containers(self, include: ItemFilter = None) -> List[Container]:
+        return calculate_containers(
+            self.filter_items(include), float(self.order.setting.deposit_vat)
+        )
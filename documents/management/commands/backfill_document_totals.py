@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from documents.models import Document
+
+
+class Command(BaseCommand):
+    help = "Stores the gross and net totals of documents composed without them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recalculate the totals of all documents.",
+        )
+
+    def handle(self, *args, **options):
+        documents = Document.objects.only("id", "lines").order_by("id")
+
+        if not options["all"]:
+            documents = documents.filter(gross_cents=None)
+
+        batch = []
+        updated = 0
+
+        for document in documents.iterator(chunk_size=options["batch_size"]):
+            try:
+                document.update_totals()
+            except (KeyError, TypeError, ValueError) as error:
+                self.stderr.write(f"Document {document.id} skipped: {error!r}")
+                continue
+
+            batch.append(document)
+
+            if len(batch) == options["batch_size"]:
+                updated += self._save(batch)
+                batch = []
+
+        updated += self._save(batch)
+        self.stdout.write(f"Totals of {updated} documents stored.")
+
+    @staticmethod
+    def _save(documents):
+        Document.objects.bulk_update(documents, ["gross_cents", "net_cents"])
+        return len(documents)
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.15 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0009_auto_20201130_1233'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='gross_cents',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Gross total in cents'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='net_cents',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Net total in cents'),
+        ),
+    ]
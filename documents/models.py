@@ -1,24 +1,48 @@
-import datetime
 import os
-import google.cloud.storage
+import time
 from enum import Enum
 from typing import List
 
-import requests
 from django.conf import settings
 from django.contrib.postgres.fields import JSONField
-from django.db import models
+from django.db import connection, models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from django.utils.timezone import localdate
 from django.utils.translation import gettext_lazy as _
 from loguru import logger
 
 from core.calculators.order_calculator import OrderCalculatorMixin
+from core.calculators.value import sum_net_cents
 from core.currencies import CURRENT_CURRENCY_SYMBOL
 from core.db.base import BaseAbstractModel
 from documents import jinja2_utils
+from documents.pdf import html_to_pdf
+from documents.storage import document_storage
 from orders.models import Order
 
 
+class DocumentQuerySet(models.QuerySet):
+    def gross_cents(self) -> int:
+        """
+        Sum of the gross totals of the documents in one query. Documents
+        without stored totals, see `backfill_document_totals`, are
+        calculated from their lines.
+        """
+        totals = self.aggregate(
+            total=Sum("gross_cents"), missing=Count("id", filter=Q(gross_cents=None))
+        )
+        total = totals["total"] or 0
+
+        if totals["missing"]:
+            total += sum(
+                document.price_gross_cents
+                for document in self.filter(gross_cents=None)
+            )
+
+        return total
+
+
 class Document(OrderCalculatorMixin, BaseAbstractModel):
     class Meta:
         verbose_name = _("Document")
@@ -61,7 +85,7 @@ class Document(OrderCalculatorMixin, BaseAbstractModel):
             )
             return next(document_config).value[1]
 
-    JINJA = jinja2_utils.setup_env()
+    JINJA = jinja2_utils.get_env()
     PDF_BACKEND = settings.HTML2PDF_BACKEND
 
     document_type = models.CharField(
@@ -97,6 +121,21 @@ class Document(OrderCalculatorMixin, BaseAbstractModel):
         verbose_name=_("Bank account owner"),
     )
     paid = models.BooleanField(default=False, verbose_name=_("Is paid"))
+    gross_cents = models.BigIntegerField(
+        null=True, blank=True, editable=False, verbose_name=_("Gross total in cents")
+    )
+    net_cents = models.BigIntegerField(
+        null=True, blank=True, editable=False, verbose_name=_("Net total in cents")
+    )
+
+    objects = DocumentQuerySet.as_manager()
+
+    def update_totals(self):
+        """
+        Stores the totals of the lines in `gross_cents` and `net_cents`.
+        """
+        self.gross_cents = self.price_gross_cents
+        self.net_cents = sum_net_cents(item.value for item in self.calc_items)
 
     @property
     def mangopay_tag(self):
@@ -125,17 +164,18 @@ class Document(OrderCalculatorMixin, BaseAbstractModel):
 
     def render_html(self):
         template = self.JINJA.get_template(self.template_name)
-        return template.render(**self.template_values)
-
-    def render_pdf(self):
-        response = requests.post(
-            self.PDF_BACKEND, self.render_html().encode("utf-8"), timeout=120
+        started = time.perf_counter()
+        html = template.render(**self.template_values)
+        logger.debug(
+            f"Rendered {self.template_name} in {time.perf_counter() - started:.3f}s."
         )
+        return html
 
-        if response.status_code != 200:
-            raise RuntimeError(response.content)  # TODO: document error
+    def render_pdf(self, html: str = None):
+        if html is None:
+            html = self.render_html()
 
-        return response.content
+        return html_to_pdf(self.PDF_BACKEND, html)
 
     @property
     def pdf_file_name(self):
@@ -216,18 +256,7 @@ class Document(OrderCalculatorMixin, BaseAbstractModel):
 
     @property
     def signed_download_url(self):
-        storage_client = google.cloud.storage.Client.from_service_account_json(
-            settings.BASE_DIR.joinpath("service_account.json")
-        )
-
-        bucket = storage_client.get_bucket(settings.DEFAULT_BUCKET)
-        blob = bucket.blob(self.blob_name)
-
-        filename = os.path.basename(self.blob_name)
-        return blob.generate_signed_url(
-            datetime.timedelta(minutes=settings.DOCUMENTS_EXPIRATION_TIME),
-            response_disposition=f"inline; filename={filename}",
-        )
+        return document_storage.signed_url(self.blob_name, self.pdf_file_name)
 
     def __str__(self):
         return f"{self.document_type} #{self.order_id}"
@@ -250,3 +279,33 @@ class DocumentSendLog(BaseAbstractModel):
         verbose_name=_("Order"),
     )
     sent = models.BooleanField(default=False)
+
+    @classmethod
+    def create_missing(cls, order_id: int, emails: List[str]) -> List[str]:
+        """
+        Creates the logs of the e-mails which have none for the order yet, with
+        a single insert. Returns the e-mails logged by this call, so that
+        concurrent calls never both claim an e-mail.
+        """
+        if not emails:
+            return []
+
+        table = connection.ops.quote_name(cls._meta.db_table)
+        now = timezone.now()
+        params = []
+
+        for email in emails:
+            params += [email, order_id, False, now, now]
+
+        values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(emails))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} "
+                f"(email, order_id, sent, created_at, updated_at) "
+                f"VALUES {values} "
+                f"ON CONFLICT (email, order_id) DO NOTHING "
+                f"RETURNING email",
+                params,
+            )
+            return [email for (email,) in cursor.fetchall()]
@@ -0,0 +1,181 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import requests
+from django.conf import settings
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from core.metrics import PeriodicLog
+
+
+class PdfBackendMetrics:
+    """
+    Number of requests, errors and response times of the HTML2PDF backend.
+    Logged every `METRICS_LOG_INTERVAL` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._log = PeriodicLog("HTML2PDF requests", self.as_dict)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+
+    def record(self, seconds: float, error: bool):
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+        self._log.tick()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "total_seconds": self.total_seconds,
+                "max_seconds": self.max_seconds,
+                "average_seconds": (
+                    self.total_seconds / self.requests if self.requests else 0.0
+                ),
+            }
+
+
+metrics = PdfBackendMetrics()
+
+
+class PdfCache:
+    """
+    Bounded, process-local index of the PDFs stored already, by the hash of
+    their HTML. PDFs are stored under the hash, see `blob_name`, so documents
+    with the same HTML share one blob. Least recently used entries are
+    dropped beyond `HTML2PDF_CACHE_SIZE` entries. Hits and misses are logged
+    every `METRICS_LOG_INTERVAL` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._log = PeriodicLog("PDF cache", self.stats)
+        self._blob_names = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(html: str) -> str:
+        return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def blob_name(key: str) -> str:
+        return f"documents/pdf/{key}.pdf"
+
+    def get(self, key: str) -> Optional[str]:
+        self._log.tick()
+
+        with self._lock:
+            try:
+                self._blob_names.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return self._blob_names[key]
+
+    def add(self, key: str, blob_name: str):
+        with self._lock:
+            self._blob_names[key] = blob_name
+            self._blob_names.move_to_end(key)
+
+            while len(self._blob_names) > settings.HTML2PDF_CACHE_SIZE:
+                self._blob_names.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._blob_names.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._blob_names)}
+
+
+pdf_cache = PdfCache()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide session with a keep-alive connection pool for the HTML2PDF
+    backend, shared by all threads rendering documents.
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.HTML2PDF_POOL_SIZE,
+                    # Only failed connections are retried, a render may
+                    # have started already once the request was sent
+                    max_retries=Retry(
+                        total=settings.HTML2PDF_RETRIES,
+                        read=0,
+                        status=0,
+                        method_whitelist=False,
+                        backoff_factor=0.2,
+                    ),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+
+    return _session
+
+
+def html_to_pdf(url: str, html: str) -> bytes:
+    started = time.perf_counter()
+    response = None
+
+    try:
+        response = get_session().post(
+            url,
+            html.encode("utf-8"),
+            timeout=(
+                settings.HTML2PDF_CONNECT_TIMEOUT,
+                settings.HTML2PDF_READ_TIMEOUT,
+            ),
+        )
+    except requests.ConnectionError as error:
+        # Without read retries, urllib3 reports a read timeout as exceeded
+        # retries, which requests raises as a connection error
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        if isinstance(reason, ReadTimeoutError):
+            raise requests.ReadTimeout(*error.args, request=error.request) from error
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        error = response is None or response.status_code != 200
+        metrics.record(seconds, error)
+        logger.debug(f"HTML2PDF request took {seconds:.3f}s.")
+
+    if response.status_code != 200:
+        raise RuntimeError(response.content)  # TODO: document error
+
+    return response.content
@@ -0,0 +1,161 @@
+import datetime
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+import google.cloud.storage
+from django.conf import settings
+
+
+class BaseDocumentStorage:
+    def size(self, blob_name: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def read(self, blob_name: str) -> bytes:
+        """
+        The whole blob at once.
+        """
+        raise NotImplementedError
+
+    def chunks(self, blob_name: str, start: int, end: int) -> Iterator[bytes]:
+        """
+        Bytes `start` to `end` (inclusive) of the blob,
+        `DOCUMENTS_STREAM_CHUNK_SIZE` bytes at a time.
+        """
+        raise NotImplementedError
+
+    def read_chunks(self, blob_name: str) -> Iterator[bytes]:
+        """
+        The whole blob, `DOCUMENTS_STREAM_CHUNK_SIZE` bytes at a time. Raises
+        FileNotFoundError if there is no such blob.
+        """
+        size = self.size(blob_name)
+
+        if size is None:
+            raise FileNotFoundError(blob_name)
+
+        return self.chunks(blob_name, 0, size - 1)
+
+
+class FileSystemDocumentStorage(BaseDocumentStorage):
+    """
+    Document PDFs in a local directory, with the blob names as paths.
+    """
+
+    def __init__(self, location: str):
+        self.location = location
+
+    def path(self, blob_name: str) -> str:
+        return os.path.join(self.location, blob_name)
+
+    def size(self, blob_name: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self.path(blob_name))
+        except FileNotFoundError:
+            return None
+
+    def read(self, blob_name: str) -> bytes:
+        with open(self.path(blob_name), "rb") as blob:
+            return blob.read()
+
+    def chunks(self, blob_name: str, start: int, end: int) -> Iterator[bytes]:
+        with open(self.path(blob_name), "rb") as blob:
+            blob.seek(start)
+
+            while start <= end:
+                chunk = blob.read(
+                    min(settings.DOCUMENTS_STREAM_CHUNK_SIZE, end - start + 1)
+                )
+
+                if not chunk:
+                    break
+
+                start += len(chunk)
+                yield chunk
+
+
+class DocumentStorage(BaseDocumentStorage):
+    """
+    Document PDFs in the default bucket of Google Cloud Storage.
+
+    The client and the service account credentials are loaded once per
+    process. Signed download URLs are reused until
+    `DOCUMENTS_SIGNED_URL_MARGIN` seconds before they expire, for at most
+    `DOCUMENTS_SIGNED_URL_CACHE_SIZE` blobs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bucket = None
+        self._signed_urls = OrderedDict()
+
+    @property
+    def bucket(self):
+        with self._lock:
+            if self._bucket is None:
+                client = google.cloud.storage.Client.from_service_account_json(
+                    settings.BASE_DIR.joinpath("service_account.json")
+                )
+                self._bucket = client.get_bucket(settings.DEFAULT_BUCKET)
+
+            return self._bucket
+
+    def clear(self):
+        with self._lock:
+            self._bucket = None
+            self._signed_urls.clear()
+
+    def signed_url(self, blob_name: str, filename: str) -> str:
+        """
+        URL to download the blob as `filename` without credentials.
+        """
+        now = time.monotonic()
+        # Documents with the same content share their blob
+        key = (blob_name, filename)
+
+        with self._lock:
+            valid_until, url = self._signed_urls.get(key, (0, None))
+
+            if valid_until > now:
+                self._signed_urls.move_to_end(key)
+                return url
+
+        expiration = datetime.timedelta(minutes=settings.DOCUMENTS_EXPIRATION_TIME)
+        url = self.bucket.blob(blob_name).generate_signed_url(
+            expiration, response_disposition=f"inline; filename={filename}"
+        )
+
+        with self._lock:
+            self._signed_urls[key] = (
+                now + expiration.total_seconds() - settings.DOCUMENTS_SIGNED_URL_MARGIN,
+                url,
+            )
+            self._signed_urls.move_to_end(key)
+
+            while len(self._signed_urls) > settings.DOCUMENTS_SIGNED_URL_CACHE_SIZE:
+                self._signed_urls.popitem(last=False)
+
+        return url
+
+    def size(self, blob_name: str) -> Optional[int]:
+        blob = self.bucket.get_blob(blob_name)
+        return None if blob is None else blob.size
+
+    def read(self, blob_name: str) -> bytes:
+        return self.bucket.blob(blob_name).download_as_string()
+
+    def upload(self, blob_name: str, data: bytes, content_type: str):
+        self.bucket.blob(blob_name).upload_from_string(data, content_type)
+
+    def chunks(self, blob_name: str, start: int, end: int) -> Iterator[bytes]:
+        blob = self.bucket.blob(blob_name)
+
+        while start <= end:
+            chunk_end = min(start + settings.DOCUMENTS_STREAM_CHUNK_SIZE - 1, end)
+            yield blob.download_as_string(start=start, end=chunk_end)
+            start = chunk_end + 1
+
+
+document_storage = DocumentStorage()
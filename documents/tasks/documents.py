@@ -1,36 +1,40 @@
 import itertools
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import List
+from typing import Dict, List
 
+import requests
 from django.conf import settings
-from django.contrib.auth import get_user_model
-from django.db import transaction, IntegrityError
+from django.db import transaction
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from loguru import logger
+from retrying import Retrying
 from rest_framework import status, views
 from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from core.mixins.storage import StorageMixin
 from core.tasks.mixin import TasksMixin
 from delivery_options.models import DeliveryOption
 from documents import factories
+from documents.loaders import OrderLoader, item_job
 from documents.models import Document, DocumentSendLog
+from documents.pdf import PdfCache, pdf_cache
+from documents.storage import document_storage
 from orders.models import Order
 from payments.mixins import MangopayMixin
 from Traidoo import errors
 
-User = get_user_model()
-
 
 @method_decorator(transaction.non_atomic_requests, name="dispatch")
-class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
+class DocumentsTask(MangopayMixin, TasksMixin, views.APIView):
     permission_classes = (AllowAny,)
 
     @staticmethod
-    def invoices(order: Order, sellers: List[User]):
+    def invoices(loader: OrderLoader):
+        order = loader.order
         documents = []
 
         # Add platform invoice for a buyer only if he is not a cooperative
@@ -38,47 +42,40 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
         if not order.buyer.is_cooperative_member:
             documents.append(
                 factories.BuyerPlatformInvoiceFactory(
-                    order, region=order.buyer.region
+                    order, region=order.buyer.region, loader=loader
                 ).compose()
             )
 
-        if order.has_central_logistics_deliveries:
-            regions = {
-                order_item.product.region
-                for order_item in order.items.select_related("product__region")
-                .filter(delivery_option__id=DeliveryOption.CENTRAL_LOGISTICS)
-                .distinct()
-            }
+        for region in loader.product_regions(
+            lambda item: item.delivery_option_id == DeliveryOption.CENTRAL_LOGISTICS
+        ):
+            documents.append(
+                factories.LogisticsInvoiceFactory(
+                    order, region=region, loader=loader
+                ).compose()
+            )
 
-            for region in regions:
-                documents.append(
-                    factories.LogisticsInvoiceFactory(order, region=region).compose()
-                )
+        third_party_regions = loader.product_regions(
+            lambda item: getattr(item_job(item), "user_id", None) is not None
+        )
 
-        if settings.FEATURES["routes"] and order.has_third_party_deliveries:
+        if settings.FEATURES["routes"] and third_party_regions:
             logger.debug("Generating invoice for a supplier.")
 
-            regions = {
-                order_item.product.region
-                for order_item in order.items.select_related("product__region")
-                .filter(job__user__isnull=False)
-                .distinct()
-            }
-
-            for region in regions:
+            for region in third_party_regions:
                 for document in factories.ThirdPartyLogisticsInvoiceFactory(
-                    order, region=region
+                    order, region=region, loader=loader
                 ).compose():
                     documents.append(document)
 
-        for seller in sellers:
+        for seller in loader.sellers:
             documents.extend(
                 [
                     factories.ProducerInvoiceFactory(
-                        order, region=seller.region, seller=seller
+                        order, region=seller.region, seller=seller, loader=loader
                     ).compose(),
                     factories.PlatformInvoiceFactory(
-                        order, region=seller.region, seller=seller
+                        order, region=seller.region, seller=seller, loader=loader
                     ).compose(),
                 ]
             )
@@ -86,17 +83,20 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
         return documents
 
     @staticmethod
-    def delivery_documents(order: Order, sellers: List[User]):
+    def delivery_documents(loader: OrderLoader):
+        order = loader.order
         documents = []
 
         documents.append(
-            factories.DeliveryOverviewBuyerFactory(order, region=order.region).compose()
+            factories.DeliveryOverviewBuyerFactory(
+                order, region=order.region, loader=loader
+            ).compose()
         )
 
-        for seller in sellers:
+        for seller in loader.sellers:
             documents.append(
                 factories.DeliveryOverviewSellerFactory(
-                    order, region=seller.region, seller=seller
+                    order, region=seller.region, seller=seller, loader=loader
                 ).compose()
             )
 
@@ -106,9 +106,16 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
 
         return documents
 
-    def _add_iban_alias_to_order_confirmation(
-        self, order_confirmation: Document, order: Order
-    ):
+    @staticmethod
+    def needs_banking_alias(order: Order) -> bool:
+        payin_ids = Document.objects.filter(
+            order_id=order.id,
+            document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+        ).values_list("mangopay_payin_id", flat=True)
+
+        return not any(payin_ids)
+
+    def get_banking_alias(self, order: Order) -> Dict:
         wallet = self.get_user_wallet(order.buyer.mangopay_user_id)
         wallet_id = wallet.get("Id")
 
@@ -116,36 +123,65 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
         banking_alias = self.get_wallet_banking_alias(wallet_id)
 
         if banking_alias:
-            iban = banking_alias["iban"]
-            bic = banking_alias["bic"]
-            owner_name = banking_alias["owner_name"]
-        else:
-            banking_alias = self.mangopay.create_banking_alias_iban(
-                user_id=order.buyer.mangopay_user_id,
-                wallet_id=wallet_id,
-                name=order.buyer.get_full_name(),
-            )
-            iban = banking_alias["IBAN"]
-            bic = banking_alias["BIC"]
-            owner_name = banking_alias["OwnerName"]
+            return {
+                "iban": banking_alias["iban"],
+                "bic": banking_alias["bic"],
+                "owner_name": banking_alias["owner_name"],
+            }
+
+        banking_alias = self.mangopay.create_banking_alias_iban(
+            user_id=order.buyer.mangopay_user_id,
+            wallet_id=wallet_id,
+            name=order.buyer.get_full_name(),
+        )
+        return {
+            "iban": banking_alias["IBAN"],
+            "bic": banking_alias["BIC"],
+            "owner_name": banking_alias["OwnerName"],
+        }
+
+    @staticmethod
+    def _add_iban_alias_to_order_confirmation(
+        order_confirmation: Document, banking_alias: Dict
+    ):
+        order_confirmation.seller["iban"] = banking_alias["iban"]
+        order_confirmation.seller["bic"] = banking_alias["bic"]
+        order_confirmation.bank_account_owner = banking_alias["owner_name"]
+
+    @staticmethod
+    def save_documents(documents: List[Document]):
+        new_documents = [document for document in documents if document.pk is None]
+        existing_documents = [
+            document for document in documents if document.pk is not None
+        ]
+
+        Document.objects.bulk_create(new_documents)
 
-        order_confirmation.seller["iban"] = iban
-        order_confirmation.seller["bic"] = bic
-        order_confirmation.bank_account_owner = owner_name
-        order_confirmation.save()
+        now = timezone.now()
+        for document in existing_documents:
+            document.updated_at = now
+
+        Document.objects.bulk_update(
+            existing_documents, ["seller", "bank_account_owner", "updated_at"]
+        )
 
     @transaction.atomic
-    def create_documents(self, order):
-        sellers = {item.product.seller for item in order.items.all()}
+    def create_documents(self, order: Order, banking_alias: Dict = None):
+        """
+        Composes and saves all documents of the order. Mangopay is not called
+        here, the buyer's banking alias for the order confirmation is looked
+        up before the transaction opens.
+        """
+        loader = OrderLoader(order)
 
         order_confirmation = factories.OrderConfirmationBuyerFactory(
-            order, region=order.region
+            order, region=order.region, loader=loader
         ).compose()
 
         documents = list(
             itertools.chain(
-                self.invoices(order, sellers),
-                self.delivery_documents(order, sellers),
+                self.invoices(loader),
+                self.delivery_documents(loader),
                 [order_confirmation],
             )
         )
@@ -157,12 +193,14 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
             and order.setting.central_share < Decimal("100")
         ):
             credit_note = factories.CreditNoteFactory(
-                order, region=order.region
+                order, region=order.region, loader=loader
             ).compose()
             documents.append(credit_note)
 
-        if not order_confirmation.mangopay_payin_id:
-            self._add_iban_alias_to_order_confirmation(order_confirmation, order)
+        if banking_alias and not order_confirmation.mangopay_payin_id:
+            self._add_iban_alias_to_order_confirmation(
+                order_confirmation, banking_alias
+            )
 
         for document in documents:
             if "Invoice" in document.document_type:
@@ -175,41 +213,84 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
                 document.seller["bank"] = None
 
         logger.debug(f"Number of documents: {len(documents)}.")
-        [document.save() for document in documents]
+        self.save_documents(documents)
         return documents
 
     def create_document_sending_tasks(self, documents, order):
         emails = itertools.chain(*[document.receivers_emails for document in documents])
-        emails = set(emails)
-        for email in emails:
-            try:
-                with transaction.atomic():
-                    send_log, created = DocumentSendLog.objects.get_or_create(
-                        email=email, order_id=order.id
-                    )
-                    if not send_log.sent and created:
-                        self.send_task(
-                            reverse(
-                                "mail-documents",
-                                kwargs={"order_id": order.id, "email": email},
-                            ),
-                            queue_name="documents-emails",
-                        )
-            except IntegrityError:
-                logger.debug(f"Document task already created for {email} {order.id}")
-                pass
+        # Only e-mails logged by this run are sent, an overlapping run for the
+        # same order sends the others
+        new_emails = sorted(
+            DocumentSendLog.create_missing(order.id, sorted(set(emails)))
+        )
 
-    def render_pdfs(self, documents, order):
-        pdfs = [document.render_pdf() for document in documents]
-        stored_blobs = [
-            self._store(f"documents/{order.id}/{document.pdf_file_name}", data)
-            for document, data in zip(documents, pdfs)
+        errors = self.send_tasks(
+            [
+                {
+                    "url": reverse(
+                        "mail-documents", kwargs={"order_id": order.id, "email": email}
+                    ),
+                    "queue_name": "documents-emails",
+                }
+                for email in new_emails
+            ]
+        )
+        failed_emails = [
+            email for email, error in zip(new_emails, errors) if error is not None
         ]
-        logger.debug(f"Number of stored PDF files: {len(stored_blobs)}.")
-        for document, blob in zip(documents, stored_blobs):
-            document.blob_name = blob.name
-        [document.save(update_fields=["blob_name"]) for document in documents]
-        return stored_blobs
+
+        if failed_emails:
+            # Without their logs, the next run creates their tasks again
+            DocumentSendLog.objects.filter(
+                order_id=order.id, email__in=failed_emails, sent=False
+            ).delete()
+            self.raise_first_error(errors)
+
+    def _render_and_store(self, document: Document, html: str) -> str:
+        key = pdf_cache.key(html)
+        blob_name = pdf_cache.get(key)
+
+        if blob_name and document_storage.size(blob_name) is not None:
+            logger.debug(f"Reusing {blob_name} for document {document.id}.")
+            return blob_name
+
+        blob_name = PdfCache.blob_name(key)
+
+        retrying = Retrying(
+            # A render which timed out may still be running in the backend
+            retry_on_exception=lambda error: not isinstance(
+                error, requests.ReadTimeout
+            ),
+            stop_max_attempt_number=settings.DOCUMENTS_RENDER_ATTEMPTS,
+            wait_exponential_multiplier=settings.DOCUMENTS_RENDER_RETRY_WAIT,
+            wait_exponential_max=10000,
+        )
+        retrying.call(
+            lambda: document_storage.upload(
+                blob_name, document.render_pdf(html), "application/pdf"
+            )
+        )
+        pdf_cache.add(key, blob_name)
+
+        return blob_name
+
+    def render_pdfs(self, documents, order):
+        # Templates read from the database, so they are rendered here. Only
+        # PDF conversion and upload run in the worker threads.
+        jobs = [(document, document.render_html()) for document in documents]
+
+        with ThreadPoolExecutor(
+            max_workers=settings.DOCUMENTS_RENDER_WORKERS
+        ) as executor:
+            blob_names = list(
+                executor.map(lambda job: self._render_and_store(*job), jobs)
+            )
+
+        logger.debug(f"Number of stored PDF files: {len(set(blob_names))}.")
+        for document, blob_name in zip(documents, blob_names):
+            document.blob_name = blob_name
+        Document.objects.bulk_update(documents, ["blob_name"])
+        return blob_names
 
     def post(
         self, request: Request, order_id: str, document_set: str, format: str = None
@@ -217,10 +298,8 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
         order_id = int(order_id)
 
         try:
-            order = (
-                Order.objects.select_related("buyer__region", "region")
-                .prefetch_related("items__product__seller")
-                .get(pk=order_id)
+            order = Order.objects.select_related("buyer__region", "region").get(
+                pk=order_id
             )
         except Order.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -231,7 +310,10 @@ class DocumentsTask(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
                 f"Admin should activate his account"
             )
 
-        documents = self.create_documents(order)
+        banking_alias = (
+            self.get_banking_alias(order) if self.needs_banking_alias(order) else None
+        )
+        documents = self.create_documents(order, banking_alias)
         self.render_pdfs(documents, order)
         self.create_document_sending_tasks(documents, order)
 
@@ -3,16 +3,24 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from trans import trans
 
-from core.mixins.storage import StorageMixin
 from core.permissions.cron_or_task import IsCronOrTask
 from documents.models import Document, DocumentSendLog
+from documents.storage import document_storage
 from mails.utils import send_mail
 from orders.models import Order
 
 
-class MailDocumentsTask(StorageMixin, views.APIView):
+class MailDocumentsTask(views.APIView):
     permission_classes = (IsCronOrTask,)
 
+    @staticmethod
+    def _attachment(document: Document):
+        return (
+            trans(document.pdf_file_name),
+            document_storage.read(document.blob_name),
+            "application/pdf",
+        )
+
     def post(self, request: Request, order_id: str, email: str):
         documents = Document.objects.filter(order_id=order_id)
         order = Order.objects.get(id=order_id)
@@ -20,10 +28,6 @@ class MailDocumentsTask(StorageMixin, views.APIView):
             document for document in documents if email in document.receivers_emails
         ]
 
-        attachments_as_blobs = [
-            self.bucket.blob(document.blob_name) for document in documents_to_send
-        ]
-
         send_log = DocumentSendLog.objects.select_for_update().get(
             order_id=order_id, email=email
         )
@@ -41,12 +45,7 @@ class MailDocumentsTask(StorageMixin, views.APIView):
                     )
                 },
                 attachments=[
-                    (
-                        trans(blob.name.split("/")[-1]),
-                        blob.download_as_string(),
-                        blob.content_type,
-                    )
-                    for blob in attachments_as_blobs
+                    self._attachment(document) for document in documents_to_send
                 ],
             )
             send_log.sent = True
@@ -1,4 +1,16 @@
+import datetime
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
 import pytest
+from django.utils import timezone
+from model_bakery import baker
+
+from documents.models import Document
+from documents.pdf import pdf_cache
+from documents.storage import document_storage
 
 
 @pytest.fixture(autouse=True)
@@ -6,3 +18,112 @@ def bucket(bucket):
     bucket.return_value.blob.return_value.download_as_string.return_value = "data"
     bucket.return_value.blob.return_value.content_type = "text/plain"
     yield bucket
+
+
+@pytest.fixture(autouse=True)
+def clear_pdf_cache():
+    pdf_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_document_storage():
+    document_storage.clear()
+
+
+class FakePdfBackend(BaseHTTPRequestHandler):
+    """
+    Returns the posted HTML as "PDF", failing once for flaky documents and
+    answering slow documents after a second.
+    """
+
+    protocol_version = "HTTP/1.1"
+    failed = set()
+    connections = set()
+    received = []
+
+    def do_POST(self):
+        self.connections.add(self.client_address)
+        html = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append(html)
+
+        if b"slow" in html:
+            time.sleep(1)
+
+        if b"flaky" in html and html not in self.failed:
+            self.failed.add(html)
+            self.send_response(502)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(html) + 4))
+        self.end_headers()
+        self.wfile.write(b"PDF " + html)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def pdf_backend():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePdfBackend)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    with mock.patch.object(
+        Document, "PDF_BACKEND", f"http://127.0.0.1:{server.server_port}"
+    ):
+        yield server
+
+    server.shutdown()
+    server.server_close()
+    FakePdfBackend.failed.clear()
+    FakePdfBackend.connections.clear()
+    FakePdfBackend.received.clear()
+
+
+@pytest.fixture
+def make_order(buyer, traidoo_region, delivery_address, delivery_options):
+    def make_order(sellers):
+        order = baker.make(
+            "orders.order",
+            buyer=buyer,
+            region=traidoo_region,
+            earliest_delivery_date=timezone.make_aware(datetime.datetime.today()),
+        )
+        container = baker.make("containers.container", deposit=3.2)
+
+        for seller in baker.make_recipe(
+            "users.user", region=traidoo_region, _quantity=sellers
+        ):
+            for delivery_option in delivery_options[:2]:
+                product = baker.make(
+                    "products.product",
+                    seller=seller,
+                    region=traidoo_region,
+                    price=10,
+                    container_type=container,
+                    third_party_delivery=True,
+                    delivery_options=delivery_options,
+                )
+                order_item = baker.make(
+                    "orders.orderitem",
+                    product=product,
+                    order=order,
+                    quantity=2,
+                    delivery_fee=1,
+                    delivery_address=delivery_address,
+                    delivery_option=delivery_option,
+                    latest_delivery_date=timezone.now().date()
+                    + datetime.timedelta(days=3),
+                )
+                baker.make(
+                    "jobs.Job",
+                    order_item=order_item,
+                    user=baker.make_recipe("users.user", region=traidoo_region),
+                )
+
+        return order
+
+    return make_order
@@ -0,0 +1,34 @@
+import pytest
+from django.core.management import call_command
+
+from documents.models import Document
+
+pytestmark = pytest.mark.django_db
+
+LINES = [{"amount": 2, "price": 5, "vat_rate": 7, "count": 3, "seller_user_id": 1}]
+
+
+def test_backfill_document_totals(order):
+    documents = [Document.objects.create(order=order, lines=LINES) for _ in range(3)]
+    Document.objects.create(order=order, lines=None)
+
+    call_command("backfill_document_totals", batch_size=2)
+
+    for document in documents:
+        document.refresh_from_db()
+        assert document.gross_cents == 3210
+        assert document.net_cents == 3000
+
+
+def test_backfill_only_documents_without_totals(order):
+    document = Document.objects.create(
+        order=order, lines=LINES, gross_cents=1, net_cents=1
+    )
+
+    call_command("backfill_document_totals")
+    document.refresh_from_db()
+    assert document.gross_cents == 1
+
+    call_command("backfill_document_totals", all=True)
+    document.refresh_from_db()
+    assert document.gross_cents == 3210
@@ -58,6 +58,45 @@ def test_total_price():
     assert document.price_gross == 3 * 10 * 2 * 1.20
 
 
+def test_update_totals():
+    document = Document()
+    document.lines = [
+        {"amount": 3, "price": 10, "vat_rate": 20, "count": 2, "seller_user_id": 1},
+        {"amount": 1, "price": 0.35, "vat_rate": 7, "count": 3, "seller_user_id": 2},
+    ]
+
+    document.update_totals()
+
+    assert document.net_cents == 6105
+    assert document.gross_cents == document.price_gross_cents == 7312
+
+
+def test_composed_documents_have_totals(document_factories):
+    for factory, arguments in document_factories:
+        documents = factory(**arguments).compose()
+
+        if isinstance(documents, Document):
+            documents = [documents]
+
+        for document in documents:
+            assert document.gross_cents == document.price_gross_cents
+            assert document.net_cents == round(document.price * 100)
+
+
+def test_sum_gross_cents(order, django_assert_num_queries):
+    lines = [{"amount": 1, "price": 10, "vat_rate": 19, "count": 1}]
+    stored = Document(order=order, lines=lines)
+    stored.update_totals()
+    stored.save()
+    Document.objects.create(order=order, lines=lines)
+
+    with django_assert_num_queries(1):
+        assert Document.objects.filter(id=stored.id).gross_cents() == 1190
+
+    assert Document.objects.filter(order=order).gross_cents() == 2 * 1190
+    assert Document.objects.none().gross_cents() == 0
+
+
 def test_templates_syntax(document_factories):
     for factory, arguments in document_factories:
         factory(**arguments).compose().render_html()
@@ -4,11 +4,16 @@ from unittest import mock
 
 import pytest
 from anymail.exceptions import AnymailError
+from django.conf import settings
+from django.db import connection
 from django.urls import reverse
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
 
 from documents.models import Document, DocumentSendLog
+from documents.tasks.documents import DocumentsTask
+from orders.models import Order
 from Traidoo import errors
 
 pytestmark = pytest.mark.django_db
@@ -39,6 +44,16 @@ def user_wallet():
         yield get_user_wallet
 
 
+@pytest.fixture(autouse=True)
+def bucket(bucket):
+    with mock.patch(
+        "documents.storage.DocumentStorage.bucket",
+        new_callable=mock.PropertyMock,
+        return_value=bucket.return_value,
+    ):
+        yield bucket
+
+
 @pytest.fixture(autouse=True)
 def render_pdf():
     with mock.patch("documents.models.Document.render_pdf") as render:
@@ -57,7 +72,8 @@ def test_documents_stored_in_storage(bucket, client, order, order_items, buyer):
 
     blob = bucket.return_value.blob
     for document in documents:
-        blob.assert_any_call(f"documents/{order.id}/{document.pdf_file_name}".encode())
+        assert document.blob_name.startswith("documents/pdf/")
+        blob.assert_any_call(document.blob_name)
 
     upload_from_string = blob.return_value.upload_from_string
     assert upload_from_string.call_count == 8
@@ -71,7 +87,7 @@ def test_do_not_duplicate_documents(bucket, client, order, order_items, buyer):
     assert documents.count() == 7
 
 
-@override_settings(FEATURES={"routes": True})
+@override_settings(FEATURES={**settings.FEATURES, "routes": True})
 def test_documents_stored_in_storage_with_third_party_delivery(
     bucket,
     products,
@@ -103,7 +119,8 @@ def test_documents_stored_in_storage_with_third_party_delivery(
     assert documents.count() == 8
     blob = bucket.return_value.blob
     for document in documents:
-        blob.assert_any_call(f"documents/{order.id}/{document.pdf_file_name}".encode())
+        assert document.blob_name.startswith("documents/pdf/")
+        blob.assert_any_call(document.blob_name)
 
     upload_from_string = blob.return_value.upload_from_string
     assert upload_from_string.call_count == 8
@@ -372,3 +389,86 @@ def test_do_not_duplicate_send_documents_tasks(client, order, order_items, send_
         )
         not in send_task.mock_calls
     )
+
+
+@override_settings(FEATURES={**settings.FEATURES, "routes": True})
+def test_create_documents_with_constant_queries(make_order):
+    query_counts = []
+
+    for sellers in (1, 4):
+        order_id = make_order(sellers).id
+        banking_alias = {"iban": "DE1234", "bic": "BIC", "owner_name": "Test"}
+
+        with CaptureQueriesContext(connection) as context:
+            order = Order.objects.select_related("buyer__region", "region").get(
+                pk=order_id
+            )
+            DocumentsTask().create_documents(order, banking_alias)
+        query_counts.append(len(context.captured_queries))
+
+        order_confirmation = Document.objects.get(
+            order=order, document_type="Order Confirmation Buyer"
+        )
+        assert order_confirmation.seller["iban"] == "DE1234"
+
+    assert query_counts[0] == query_counts[1]
+
+
+def test_get_banking_alias_outside_of_transaction(
+    client, order, order_items, banking_alias
+):
+    savepoints = len(connection.savepoint_ids)
+
+    def get_wallet_banking_alias(wallet_id):
+        # No transaction of the task is open
+        assert len(connection.savepoint_ids) == savepoints
+        return banking_alias.return_value
+
+    banking_alias.side_effect = get_wallet_banking_alias
+
+    client.post(reverse("task", kwargs={"order_id": order.id, "document_set": "all"}))
+
+    banking_alias.assert_called_once_with("wallet-1")
+
+
+def test_do_not_get_banking_alias_for_paid_order_confirmation(
+    client, order, order_items, banking_alias, user_wallet
+):
+    client.post(reverse("task", kwargs={"order_id": order.id, "document_set": "all"}))
+    Document.objects.filter(document_type="Order Confirmation Buyer").update(
+        mangopay_payin_id="payin-1"
+    )
+    user_wallet.reset_mock()
+    banking_alias.reset_mock()
+
+    client.post(reverse("task", kwargs={"order_id": order.id, "document_set": "all"}))
+
+    user_wallet.assert_not_called()
+    banking_alias.assert_not_called()
+
+
+def test_create_send_logs_in_one_insert(order, order_items, send_task):
+    task = DocumentsTask()
+    documents = task.create_documents(order)
+    DocumentSendLog.objects.create(email=order.buyer.email, order_id=order.id)
+
+    with CaptureQueriesContext(connection) as context:
+        task.create_document_sending_tasks(documents, order)
+
+    assert len(context.captured_queries) == 1
+    emails = {call.args[0].split("/")[-1] for call in send_task.call_args_list}
+    assert order.buyer.email not in emails
+    assert set(
+        DocumentSendLog.objects.filter(order=order).values_list("email", flat=True)
+    ) == emails | {order.buyer.email}
+
+
+def test_create_missing_send_logs_returns_only_created_emails(order):
+    DocumentSendLog.objects.create(email="logged@example.com", order_id=order.id)
+
+    created = DocumentSendLog.create_missing(
+        order.id, ["logged@example.com", "new@example.com"]
+    )
+
+    assert created == ["new@example.com"]
+    assert DocumentSendLog.create_missing(order.id, ["new@example.com"]) == []
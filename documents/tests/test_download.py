@@ -3,6 +3,7 @@ from unittest import mock
 
 import pytest
 from django.conf import settings
+from django.test import override_settings
 from django.urls import reverse
 from model_bakery import baker
 
@@ -78,14 +79,18 @@ def test_download_document(
     document = baker.make(
         Document,
         order=order,
-        blob_name="documents/123/document.pdf",
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+        blob_name="documents/pdf/0123456789.pdf",
         seller={"user_id": seller.id if user_type == "seller" else seller.id + 1},
         buyer={"user_id": buyer.id if user_type == "buyer" else buyer.id + 1},
     )
 
     response = client.get(f"/documents/{document.id}/download")
 
-    assert response.json() == {"url": "https://example.com", "filename": "document.pdf"}
+    assert response.json() == {
+        "url": "https://example.com",
+        "filename": f"{order.id}-{document.id}-order_confirmation_buyer.pdf",
+    }
 
     storage.from_service_account_json.assert_called_once_with(mock.ANY)
     storage.from_service_account_json().get_bucket.assert_called_once_with(
@@ -96,7 +101,9 @@ def test_download_document(
     )
     storage.from_service_account_json().get_bucket().blob().generate_signed_url.assert_called_once_with(
         datetime.timedelta(seconds=60),
-        response_disposition="inline; filename=document.pdf",
+        response_disposition=(
+            f"inline; filename={order.id}-{document.id}-order_confirmation_buyer.pdf"
+        ),
     )
 
 
@@ -105,6 +112,7 @@ def test_admin_download(db, client, order, storage, admin):
         Document,
         order=order,
         blob_name="documents/123/document.pdf",
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
         seller={"region_id": admin.region_id},
         buyer={"region_id": admin.region_id},
     )
@@ -134,3 +142,120 @@ def test_deny_other_region_admin_download_document(
         reverse("admin-document-download", kwargs={"document_id": document.id})
     )
     assert response.status_code == 403
+
+
+PDF = b"%PDF-1.4 0123456789"
+
+
+@pytest.fixture
+def document(order, buyer, seller):
+    buyer.is_email_verified = True
+    buyer.save()
+
+    return baker.make(
+        Document,
+        order=order,
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+        blob_name="documents/123/document.pdf",
+        seller={"user_id": seller.id},
+        buyer={"user_id": buyer.id},
+    )
+
+
+@pytest.fixture
+def stored_pdf(storage):
+    bucket = storage.from_service_account_json.return_value.get_bucket.return_value
+    bucket.get_blob.return_value.size = len(PDF)
+    bucket.blob.return_value.download_as_string.side_effect = lambda start, end: PDF[
+        start : end + 1
+    ]
+    yield bucket
+
+
+@pytest.mark.django_db
+def test_reuse_signed_download_url(client_buyer, document, storage):
+    with mock.patch("documents.storage.time.monotonic", return_value=1000):
+        for _ in range(3):
+            response = client_buyer.get(f"/documents/{document.id}/download")
+            assert response.json()["url"] == "https://example.com"
+
+    with mock.patch("documents.storage.time.monotonic", return_value=1051):
+        client_buyer.get(f"/documents/{document.id}/download")
+
+    storage.from_service_account_json.assert_called_once_with(mock.ANY)
+    blob = storage.from_service_account_json().get_bucket().blob()
+    assert blob.generate_signed_url.call_count == 2
+
+
+@pytest.mark.django_db
+@override_settings(DOCUMENTS_STREAM_CHUNK_SIZE=4)
+def test_stream_document(client_buyer, document, stored_pdf):
+    response = client_buyer.get(f"/documents/{document.id}/stream")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/pdf"
+    assert response["Content-Length"] == str(len(PDF))
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["Content-Disposition"] == (
+        f"inline; filename={document.pdf_file_name}"
+    )
+    assert list(response.streaming_content) == [
+        PDF[start : start + 4] for start in range(0, len(PDF), 4)
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "range_header,content_range,content",
+    [
+        ("bytes=0-3", "bytes 0-3/19", PDF[:4]),
+        ("bytes=9-", "bytes 9-18/19", PDF[9:]),
+        ("bytes=-5", "bytes 14-18/19", PDF[-5:]),
+        ("bytes=15-100", "bytes 15-18/19", PDF[15:]),
+    ],
+)
+def test_stream_document_range(
+    client_buyer, document, stored_pdf, range_header, content_range, content
+):
+    response = client_buyer.get(
+        f"/documents/{document.id}/stream", HTTP_RANGE=range_header
+    )
+
+    assert response.status_code == 206
+    assert response["Content-Range"] == content_range
+    assert response["Content-Length"] == str(len(content))
+    assert b"".join(response.streaming_content) == content
+
+
+@pytest.mark.django_db
+def test_stream_document_unsatisfiable_range(client_buyer, document, stored_pdf):
+    response = client_buyer.get(
+        f"/documents/{document.id}/stream", HTTP_RANGE="bytes=19-"
+    )
+
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */19"
+
+
+@pytest.mark.django_db
+def test_stream_document_ignores_unsupported_range(client_buyer, document, stored_pdf):
+    response = client_buyer.get(
+        f"/documents/{document.id}/stream", HTTP_RANGE="bytes=0-1,4-5"
+    )
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == PDF
+
+
+@pytest.mark.django_db
+def test_stream_document_with_incorrect_permissions(
+    client_seller, document, stored_pdf, seller
+):
+    seller.is_email_verified = True
+    seller.save()
+    document.seller = {"user_id": seller.id + 1}
+    document.save()
+
+    response = client_seller.get(f"/documents/{document.id}/stream")
+
+    assert response.status_code == 403
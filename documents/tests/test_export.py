@@ -0,0 +1,162 @@
+import datetime
+import io
+import os
+import zipfile
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from model_bakery import baker
+
+from documents.models import Document
+from documents.storage import FileSystemDocumentStorage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def file_storage(tmp_path):
+    storage = FileSystemDocumentStorage(str(tmp_path))
+
+    with mock.patch("documents.views.export.document_storage", storage):
+        yield storage
+
+
+@pytest.fixture
+def make_document(file_storage, order, buyer, seller):
+    def make_document(content=b"%PDF", blob_name=None, **kwargs):
+        kwargs = {
+            "seller": {"user_id": seller.id, "region_id": seller.region_id},
+            "buyer": {"user_id": buyer.id, "region_id": buyer.region_id},
+            **kwargs,
+        }
+        document = baker.make(
+            Document,
+            order=order,
+            document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+            **kwargs,
+        )
+        document.blob_name = blob_name or f"documents/{order.id}/{document.id}.pdf"
+        document.save()
+
+        if content is not None:
+            path = file_storage.path(document.blob_name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as blob:
+                blob.write(content)
+
+        return document
+
+    return make_document
+
+
+@pytest.fixture
+def client_buyer(client_buyer, buyer):
+    buyer.is_email_verified = True
+    buyer.save()
+    yield client_buyer
+
+
+def unzip(response):
+    assert response["Content-Type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+    return {name: archive.read(name) for name in archive.namelist()}
+
+
+def test_export_order_documents(client_buyer, order, make_document):
+    first = make_document(b"first")
+    second = make_document(b"second")
+    make_document(b"other", seller={"user_id": 0}, buyer={"user_id": 0})
+
+    response = client_buyer.get(f"/documents/export/orders/{order.id}")
+
+    assert response.status_code == 200
+    assert (
+        response["Content-Disposition"]
+        == f"attachment; filename=order-{order.id}-documents.zip"
+    )
+    assert unzip(response) == {
+        first.pdf_file_name: b"first",
+        second.pdf_file_name: b"second",
+    }
+
+
+@override_settings(DOCUMENTS_STREAM_CHUNK_SIZE=1024)
+def test_export_streams_documents_in_chunks(client_buyer, order, make_document):
+    content = os.urandom(10 * 1024)
+    document = make_document(content)
+
+    response = client_buyer.get(f"/documents/export/orders/{order.id}")
+    parts = list(response.streaming_content)
+
+    assert len(parts) > 10
+    assert max(len(part) for part in parts) < 2 * 1024
+    assert (
+        zipfile.ZipFile(io.BytesIO(b"".join(parts))).read(document.pdf_file_name)
+        == content
+    )
+
+
+def test_export_skips_documents_without_pdf(client_buyer, order, make_document):
+    document = make_document(b"stored")
+    make_document(content=None)
+
+    response = client_buyer.get(f"/documents/export/orders/{order.id}")
+
+    assert unzip(response) == {document.pdf_file_name: b"stored"}
+
+
+def test_export_order_without_documents_of_user(client_buyer, order, make_document):
+    make_document(b"other", seller={"user_id": 0}, buyer={"user_id": 0})
+
+    response = client_buyer.get(f"/documents/export/orders/{order.id}")
+
+    assert response.status_code == 404
+
+
+def test_export_documents_of_date_range(client_buyer, buyer, make_document):
+    today = timezone.localdate()
+    document = make_document(b"today")
+    old_document = make_document(b"old")
+    Document.objects.filter(id=old_document.id).update(
+        created_at=timezone.now() - datetime.timedelta(days=10)
+    )
+
+    response = client_buyer.get(
+        "/documents/export",
+        {"start": today - datetime.timedelta(days=1), "end": today},
+    )
+
+    assert response.status_code == 200
+    assert unzip(response) == {document.pdf_file_name: b"today"}
+
+
+def test_export_documents_of_other_user(client_buyer, seller, make_document):
+    today = timezone.localdate()
+
+    response = client_buyer.get(
+        "/documents/export", {"start": today, "end": today, "user": seller.id}
+    )
+
+    assert response.status_code == 403
+
+
+def test_admin_exports_documents_of_seller(client, admin, seller, make_document):
+    today = timezone.localdate()
+    document = make_document(b"document")
+    client.force_authenticate(user=admin)
+
+    response = client.get(
+        "/documents/export", {"start": today, "end": today, "user": seller.id}
+    )
+
+    assert unzip(response) == {document.pdf_file_name: b"document"}
+
+
+def test_export_documents_with_invalid_range(client_buyer):
+    response = client_buyer.get(
+        "/documents/export", {"start": "2020-02-01", "end": "2020-01-01"}
+    )
+
+    assert response.status_code == 400
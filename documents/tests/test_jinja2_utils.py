@@ -0,0 +1,22 @@
+from documents import jinja2_utils
+
+
+def test_warmup_compiles_templates():
+    jinja2_utils.get_env.cache_clear()
+
+    try:
+        timings = jinja2_utils.warmup_templates()
+        env = jinja2_utils.get_env()
+
+        assert "documents/invoice_producer.html" in timings
+        assert all(seconds >= 0 for seconds in timings.values())
+        assert env.get_template("documents/invoice_producer.html") is env.get_template(
+            "documents/invoice_producer.html"
+        )
+        assert len(env.cache) == len(timings)
+    finally:
+        jinja2_utils.get_env.cache_clear()
+
+
+def test_environment_is_shared():
+    assert jinja2_utils.get_env() is jinja2_utils.get_env()
@@ -0,0 +1,90 @@
+import datetime
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+
+from documents import factories
+from documents.loaders import OrderLoader
+from documents.tasks.documents import DocumentsTask
+from orders.models import Order
+
+pytestmark = pytest.mark.django_db
+
+
+def test_merge_items_of_a_product(order, order_items, products, delivery_options):
+    baker.make(
+        "orders.orderitem",
+        product=products[0],
+        quantity=4,
+        order=order,
+        delivery_option=delivery_options[0],
+        latest_delivery_date=timezone.now().date() + datetime.timedelta(days=4),
+    )
+    loader = OrderLoader(order)
+
+    merged = loader.merged_items()
+
+    assert [(item.product, item.quantity) for item in merged] == [
+        (products[0], 7),
+        (products[1], 2),
+    ]
+    assert [item.quantity for item in loader.items] == [3, 4, 2]
+
+
+@override_settings(FEATURES={**settings.FEATURES, "routes": True})
+def test_compose_documents_with_constant_queries(make_order, buyer):
+    buyer.is_cooperative_member = False
+    buyer.save()
+
+    query_counts = []
+
+    for sellers in (1, 4):
+        order_id = make_order(sellers).id
+
+        with CaptureQueriesContext(connection) as context:
+            order = Order.objects.select_related("buyer__region", "region").get(
+                pk=order_id
+            )
+            loader = OrderLoader(order)
+            documents = [
+                *DocumentsTask.invoices(loader),
+                *DocumentsTask.delivery_documents(loader),
+                factories.OrderConfirmationBuyerFactory(
+                    order, region=order.region, loader=loader
+                ).compose(),
+            ]
+        query_counts.append(len(context.captured_queries))
+
+        # Buyer platform invoice, logistics invoice, delivery overview for
+        # the buyer and order confirmation, and per seller a producer invoice,
+        # platform invoice, delivery overview and third party invoice
+        assert len(documents) == 4 + sellers * 4
+
+    assert query_counts[0] == query_counts[1]
+
+
+def test_compose_existing_document(order, order_items, traidoo_region, seller):
+    invoice = factories.ProducerInvoiceFactory(
+        order, region=traidoo_region, seller=seller
+    ).compose()
+    invoice.save()
+
+    loader = OrderLoader(order)
+
+    assert (
+        factories.ProducerInvoiceFactory(
+            order, region=traidoo_region, seller=seller, loader=loader
+        ).compose()
+        == invoice
+    )
+    assert (
+        factories.DeliveryOverviewSellerFactory(
+            order, region=traidoo_region, seller=seller, loader=loader
+        ).compose()
+        != invoice
+    )
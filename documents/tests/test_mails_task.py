@@ -1,22 +1,43 @@
+import os
+from unittest import mock
+
+import pytest
 from django.urls import reverse
 from model_bakery import baker
 
 from documents.factories import DocumentFactory
 from documents.models import DocumentSendLog
+from documents.storage import FileSystemDocumentStorage
+
+BLOB_NAME = "documents/1/order_confirmation_buyer.pdf"
+
+
+@pytest.fixture(autouse=True)
+def file_storage(tmp_path):
+    storage = FileSystemDocumentStorage(str(tmp_path))
+    os.makedirs(os.path.dirname(storage.path(BLOB_NAME)))
+
+    with open(storage.path(BLOB_NAME), "wb") as blob:
+        blob.write(b"%PDF")
+
+    with mock.patch("documents.tasks.mails.document_storage", storage):
+        yield storage
 
 
 def test_send_documents_for_the_order(
-    client_task, mailoutbox,
+    client_task,
+    mailoutbox,
 ):
     region = baker.make_recipe("common.region")
     buyer = baker.make_recipe("users.user", region=region)
     order = baker.make_recipe("orders.order", region=region, buyer=buyer)
     platform_user = baker.make_recipe("users.user", region=region)
-    baker.make_recipe(
+    document = baker.make_recipe(
         "documents.order_confirmation",
         buyer=DocumentFactory.as_dict(order.buyer),
         seller=DocumentFactory.as_dict(platform_user),
         order=order,
+        blob_name=BLOB_NAME,
     )
     DocumentSendLog.objects.create(
         order_id=order.id, email=order.buyer.email, sent=False
@@ -29,6 +50,13 @@ def test_send_documents_for_the_order(
 
     assert len(mailoutbox) == 1
     assert mailoutbox[0].to[0] == order.buyer.email
+    assert mailoutbox[0].attachments == [
+        (
+            f"{order.id}-{document.id}-order_confirmation_buyer.pdf",
+            b"%PDF",
+            "application/pdf",
+        )
+    ]
     assert response.status_code == 200
 
 
@@ -42,6 +70,7 @@ def test_track_sending_emails(mailoutbox, client_task):
         buyer=DocumentFactory.as_dict(order.buyer),
         seller=DocumentFactory.as_dict(platform_user),
         order=order,
+        blob_name=BLOB_NAME,
     )
 
     DocumentSendLog.objects.create(
@@ -69,6 +98,7 @@ def test_do_not_resend_documents_at_rerun(mailoutbox, client_task):
         buyer=DocumentFactory.as_dict(order.buyer),
         seller=DocumentFactory.as_dict(platform_user),
         order=order,
+        blob_name=BLOB_NAME,
     )
 
     DocumentSendLog.objects.create(email=buyer.email, order=order, sent=True)
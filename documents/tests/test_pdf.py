@@ -0,0 +1,78 @@
+from unittest import mock
+
+import pytest
+import requests
+
+from documents.models import Document
+from documents.pdf import PdfCache, html_to_pdf, metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+
+def test_connection_is_reused(pdf_backend):
+    for index in range(5):
+        assert html_to_pdf(Document.PDF_BACKEND, f"html {index}") == (
+            f"PDF html {index}".encode()
+        )
+
+    assert len(pdf_backend.RequestHandlerClass.connections) == 1
+
+
+def test_metrics(pdf_backend):
+    html_to_pdf(Document.PDF_BACKEND, "html")
+    with pytest.raises(RuntimeError):
+        html_to_pdf(Document.PDF_BACKEND, "flaky")
+
+    stats = metrics.as_dict()
+    assert stats["requests"] == 2
+    assert stats["errors"] == 1
+    assert 0 < stats["max_seconds"] <= stats["total_seconds"]
+
+
+def test_log_metrics(pdf_backend, settings):
+    settings.METRICS_LOG_INTERVAL = 0
+
+    with mock.patch("core.metrics.logger") as logger:
+        html_to_pdf(Document.PDF_BACKEND, "<html></html>")
+
+    ((message,), _) = logger.info.call_args
+    assert message.startswith("HTML2PDF requests: {'requests': 1, 'errors': 0")
+
+
+def test_log_pdf_cache_stats(settings):
+    settings.METRICS_LOG_INTERVAL = 0
+    cache = PdfCache()
+    cache.add("key", "documents/pdf/key.pdf")
+
+    with mock.patch("core.metrics.logger") as logger:
+        cache.get("key")
+        cache.get("other")
+
+    logger.info.assert_called_with("PDF cache: {'hits': 1, 'misses': 0, 'size': 1}")
+
+
+def test_do_not_render_again_after_read_timeout(pdf_backend, settings):
+    settings.HTML2PDF_READ_TIMEOUT = 0.1
+
+    with pytest.raises(requests.ReadTimeout):
+        html_to_pdf(Document.PDF_BACKEND, "slow")
+
+    assert pdf_backend.RequestHandlerClass.received == [b"slow"]
+
+
+def test_pdf_cache_is_bounded(settings):
+    settings.HTML2PDF_CACHE_SIZE = 2
+    pdf_cache = PdfCache()
+
+    for index in range(3):
+        pdf_cache.add(pdf_cache.key(f"html {index}"), f"blob {index}")
+    pdf_cache.get(pdf_cache.key("html 1"))
+    pdf_cache.add(pdf_cache.key("html 3"), "blob 3")
+
+    assert pdf_cache.get(pdf_cache.key("html 0")) is None
+    assert pdf_cache.get(pdf_cache.key("html 1")) == "blob 1"
+    assert pdf_cache.get(pdf_cache.key("html 2")) is None
+    assert pdf_cache.get(pdf_cache.key("html 3")) == "blob 3"
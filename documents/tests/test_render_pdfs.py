@@ -0,0 +1,163 @@
+import threading
+from unittest import mock
+
+import pytest
+import requests
+from model_bakery import baker
+
+from documents.models import Document
+from documents.pdf import pdf_cache
+from documents.tasks.documents import DocumentsTask
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeBucket:
+    def __init__(self):
+        self.blobs = {}
+        self.lock = threading.Lock()
+
+    def blob(self, path):
+        bucket = self
+
+        class Blob:
+            name = path
+            size = len(bucket.blobs.get(path, b""))
+
+            def upload_from_string(self, data, content_type):
+                with bucket.lock:
+                    bucket.blobs[self.name] = data
+
+        return Blob()
+
+    def get_blob(self, path):
+        return self.blob(path) if path in self.blobs else None
+
+
+@pytest.fixture
+def fake_bucket():
+    bucket = FakeBucket()
+    with mock.patch(
+        "documents.storage.DocumentStorage.bucket",
+        new_callable=mock.PropertyMock,
+        return_value=bucket,
+    ):
+        yield bucket
+
+
+def test_render_pdfs(pdf_backend, fake_bucket, order, settings):
+    settings.DOCUMENTS_RENDER_RETRY_WAIT = 1
+    documents = baker.make(
+        Document,
+        order=order,
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+        _quantity=10,
+    )
+    html = {
+        document.id: f"document {document.id} {'flaky' if index % 3 else ''}"
+        for index, document in enumerate(documents)
+    }
+
+    with mock.patch.object(
+        Document, "render_html", autospec=True, side_effect=lambda d: html[d.id]
+    ):
+        DocumentsTask().render_pdfs(documents, order)
+
+    assert len(pdf_backend.RequestHandlerClass.failed) == 6
+    for document in Document.objects.filter(order=order):
+        key = pdf_cache.key(html[document.id])
+        assert document.blob_name == f"documents/pdf/{key}.pdf"
+        assert (
+            fake_bucket.blobs[document.blob_name] == f"PDF {html[document.id]}".encode()
+        )
+
+
+def test_render_pdfs_gives_up(pdf_backend, fake_bucket, order, settings):
+    settings.DOCUMENTS_RENDER_ATTEMPTS = 1
+    document = baker.make(
+        Document,
+        order=order,
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+    )
+
+    with mock.patch.object(Document, "render_html", return_value="flaky"):
+        with pytest.raises(RuntimeError):
+            DocumentsTask().render_pdfs([document], order)
+
+    assert not fake_bucket.blobs
+
+
+def test_do_not_render_again_after_read_timeout(
+    pdf_backend, fake_bucket, order, settings
+):
+    settings.HTML2PDF_READ_TIMEOUT = 0.1
+    settings.DOCUMENTS_RENDER_ATTEMPTS = 3
+    settings.DOCUMENTS_RENDER_RETRY_WAIT = 1
+    document = baker.make(
+        Document,
+        order=order,
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+    )
+
+    with mock.patch.object(Document, "render_html", return_value="slow"):
+        with pytest.raises(requests.ReadTimeout):
+            DocumentsTask().render_pdfs([document], order)
+
+    assert pdf_backend.RequestHandlerClass.received == [b"slow"]
+    assert not fake_bucket.blobs
+
+
+def test_render_pdfs_reuses_pdf_of_same_html(pdf_backend, fake_bucket, order):
+    documents = baker.make(
+        Document,
+        order=order,
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+        _quantity=2,
+    )
+
+    with mock.patch.object(Document, "render_html", return_value="same"):
+        DocumentsTask().render_pdfs(documents[:1], order)
+        DocumentsTask().render_pdfs(documents[1:], order)
+
+    assert len(fake_bucket.blobs) == 1
+    assert pdf_cache.hits == 1
+    assert {
+        document.blob_name for document in Document.objects.filter(order=order)
+    } == {f"documents/pdf/{pdf_cache.key('same')}.pdf"}
+
+
+def test_render_pdf_again_if_reused_pdf_was_deleted(pdf_backend, fake_bucket, order):
+    documents = baker.make(
+        Document,
+        order=order,
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+        _quantity=2,
+    )
+
+    with mock.patch.object(Document, "render_html", return_value="same"):
+        DocumentsTask().render_pdfs(documents[:1], order)
+        fake_bucket.blobs.clear()
+        DocumentsTask().render_pdfs(documents[1:], order)
+
+    blob_name = f"documents/pdf/{pdf_cache.key('same')}.pdf"
+    assert fake_bucket.blobs == {blob_name: b"PDF same"}
+    assert Document.objects.get(id=documents[1].id).blob_name == blob_name
+
+
+def test_render_pdfs_with_one_storage_client(pdf_backend, storage, order):
+    documents = baker.make(
+        Document,
+        order=order,
+        document_type=Document.TYPES.get_value("order_confirmation_buyer"),
+        _quantity=4,
+    )
+
+    with mock.patch.object(
+        Document, "render_html", autospec=True, side_effect=lambda d: str(d.id % 2)
+    ):
+        DocumentsTask().render_pdfs(documents[:2], order)
+        DocumentsTask().render_pdfs(documents[2:], order)
+
+    assert storage.from_service_account_json.call_count == 1
+    bucket = storage.from_service_account_json.return_value.get_bucket.return_value
+    assert bucket.blob.return_value.upload_from_string.call_count == 2
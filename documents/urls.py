@@ -2,14 +2,26 @@ from django.conf.urls import url
 
 from .tasks.documents import DocumentsTask
 from .tasks.mails import MailDocumentsTask
-from .views.download import DownloadDocument
+from .views.download import DownloadDocument, StreamDocument
+from .views.export import ExportDocuments, ExportOrderDocuments
 
 urlpatterns = [
+    url(r"^export$", ExportDocuments.as_view(), name="export-documents"),
+    url(
+        r"^export/orders/(?P<order_id>\d+)$",
+        ExportOrderDocuments.as_view(),
+        name="export-order-documents",
+    ),
     url(
         "(?P<document_id>.+)/download",
         DownloadDocument.as_view(),
         name="download-document",
     ),
+    url(
+        r"(?P<document_id>\d+)/stream",
+        StreamDocument.as_view(),
+        name="stream-document",
+    ),
     url(
         "queue/(?P<order_id>.+)/(?P<document_set>.+)",
         DocumentsTask.as_view(),
@@ -1,8 +1,14 @@
-import os
+import re
+from typing import Optional, Tuple
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied
-from django.http import Http404, HttpResponseRedirect
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -10,9 +16,43 @@ from rest_framework.views import APIView
 
 from core.permissions.admin import IsAdminUser
 from documents.models import Document
+from documents.storage import document_storage
 
 User = get_user_model()
 
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    First and last byte requested by a single range `Range` header. Returns
+    None for missing or unsupported headers, in which case the whole file is
+    sent. Raises ValueError if the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+
+    if not match or match.groups() == ("", ""):
+        return None
+
+    start, end = match.groups()
+
+    if not start:
+        suffix_length = int(end)
+        if suffix_length == 0 or size == 0:
+            raise ValueError(f"Range {header} not satisfiable")
+        return max(size - suffix_length, 0), size - 1
+
+    start = int(start)
+
+    if end and int(end) < start:
+        return None
+
+    if start >= size:
+        raise ValueError(f"Range {header} not satisfiable")
+
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
 
 class DownloadDocument(APIView):
     def _check_permissions(self, document: Document, user: User):
@@ -32,7 +72,7 @@ class DownloadDocument(APIView):
         if not self._check_permissions(document, self.request.user):
             return Response(status=status.HTTP_403_FORBIDDEN)
 
-        filename = os.path.basename(document.blob_name)
+        filename = document.pdf_file_name
 
         return Response(
             {
@@ -42,6 +82,59 @@ class DownloadDocument(APIView):
         )
 
 
+class StreamDocument(DownloadDocument):
+    """
+    Serves the PDF itself, in chunks and with `Range` support, for clients
+    which cannot follow signed URLs.
+    """
+
+    def get(self, request: Request, document_id: int = None, format: str = None):
+        try:
+            document = Document.objects.get(id=document_id)
+        except Document.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        if not self._check_permissions(document, self.request.user):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        size = document_storage.size(document.blob_name) if document.blob_name else None
+
+        if size is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+        except ValueError:
+            response = HttpResponse(
+                status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+            )
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        if byte_range:
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+        else:
+            start, end = 0, size - 1
+            status_code = status.HTTP_200_OK
+
+        filename = document.pdf_file_name
+
+        response = StreamingHttpResponse(
+            document_storage.chunks(document.blob_name, start, end),
+            status=status_code,
+            content_type="application/pdf",
+        )
+        response["Content-Length"] = end - start + 1
+        response["Accept-Ranges"] = "bytes"
+        response["Content-Disposition"] = f"inline; filename={filename}"
+
+        if byte_range:
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        return response
+
+
 class DownloadDocumentAdminView(APIView):
     permission_classes = [IsAdminUser]
 
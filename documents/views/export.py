@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q, QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import serializers, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from documents.export import zip_documents
+from documents.models import Document
+from documents.storage import document_storage
+
+User = get_user_model()
+
+
+def visible_documents(user: User) -> QuerySet:
+    """
+    Documents the user may download: all for superusers, those of the
+    user's region for admins and otherwise those the user is part of.
+    """
+    documents = Document.objects.all()
+
+    if user.is_superuser:
+        return documents
+    elif user.is_admin:
+        return documents.filter(
+            Q(seller__region_id=user.region_id) | Q(buyer__region_id=user.region_id)
+        )
+    else:
+        return documents.filter(Q(seller__user_id=user.id) | Q(buyer__user_id=user.id))
+
+
+def zip_response(documents: QuerySet, filename: str) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        zip_documents(documents.order_by("id").iterator(), document_storage),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
+class ExportOrderDocuments(APIView):
+    """
+    Zip archive of all documents of an order which the user may download.
+    """
+
+    def get(self, request: Request, order_id: int, format: str = None):
+        documents = visible_documents(request.user).filter(order_id=order_id)
+
+        if not documents.exists():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        return zip_response(documents, f"order-{order_id}-documents.zip")
+
+
+class ExportDocumentsSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    user = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        if data["start"] > data["end"]:
+            raise serializers.ValidationError("Start must not be after end.")
+        return data
+
+
+class ExportDocuments(APIView):
+    """
+    Zip archive of the documents of a user, by default the requesting one,
+    created between `start` and `end`. Only admins may export documents of
+    other users.
+    """
+
+    def get(self, request: Request, format: str = None):
+        serializer = ExportDocumentsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        user_id = params.get("user", request.user.id)
+
+        if user_id != request.user.id and not (
+            request.user.is_admin or request.user.is_superuser
+        ):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        documents = visible_documents(request.user).filter(
+            Q(seller__user_id=user_id) | Q(buyer__user_id=user_id),
+            created_at__date__gte=params["start"],
+            created_at__date__lte=params["end"],
+        )
+
+        return zip_response(
+            documents, f"documents-{user_id}-{params['start']}-{params['end']}.zip"
+        )
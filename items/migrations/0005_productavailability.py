@@ -0,0 +1,44 @@
+# Generated by Django 2.2.15 on 2026-10-18 14:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0016_auto_20201215_0721"),
+        ("items", "0004_auto_20200520_1539"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductAvailability",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="products.Product",
+                        verbose_name="Product",
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(null=True, verbose_name="Quantity"),
+                ),
+                (
+                    "earliest_delivery_date",
+                    models.DateField(null=True, verbose_name="Earliest delivery date"),
+                ),
+                ("as_of", models.DateField(verbose_name="As of")),
+            ],
+            options={
+                "verbose_name": "Product availability",
+                "verbose_name_plural": "Product availabilities",
+            },
+        ),
+    ]
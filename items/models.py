@@ -1,4 +1,21 @@
-from django.db import models
+import datetime
+from typing import Iterable, Optional
+
+from django.db import connection, models
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from core.db.base import BaseAbstractModel
@@ -23,3 +40,114 @@ class Item(BaseAbstractModel):
         unique_together = (("product", "latest_delivery_date"),)
         verbose_name = _("Item")
         verbose_name_plural = _("Items")
+
+
+class ProductAvailability(models.Model):
+    """
+    Available quantity of a product, i.e. the quantity of its items which can
+    still be delivered, as it was on `as_of`.
+
+    Rows are refreshed whenever items change. Rows from an earlier day are
+    ignored by `available_quantity` until the daily refresh updates them.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        related_name="availability",
+        on_delete=models.CASCADE,
+        verbose_name=_("Product"),
+    )
+    quantity = models.PositiveIntegerField(null=True, verbose_name=_("Quantity"))
+    earliest_delivery_date = models.DateField(
+        null=True, verbose_name=_("Earliest delivery date")
+    )
+    as_of = models.DateField(verbose_name=_("As of"))
+
+    class Meta:
+        verbose_name = _("Product availability")
+        verbose_name_plural = _("Product availabilities")
+
+    @classmethod
+    def refresh(cls, product_ids: Optional[Iterable[int]] = None):
+        """
+        Recalculates the availability of the given products, or of all
+        products, with a single upsert.
+        """
+        if product_ids is not None:
+            product_ids = list(set(product_ids))
+            if not product_ids:
+                return
+
+        quote_name = connection.ops.quote_name
+        table = quote_name(cls._meta.db_table)
+        products = quote_name(Product._meta.db_table)
+        items = quote_name(Item._meta.db_table)
+        today = datetime.datetime.utcnow().date()
+        params = [today, today, today]
+        where = ""
+
+        if product_ids is not None:
+            where = "WHERE product.id = ANY(%s)"
+            params.append(product_ids)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} "
+                f"(product_id, quantity, earliest_delivery_date, as_of) "
+                f"SELECT product.id, "
+                f"CASE WHEN COUNT(item.id) = 0 THEN NULL ELSE COALESCE("
+                f"SUM(item.quantity) FILTER (WHERE item.latest_delivery_date > %s), 0"
+                f") END, "
+                f"MIN(item.latest_delivery_date) FILTER ("
+                f"WHERE item.latest_delivery_date > %s AND item.quantity > 0"
+                f"), %s "
+                f"FROM {products} product "
+                f"LEFT JOIN {items} item ON item.product_id = product.id "
+                f"{where} "
+                f"GROUP BY product.id "
+                f"ON CONFLICT (product_id) DO UPDATE SET "
+                f"quantity = EXCLUDED.quantity, "
+                f"earliest_delivery_date = EXCLUDED.earliest_delivery_date, "
+                f"as_of = EXCLUDED.as_of",
+                params,
+            )
+
+
+def available_quantity(product: str = "") -> Case:
+    """
+    Expression with the available quantity of a product, `None` when the
+    product has no items at all. `product` is the path to the product from
+    the annotated model, e.g. `"product"` for cart items.
+
+    Reads `ProductAvailability` and falls back to summing the items when the
+    availability is missing or from an earlier day.
+    """
+    prefix = f"{product}__" if product else ""
+    today = datetime.datetime.utcnow().date()
+
+    items_quantity = (
+        Item.objects.filter(product_id=OuterRef(f"{prefix}id"))
+        .order_by()
+        .values("product")
+        .annotate(
+            total=Coalesce(
+                Sum("quantity", filter=Q(latest_delivery_date__gt=today)), Value(0)
+            )
+        )
+        .values("total")
+    )
+
+    return Case(
+        When(
+            **{f"{prefix}availability__as_of": today},
+            then=F(f"{prefix}availability__quantity"),
+        ),
+        default=Subquery(items_quantity),
+        output_field=IntegerField(),
+    )
+
+
+@receiver([post_save, post_delete], sender=Item)
+def refresh_product_availability(sender, instance, **kwargs):
+    ProductAvailability.refresh([instance.product_id])
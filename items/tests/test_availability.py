@@ -0,0 +1,85 @@
+import datetime
+
+import pytest
+from freezegun import freeze_time
+from model_bakery import baker
+
+from items.models import Item, ProductAvailability, available_quantity
+from products.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+def _date(days):
+    return datetime.datetime.utcnow().date() + datetime.timedelta(days=days)
+
+
+def _available_quantity(product):
+    return (
+        Product.objects.annotate(items_available=available_quantity())
+        .get(id=product.id)
+        .items_available
+    )
+
+
+@pytest.fixture
+def product(traidoo_region):
+    return baker.make_recipe("products.product")
+
+
+def test_availability_follows_item_changes(product):
+    item = baker.make(Item, product=product, quantity=2, latest_delivery_date=_date(3))
+    baker.make(Item, product=product, quantity=4, latest_delivery_date=_date(1))
+    baker.make(Item, product=product, quantity=8, latest_delivery_date=_date(-1))
+
+    availability = ProductAvailability.objects.get(product=product)
+    assert availability.quantity == 6
+    assert availability.earliest_delivery_date == _date(1)
+    assert availability.as_of == _date(0)
+
+    item.quantity = 1
+    item.save()
+    assert ProductAvailability.objects.get(product=product).quantity == 5
+
+    item.delete()
+    assert ProductAvailability.objects.get(product=product).quantity == 4
+
+
+def test_availability_of_product_without_items(product):
+    ProductAvailability.refresh([product.id])
+
+    assert ProductAvailability.objects.get(product=product).quantity is None
+    assert _available_quantity(product) is None
+
+
+def test_available_quantity_ignores_outdated_availability(product):
+    baker.make(Item, product=product, quantity=2, latest_delivery_date=_date(1))
+    baker.make(Item, product=product, quantity=3, latest_delivery_date=_date(2))
+
+    assert _available_quantity(product) == 5
+
+    with freeze_time(_date(1)):
+        assert _available_quantity(product) == 3
+
+
+def test_available_quantity_uses_availability(product):
+    baker.make(Item, product=product, quantity=2, latest_delivery_date=_date(1))
+    ProductAvailability.objects.filter(product=product).update(quantity=7)
+
+    assert _available_quantity(product) == 7
+
+
+def test_refresh_availability_cron(client_anonymous, product, traidoo_region):
+    baker.make(Item, product=product, quantity=2, latest_delivery_date=_date(1))
+    other_product = baker.make(Product, region=traidoo_region)
+    ProductAvailability.objects.all().delete()
+
+    response = client_anonymous.get(
+        "/items/cron/refresh-availability", **{"HTTP_X_APPENGINE_CRON": True}
+    )
+
+    assert response.status_code == 200
+    assert dict(ProductAvailability.objects.values_list("product", "quantity")) == {
+        product.id: 2,
+        other_product.id: None,
+    }
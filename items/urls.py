@@ -1,7 +1,8 @@
-from .views import ItemView
+from .views import ItemView, RefreshAvailabilityView
 from django.urls import path
 
 urlpatterns = [
     path("items/<int:product_id>", ItemView.as_view()),
     path("items/<int:product_id>/<int:item_id>", ItemView.as_view()),
+    path("items/cron/refresh-availability", RefreshAvailabilityView.as_view()),
 ]
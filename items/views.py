@@ -1,8 +1,10 @@
 from rest_framework import status, views
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.request import Request
 
-from items.models import Item
+from core.permissions.cron import IsCron
+from items.models import Item, ProductAvailability
 from items.serializers import ItemSerializer
 from products.models import Product
 
@@ -57,3 +59,11 @@ class ItemView(views.APIView):
             item.delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RefreshAvailabilityView(views.APIView):
+    permission_classes = (AllowAny, IsCron)
+
+    def get(self, request: Request, format: str = None):
+        ProductAvailability.refresh()
+        return Response()
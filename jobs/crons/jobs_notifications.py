@@ -27,18 +27,31 @@ class JobsNotificationsView(TasksMixin, views.APIView):
     def get(self, request, format=None):
         seller_group = Group.objects.get(name="seller")
 
-        for user in User.objects.filter(
-            is_email_verified=True,
-            is_active=True,
-            routes__isnull=False,
-            groups__in=[seller_group],
-        ).distinct():
-            self.send_task(
-                f"/jobs/cron/notifications/{user.id}",
-                queue_name="emails",
-                http_method="POST",
-                headers={"Region": user.region.slug},
+        users = (
+            User.objects.filter(
+                is_email_verified=True,
+                is_active=True,
+                routes__isnull=False,
+                groups__in=[seller_group],
             )
+            .select_related("region")
+            .distinct()
+        )
+
+        errors = self.send_tasks(
+            [
+                {
+                    "url": f"/jobs/cron/notifications/{user.id}",
+                    "queue_name": "emails",
+                    "http_method": "POST",
+                    "headers": {"Region": user.region.slug},
+                }
+                for user in users
+            ]
+        )
+        # Fail the cron run, the other tasks were sent nevertheless
+        self.raise_first_error(errors)
+
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @require_feature("routes")
@@ -6,6 +6,7 @@ from django.utils import timezone
 from model_bakery import baker
 
 from core.currencies import CURRENT_CURRENCY_SYMBOL
+from core.tasks.backends import TaskError
 
 from ..models import Detour, Job
 
@@ -67,6 +68,27 @@ def test_send_jobs_notification_email_to_all_users_with_routes(
     )
 
 
+def test_fail_when_jobs_notification_task_cannot_be_sent(
+    client_anonymous, send_task, settings, traidoo_region, seller_group
+):
+    settings.FEATURES["routes"] = True
+    send_task.side_effect = TaskError("Queue unavailable")
+
+    user = baker.make_recipe(
+        "users.user",
+        is_email_verified=True,
+        is_active=True,
+        region=traidoo_region,
+        groups=[seller_group],
+    )
+    baker.make_recipe("routes.route", user=user)
+
+    with pytest.raises(TaskError):
+        client_anonymous.get(
+            "/jobs/cron/notifications", **{"HTTP_X_APPENGINE_CRON": True}
+        )
+
+
 def test_send_jobs_notification_email_to_user(
     client_anonymous, mailoutbox, settings, traidoo_region
 ):
@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List
+
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+
+from core.calculators.order_calculator import OrderCalculatorMixin
+from core.calculators.value import Value, cents_to_decimal, sum_values
+
+User = get_user_model()
+
+
+@dataclass
+class Container:
+    id: int
+    size_class: str
+    deposit: float
+    vat: float
+    count: int
+    seller_user_id: int
+
+
+class OrderCalculation:
+    """
+    Snapshot of an order used for all price calculations.
+
+    Items, settings and sellers of the order are loaded once and every
+    figure derived from them is calculated at most once. `Order.calculation`
+    keeps the snapshot until the order or one of its items is saved.
+    """
+
+    def __init__(self, order, items=None):
+        self.order = order
+        self.setting = order.setting
+        self.items = order.order_items if items is None else items
+
+        self.seller_net_cents = {}
+        self.total_price_central_delivery_cents = 0
+
+        for item in self.items:
+            net_cents = item.price.net_cents
+
+            if item.is_central_logistic_delivery:
+                self.total_price_central_delivery_cents += net_cents
+
+            # The product may have been deleted since the order
+            seller_id = item.product_snapshot["seller"]["id"]
+            self.seller_net_cents[seller_id] = (
+                self.seller_net_cents.get(seller_id, 0) + net_cents
+            )
+
+    @cached_property
+    def sellers(self) -> Dict[int, User]:
+        """
+        Sellers of the items, reusing the ones loaded with their products. The
+        others are loaded at once.
+        """
+        sellers = {}
+
+        for item in self.items:
+            seller_id = item.product_snapshot["seller"]["id"]
+            product = item.product if type(item).product.is_cached(item) else None
+
+            if product and product.seller_id == seller_id:
+                sellers.setdefault(seller_id, product.seller)
+
+        missing_ids = set(self.seller_net_cents) - set(sellers)
+        if missing_ids:
+            sellers.update(
+                User.objects.select_related("region")
+                .prefetch_related("region__settings")
+                .in_bulk(missing_ids)
+            )
+
+        return sellers
+
+    @property
+    def total_price_central_delivery(self) -> float:
+        return self.total_price_central_delivery_cents / 100
+
+    @cached_property
+    def buyer_platform_fee(self) -> Value:
+        return sum_values(
+            (item.buyer_platform_fee for item in self.items),
+            self.setting.platform_fee_vat,
+        )
+
+    @cached_property
+    def seller_platform_fees(self) -> Dict[int, float]:
+        platform_fees = {}
+
+        for seller_id, net_cents in self.seller_net_cents.items():
+            seller = self.sellers[seller_id]
+            platform_fee = (
+                cents_to_decimal(net_cents)
+                * seller.seller_platform_fee_rate
+                / Decimal("100")
+            ).quantize(Decimal(".01"), "ROUND_HALF_UP")
+            platform_fees[seller_id] = float(platform_fee)
+
+        return platform_fees
+
+    @cached_property
+    def sum_of_seller_platform_fees(self) -> Value:
+        return Value(
+            sum(self.seller_platform_fees.values()), self.setting.platform_fee_vat
+        )
+
+    @cached_property
+    def containers(self) -> List[Container]:
+        return calculate_containers(self.items, float(self.setting.deposit_vat))
+
+    @cached_property
+    def central_platform_user(self) -> User:
+        return User.central_platform_user()
+
+    @cached_property
+    def calc_items(self) -> List[OrderCalculatorMixin.Item]:
+        product_items = [
+            OrderCalculatorMixin.Item(
+                price=item.product_price,
+                count=item.quantity,
+                vat=item.product_vat,
+                amount=item.amount,
+                seller=item.product_snapshot["seller"]["id"],
+            )
+            for item in self.items
+        ]
+
+        container_deposits = [
+            OrderCalculatorMixin.Item(
+                price=container.deposit,
+                count=container.count,
+                vat=float(container.vat),
+                amount=1,
+                seller=container.seller_user_id,
+            )
+            for container in self.containers
+        ]
+
+        logistics_fees = [
+            OrderCalculatorMixin.Item(
+                price=float(item.delivery_fee),
+                count=1,
+                vat=float(self.setting.mc_swiss_delivery_fee_vat),
+                amount=1,
+                seller=item.delivery_company_user_id,
+            )
+            for item in self.items
+            if (item.is_central_logistic_delivery or item.is_seller_delivery)
+            and item.delivery_fee > 0
+        ]
+
+        if not self.order.buyer.is_cooperative_member:
+            platform_fees = [
+                OrderCalculatorMixin.Item(
+                    price=self.sum_of_seller_platform_fees.netto
+                    + self.buyer_platform_fee.netto,
+                    count=1,
+                    vat=float(self.setting.platform_fee_vat),
+                    amount=1,
+                    seller=self.central_platform_user.id,
+                )
+            ]
+        else:
+            platform_fees = []
+        return product_items + container_deposits + logistics_fees + platform_fees
+
+
+def calculate_containers(items, deposit_vat: float) -> List[Container]:
+    containers = {}
+
+    for item in items:
+        product = item.product_snapshot
+        container = product["container_type"]
+        key = f"${container['id']}|${product['seller']['id']}"
+
+        try:
+            containers[key]
+        except KeyError:
+            containers[key] = Container(
+                id=container["id"],
+                size_class=container["size_class"],
+                deposit=float(container["deposit"] or 0),
+                vat=deposit_vat,
+                count=item.quantity,
+                seller_user_id=product["seller"]["id"],
+            )
+        else:
+            containers[key].count += item.quantity
+
+    return sorted(containers.values(), key=lambda c: c.size_class)
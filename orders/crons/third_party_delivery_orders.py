@@ -17,19 +17,29 @@ class ThirdPartyDeliveryOrdersView(TasksMixin, views.APIView):
             logger.warning("Routes feature is not enabled")
             return Response(status=status.HTTP_204_NO_CONTENT)
 
-        orders = Order.objects.filter(processed=False).distinct()
+        orders = (
+            Order.objects.filter(processed=False).select_related("region").distinct()
+        )
+
+        tasks = []
 
         for order in orders:
             logger.debug(
                 f"ThirdPartyDeliveryOrdersView :: sending task for order "
                 f"with ID {order.id}"
             )
-            self.send_task(
-                f"/documents/queue/{order.id}/all",
-                queue_name="documents",
-                http_method="POST",
-                schedule_time=60,
-                headers={"Region": order.region.slug},
+            tasks.append(
+                {
+                    "url": f"/documents/queue/{order.id}/all",
+                    "queue_name": "documents",
+                    "http_method": "POST",
+                    "schedule_time": 60,
+                    "headers": {"Region": order.region.slug},
+                }
             )
 
+        errors = self.send_tasks(tasks)
+        # Fail the cron run, the other tasks were sent nevertheless
+        self.raise_first_error(errors)
+
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,4 +1,3 @@
-from dataclasses import dataclass
 from datetime import timedelta
 from decimal import Decimal
 from enum import Enum
@@ -9,7 +8,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import JSONField
 from django.db import models
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.functional import cached_property
@@ -19,11 +18,11 @@ from loguru import logger
 from common.models import Region
 from core.calculators.item_calculator import ItemCalculatorMixin
 from core.calculators.order_calculator import OrderCalculatorMixin
-from core.calculators.utils import round_float
-from core.calculators.value import Value
+from core.calculators.value import Value, cents_to_decimal
 from core.db.base import BaseAbstractModel
 from delivery_addresses.models import DeliveryAddress
 from delivery_options.models import DeliveryOption
+from orders.calculation import Container, OrderCalculation, calculate_containers
 from products.models import Product
 
 User = get_user_model()
@@ -43,14 +42,7 @@ class Order(OrderCalculatorMixin, BaseAbstractModel):
         def get_value(cls, member):
             return getattr(cls, member).value[0]
 
-    @dataclass
-    class Container:
-        id: int
-        size_class: str
-        deposit: float
-        vat: float
-        count: int
-        seller_user_id: int
+    Container = Container
 
     buyer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -83,21 +75,52 @@ class Order(OrderCalculatorMixin, BaseAbstractModel):
 
     @cached_property
     def order_items(self):
-        return list(self.items.all())
+        if "items" in getattr(self, "_prefetched_objects_cache", {}):
+            return list(self.items.all())
+
+        return list(
+            self.items.select_related(
+                "delivery_option", "product__seller", "product__region"
+            ).prefetch_related("product__seller__region__settings")
+        )
+
+    @cached_property
+    def calculation(self) -> OrderCalculation:
+        return OrderCalculation(self)
+
+    def invalidate_calculation(self, reload_items=True):
+        self.__dict__.pop("calculation", None)
+        if reload_items:
+            self.__dict__.pop("order_items", None)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.invalidate_calculation()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.invalidate_calculation()
 
     def recalculate_items_delivery_fee(self):
-        for item in self.items.all():
-            item.delivery_fee = Decimal(str(item._delivery_fee().netto))
-            item.save()
+        items = self.calculation.items
+        total_price_central_delivery = self.calculation.total_price_central_delivery
+        now = timezone.now()
+
+        for item in items:
+            delivery_fee = item._delivery_fee(total_price_central_delivery)
+            item.delivery_fee = cents_to_decimal(delivery_fee.net_cents)
+            item.updated_at = now
+
+        OrderItem.objects.bulk_update(items, ["delivery_fee", "updated_at"])
+        self.invalidate_calculation(reload_items=False)
 
     @property
-    def total_price_central_delivery(self):
-        prices = []
-        for item in self.items.all():
-            if item.is_central_logistic_delivery:
-                prices.append(item.price.netto)
+    def total_price_central_delivery_cents(self) -> int:
+        return self.calculation.total_price_central_delivery_cents
 
-        return round_float(sum(prices))
+    @property
+    def total_price_central_delivery(self):
+        return self.total_price_central_delivery_cents / 100
 
     @property
     def total_price_traidoo_delivery_or_third_party_delivery(self):
@@ -109,67 +132,19 @@ class Order(OrderCalculatorMixin, BaseAbstractModel):
                 and item.product.third_party_delivery
                 and item.is_third_party_delivery
             ):
-                prices.append(item.price.netto)
+                prices.append(item.price.net_cents)
 
-        prices.append(self.total_price_central_delivery)
+        prices.append(self.total_price_central_delivery_cents)
 
-        return round_float(sum(prices))
+        return sum(prices) / 100
 
     @property
     def calc_items(self):
-        product_items = [
-            OrderCalculatorMixin.Item(
-                price=item.product_price,
-                count=item.quantity,
-                vat=item.product_vat,
-                amount=item.amount,
-                seller=item.product_snapshot["seller"]["id"],
-            )
-            for item in self.order_items
-        ]
-
-        container_deposits = [
-            OrderCalculatorMixin.Item(
-                price=container.deposit,
-                count=container.count,
-                vat=float(container.vat),
-                amount=1,
-                seller=container.seller_user_id,
-            )
-            for container in self.containers()
-        ]
-
-        logistics_fees = [
-            OrderCalculatorMixin.Item(
-                price=float(item.delivery_fee),
-                count=1,
-                vat=float(self.setting.mc_swiss_delivery_fee_vat),
-                amount=1,
-                seller=item.delivery_company_user_id,
-            )
-            for item in self.order_items
-            if (item.is_central_logistic_delivery or item.is_seller_delivery)
-            and item.delivery_fee > 0
-        ]
-
-        if not self.buyer.is_cooperative_member:
-            platform_fees = [
-                OrderCalculatorMixin.Item(
-                    price=self.sum_of_seller_platform_fees.netto
-                    + self.buyer_platform_fee.netto,
-                    count=1,
-                    vat=float(self.setting.platform_fee_vat),
-                    amount=1,
-                    seller=User.central_platform_user().id,
-                )
-            ]
-        else:
-            platform_fees = []
-        return product_items + container_deposits + logistics_fees + platform_fees
+        return self.calculation.calc_items
 
     @property
     def buyer_platform_fee(self) -> Value:
-        return sum(item.buyer_platform_fee for item in self.items.all())
+        return self.calculation.buyer_platform_fee
 
     @property
     def seller_platform_fees(self) -> dict:
@@ -177,33 +152,11 @@ class Order(OrderCalculatorMixin, BaseAbstractModel):
 
         :return: dict of platform fees for each seller
         """
-        platform_fees = {}
-        values = {}
-
-        for order_item in self.items.all():
-            seller = order_item.product.seller
-            if seller in values:
-                values[seller] += order_item.price.netto
-            else:
-                values[seller] = order_item.price.netto
-
-        for seller, total_seller_price in values.items():
-            total_price = Decimal(str(total_seller_price)).quantize(
-                Decimal(".01"), "ROUND_HALF_UP"
-            )
-            platform_fee = (
-                total_price * seller.seller_platform_fee_rate / Decimal("100")
-            ).quantize(Decimal(".01"), "ROUND_HALF_UP")
-            platform_fees[seller.id] = float(platform_fee)
-
-        return platform_fees
+        return self.calculation.seller_platform_fees
 
     @property
     def sum_of_seller_platform_fees(self) -> Value:
-        sum_of_seller_fees = sum(
-            seller_fee for seller_fee in self.seller_platform_fees.values()
-        )
-        return Value(sum_of_seller_fees, self.setting.platform_fee_vat)
+        return self.calculation.sum_of_seller_platform_fees
 
     @property
     def total_platform_fees(self) -> Value:
@@ -211,7 +164,7 @@ class Order(OrderCalculatorMixin, BaseAbstractModel):
 
     @property
     def local_platform_owner_platform_fee(self) -> Value:
-        total_platform_fees = Decimal(str(self.total_platform_fees.netto))
+        total_platform_fees = cents_to_decimal(self.total_platform_fees.net_cents)
         local_platform_fee_share = total_platform_fees * (
             Decimal("1") - self.setting.central_share / Decimal("100")
         )
@@ -240,38 +193,12 @@ class Order(OrderCalculatorMixin, BaseAbstractModel):
         return self.status == self.STATUSES.get_value("paid")
 
     def containers(self, filters=None):
-        containers = {}
-        deposit_vat = float(self.setting.deposit_vat)
-        if filters:
-            items_queryset = self.items.filter(**filters)
-        else:
-            items_queryset = self.items.all()
-
-        for item in items_queryset:
-            product = item.product_snapshot
-            container = product["container_type"]
+        if not filters:
+            return self.calculation.containers
 
-            try:
-                containers[f"${container['id']}|${product['seller']['id']}"]
-            except KeyError:
-                containers[
-                    f"${container['id']}|${product['seller']['id']}"
-                ] = self.Container(
-                    id=container["id"],
-                    size_class=container["size_class"],
-                    deposit=float(container["deposit"] or 0),
-                    vat=deposit_vat,
-                    count=item.quantity,
-                    seller_user_id=product["seller"]["id"],
-                )
-            else:
-                containers[
-                    f"${container['id']}|${product['seller']['id']}"
-                ].count += item.quantity
-
-        containers = containers.values()
-        containers = sorted(containers, key=lambda c: c.size_class)
-        return containers
+        return calculate_containers(
+            self.items.filter(**filters), float(self.setting.deposit_vat)
+        )
 
     @property
     def sellers_regions(self):
@@ -306,7 +233,7 @@ class OrderItem(BaseAbstractModel, ItemCalculatorMixin):
 
     @cached_property
     def setting(self):
-        return self.order.region.settings.all()[0]
+        return self.order.setting
 
     @property
     def buyer(self):
@@ -383,6 +310,20 @@ class OrderItem(BaseAbstractModel, ItemCalculatorMixin):
 
         return delivery_date.date()
 
+    @property
+    def snapshot_seller(self):
+        """Seller of the product at the time of the order"""
+        seller_id = self.product_snapshot["seller"]["id"]
+
+        if (
+            OrderItem.product.is_cached(self)
+            and self.product
+            and self.product.seller_id == seller_id
+        ):
+            return self.product.seller
+
+        return User.objects.get(id=seller_id)
+
     @property
     def delivery_company(self):
         # TODO: Is it possible that there is no delivery company? What then?
@@ -392,17 +333,11 @@ class OrderItem(BaseAbstractModel, ItemCalculatorMixin):
             delivery_company = self.product.region.setting.logistics_company
         elif self.is_seller_delivery and self.product.third_party_delivery:
             try:
-                delivery_company = self.job.user or User.objects.get(
-                    id=self.product_snapshot["seller"]["id"]
-                )
+                delivery_company = self.job.user or self.snapshot_seller
             except (AttributeError, TypeError):
-                delivery_company = User.objects.get(
-                    id=self.product_snapshot["seller"]["id"]
-                )
+                delivery_company = self.snapshot_seller
         elif self.is_seller_delivery:
-            delivery_company = User.objects.get(
-                id=self.product_snapshot["seller"]["id"]
-            )
+            delivery_company = self.snapshot_seller
         elif self.is_self_collect_delivery:
             delivery_company = self.order.buyer
 
@@ -432,3 +367,9 @@ def utc_to_cet(utc_time):
 def calculate_delivery_fee(sender, instance, **kwargs):
     if not instance.product_snapshot:
         instance.product_snapshot = instance.product.create_snapshot()
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def invalidate_order_calculation(sender, instance, **kwargs):
+    if OrderItem.order.is_cached(instance):
+        instance.order.invalidate_calculation()
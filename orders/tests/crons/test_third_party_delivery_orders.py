@@ -5,6 +5,7 @@ import pytest
 from django.conf import settings
 from model_bakery import baker
 
+from core.tasks.backends import TaskError
 from orders.models import Order
 
 pytestmark = pytest.mark.django_db
@@ -44,3 +45,26 @@ def test_send_documents_task_for_third_party_orders(
         )
         in send_task.call_args_list
     )
+
+
+def test_fail_when_documents_task_cannot_be_sent(
+    client_anonymous, send_task, settings, traidoo_region
+):
+    settings.FEATURES['routes'] = True
+    error = TaskError('Queue unavailable')
+
+    order_1, order_2 = baker.make(Order, processed=False, _quantity=2)
+
+    def send(url, **options):
+        if url == f'/documents/queue/{order_1.id}/all':
+            raise error
+
+    send_task.side_effect = send
+
+    with pytest.raises(TaskError):
+        client_anonymous.get(
+            '/orders/crons/third-party-delivery-orders',
+            **{'HTTP_X_APPENGINE_CRON': True},
+        )
+
+    assert send_task.call_count == 2
@@ -0,0 +1,115 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from orders.models import Order, OrderItem
+
+pytestmark = pytest.mark.django_db
+
+
+def test_calculation_is_reused(order, order_items, django_assert_max_num_queries):
+    order = Order.objects.get(id=order.id)
+    order.price_gross
+
+    with django_assert_max_num_queries(0):
+        order.price_gross
+        order.buyer_platform_fee
+        order.seller_platform_fees
+        order.containers()
+        order.total_price_central_delivery
+        [item.transport_insurance for item in order.calculation.items]
+
+
+def test_calculation_matches_item_values(order, order_items):
+    calculation = order.calculation
+
+    assert calculation.total_price_central_delivery == order_items[0].price.netto
+    assert calculation.seller_net_cents == {
+        order_items[0].product.seller.id: order_items[0].price.net_cents
+        + order_items[1].price.net_cents
+    }
+    assert [container.count for container in order.containers()] == [5]
+
+
+def test_calculation_invalidated_when_item_is_saved(order, order_items):
+    price_gross = order.price_gross
+
+    order_items[0].quantity += 1
+    order_items[0].save()
+
+    assert order.price_gross > price_gross
+
+
+def test_calculation_invalidated_when_item_is_added(
+    order, order_items, products, delivery_options
+):
+    price = order.price
+
+    baker.make(
+        "orders.orderitem",
+        order=order,
+        product=products[1],
+        quantity=1,
+        delivery_option=delivery_options[0],
+        latest_delivery_date=order_items[0].latest_delivery_date.replace(year=2040),
+    )
+
+    assert order.price > price
+
+
+def test_calculation_invalidated_when_order_is_saved(order, order_items):
+    calculation = order.calculation
+
+    order.save()
+
+    assert order.calculation is not calculation
+
+
+def test_calculate_seller_platform_fees_of_deleted_products(
+    order, order_items, django_assert_max_num_queries
+):
+    seller_platform_fees = Order.objects.get(id=order.id).seller_platform_fees
+
+    for item in order_items:
+        item.product.delete()
+
+    order = Order.objects.get(id=order.id)
+    order.calculation
+
+    with django_assert_max_num_queries(2):
+        assert order.seller_platform_fees == seller_platform_fees
+
+
+def _central_logistics_order(buyer, traidoo_region, products, count):
+    order = baker.make("orders.order", buyer=buyer, region=traidoo_region)
+    for index in range(count):
+        baker.make(
+            "orders.orderitem",
+            order=order,
+            product=products[index % 2],
+            quantity=index + 1,
+            delivery_option_id=0,
+            latest_delivery_date=datetime.date(2040, 1, 1)
+            + datetime.timedelta(days=index),
+        )
+    return Order.objects.get(id=order.id)
+
+
+def test_recalculate_items_delivery_fee_with_constant_queries(
+    buyer, traidoo_region, products, delivery_options
+):
+    query_counts = []
+
+    for count in (2, 10):
+        order = _central_logistics_order(buyer, traidoo_region, products, count)
+        with CaptureQueriesContext(connection) as context:
+            order.recalculate_items_delivery_fee()
+        query_counts.append(len(context.captured_queries))
+
+        for item in OrderItem.objects.filter(order=order):
+            assert item.delivery_fee == item.transport_insurance
+
+    assert query_counts[0] == query_counts[1]
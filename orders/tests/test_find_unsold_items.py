@@ -5,6 +5,7 @@ from django.conf import settings
 from django.utils import timezone
 from model_bakery import baker
 
+from core.tasks.backends import TaskError
 from items.models import Item
 
 
@@ -23,6 +24,18 @@ def test_find_unsold_product_items_run_tasks_for_sellers(
     )
 
 
+@pytest.mark.django_db
+def test_find_unsold_product_items_fail_when_task_cannot_be_sent(
+    client_anonymous, seller, send_task, traidoo_region
+):
+    send_task.side_effect = TaskError("Queue unavailable")
+
+    with pytest.raises(TaskError):
+        client_anonymous.get(
+            "/orders/cron/find-unsold-items", **{"HTTP_X_APPENGINE_CRON": True}
+        )
+
+
 @pytest.mark.django_db
 def test_find_unsold_product_items(
     client_anonymous, seller, mailoutbox, traidoo_region
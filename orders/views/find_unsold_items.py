@@ -24,15 +24,21 @@ class FindUnsoldItemsView(TasksMixin, views.APIView):
     permission_classes = (AllowAny, IsCronOrTask)
 
     def get(self, request, format=None):
-        sellers = User.objects.filter(groups__name="seller")
-
-        for seller in sellers:
-            self.send_task(
-                f"/orders/cron/find-unsold-items/{seller.id}",
-                queue_name="unsold-items",
-                http_method="POST",
-                headers={"Region": seller.region.slug},
-            )
+        sellers = User.objects.filter(groups__name="seller").select_related("region")
+
+        errors = self.send_tasks(
+            [
+                {
+                    "url": f"/orders/cron/find-unsold-items/{seller.id}",
+                    "queue_name": "unsold-items",
+                    "http_method": "POST",
+                    "headers": {"Region": seller.region.slug},
+                }
+                for seller in sellers
+            ]
+        )
+        # Fail the cron run, the other tasks were sent nevertheless
+        self.raise_first_error(errors)
 
         return Response()
 
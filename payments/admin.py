@@ -0,0 +1,29 @@
+from django.contrib import admin
+from django.contrib.admin import ModelAdmin
+
+from payments.models import WebhookEvent
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(ModelAdmin):
+    ordering = ("-created_at",)
+    list_display = (
+        "id",
+        "event_type",
+        "resource_id",
+        "status",
+        "attempts",
+        "lag",
+        "created_at",
+        "processed_at",
+    )
+    list_filter = ["status", "event_type"]
+    search_fields = ["resource_id"]
+    readonly_fields = (
+        "event_type",
+        "resource_id",
+        "attempts",
+        "started_at",
+        "processed_at",
+        "last_error",
+    )
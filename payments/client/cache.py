@@ -0,0 +1,123 @@
+import copy
+from typing import Dict, List
+
+from payments.client.client import MangopayClient
+from payments.client.exceptions import MangopayTransferError
+from payments.utils import euro_to_cents
+
+
+class MangopayReadCache:
+    """
+    Read-through cache in front of a `MangopayClient` for the duration of one
+    request.
+
+    Wallets, users, banking aliases, bank accounts and the pay-in, pay-out or
+    KYC document a webhook is about are fetched at most once. Balances of
+    cached wallets are updated locally after each transfer issued through
+    the cache; wallets are fetched again if the outcome of a transfer is
+    unknown. Everything else is passed on to the client.
+    """
+
+    def __init__(self, client: MangopayClient):
+        self._client = client
+        self._wallets = {}
+        self._user_wallets = {}
+        self._reads = {}
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _read(self, method: str, *args):
+        key = (method,) + args
+
+        if key not in self._reads:
+            self._reads[key] = getattr(self._client, method)(*args)
+
+        return copy.deepcopy(self._reads[key])
+
+    def get_user(self, mangopay_user_id: str):
+        return self._read("get_user", mangopay_user_id)
+
+    def get_banking_alias(self, baking_alias_id: str):
+        return self._read("get_banking_alias", baking_alias_id)
+
+    def get_wallet_banking_alias(self, wallet_id: str):
+        return self._read("get_wallet_banking_alias", wallet_id)
+
+    def get_bank_accounts(self, mangopay_user_id: str, active: bool = True):
+        return self._read("get_bank_accounts", mangopay_user_id, active)
+
+    def get_pay_in(self, pay_in_id: str):
+        return self._read("get_pay_in", pay_in_id)
+
+    def get_pay_out(self, pay_out_id: str):
+        return self._read("get_pay_out", pay_out_id)
+
+    def get_kyc_document(self, document_id: str):
+        return self._read("get_kyc_document", document_id)
+
+    def get_wallet(self, wallet_id: str) -> Dict:
+        if wallet_id not in self._wallets:
+            self._wallets[wallet_id] = self._client.get_wallet(wallet_id)
+
+        return copy.deepcopy(self._wallets[wallet_id])
+
+    def get_user_wallets(self, user_id: str) -> List[Dict]:
+        if user_id not in self._user_wallets:
+            wallets = self._client.get_user_wallets(user_id)
+            self._user_wallets[user_id] = [wallet["Id"] for wallet in wallets]
+            self._wallets.update({wallet["Id"]: wallet for wallet in wallets})
+
+        return [
+            copy.deepcopy(self._wallets[wallet_id])
+            for wallet_id in self._user_wallets[user_id]
+        ]
+
+    def create_wallet(self, user_id, *args, **kwargs) -> Dict:
+        wallet = self._client.create_wallet(user_id, *args, **kwargs)
+        self._wallets[wallet["Id"]] = wallet
+        self._user_wallets.pop(user_id, None)
+        return copy.deepcopy(wallet)
+
+    def _add_to_balance(self, wallet_id: str, amount: int):
+        balance = self._wallets.get(wallet_id, {}).get("Balance")
+
+        if balance is not None:
+            balance["Amount"] += amount
+
+    def transfer(
+        self,
+        user_id: str,
+        source_wallet_id: str,
+        destination_wallet_id: str,
+        amount: float,
+        fees: int = 0,
+        *args,
+        **kwargs,
+    ):
+        try:
+            transfer = self._client.transfer(
+                user_id,
+                source_wallet_id,
+                destination_wallet_id,
+                amount,
+                fees,
+                *args,
+                **kwargs,
+            )
+        except MangopayTransferError:
+            # The transfer failed, balances did not change
+            raise
+        except Exception:
+            self._wallets.clear()
+            self._user_wallets.clear()
+            raise
+
+        debited = transfer.get("DebitedFunds", {}).get("Amount", euro_to_cents(amount))
+        credited = transfer.get("CreditedFunds", {}).get(
+            "Amount", debited - euro_to_cents(fees)
+        )
+        self._add_to_balance(source_wallet_id, -debited)
+        self._add_to_balance(destination_wallet_id, credited)
+
+        return transfer
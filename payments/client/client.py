@@ -1,97 +1,205 @@
+import re
+import threading
+import time
+from collections import defaultdict
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Iterator
 
 import requests
+from django.conf import settings
 from loguru import logger
-from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from core.metrics import PeriodicLog
 from payments.client.exceptions import MangopayError, MangopayTransferError
 from payments.utils import euro_to_cents, lookup_legal_person_type
 
+# Largest page size the Mangopay API allows
+PER_PAGE = 100
+
+
+class MangopayMetrics:
+    """
+    Number of requests, errors and response times per endpoint, with the IDs
+    in the path replaced by `{id}`. Logged every `METRICS_LOG_INTERVAL`
+    seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._log = PeriodicLog("Mangopay requests", self.as_dict)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = defaultdict(
+                lambda: {
+                    "requests": 0,
+                    "errors": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                }
+            )
+
+    @staticmethod
+    def endpoint_name(method: str, endpoint: str) -> str:
+        path = re.sub(r"/\d+(?=/|$)", "/{id}", endpoint.split("?")[0].rstrip("/"))
+        return f"{method.upper()} {path}"
+
+    def record(self, method: str, endpoint: str, seconds: float, error: bool):
+        with self._lock:
+            stats = self._endpoints[self.endpoint_name(method, endpoint)]
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+        self._log.tick()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "average_seconds": stats["total_seconds"] / stats["requests"],
+                }
+                for name, stats in self._endpoints.items()
+            }
+
+
+metrics = MangopayMetrics()
+
 
 class MangopayClient:
+    """
+    Mangopay API client with a keep-alive connection pool of
+    `MANGOPAY_POOL_SIZE` connections. It is thread-safe, so use the
+    process-wide one of `get_mangopay_client`.
+    """
+
     def __init__(self, url, client_id, password):
         self._url = "{}/{}".format(url, client_id)
         self._client_id = client_id
         self._password = password
 
-    def _make_request(self, url, method, payload=None, params=None):
-        headers = {"Content-Type": "application/json"}
+        self._session = requests.Session()
+        self._session.auth = (client_id, password)
+        self._session.headers["Content-Type"] = "application/json"
+        # Only failed connections are retried, never requests Mangopay got
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.MANGOPAY_POOL_SIZE,
+            max_retries=Retry(
+                total=settings.MANGOPAY_RETRIES,
+                read=0,
+                status=0,
+                backoff_factor=0.2,
+            ),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _send(
+        self, endpoint, method, payload=None, params=None, headers=None
+    ) -> requests.Response:
+        url = "{}{}".format(self._url, endpoint)
 
         logger.debug("{} {}".format(method, url))
         logger.debug(payload)
 
-        request = requests.Request(
-            url=url,
-            headers=headers,
-            method=method,
-            json=payload,
-            params=params,
-            auth=(self._client_id, self._password),
-        ).prepare()
-        session = Session()
-        response = session.send(request)
+        started = time.perf_counter()
+        response = None
+
+        try:
+            response = self._session.request(
+                method,
+                url,
+                json=payload,
+                params=params,
+                headers=headers,
+                timeout=(
+                    settings.MANGOPAY_CONNECT_TIMEOUT,
+                    settings.MANGOPAY_READ_TIMEOUT,
+                ),
+            )
+        finally:
+            seconds = time.perf_counter() - started
+            error = response is None or response.status_code > 399
+            metrics.record(method, endpoint, seconds, error)
+            logger.debug(f"Mangopay request took {seconds:.3f}s.")
 
-        logger.debug(request.url)
+        logger.debug(response.url)
 
         logger.debug(response.text)
         if response.status_code > 399:
             logger.debug("{}\n{}".format(response.status_code, response.text))
             raise MangopayError(response.content)
 
+        return response
+
+    @staticmethod
+    def _parse(response: requests.Response):
         try:
             return response.json()
         except ValueError as value_error:
             logger.warning("Non json response: `{}`".format(response.text))
             return response.text
 
+    def _make_request(self, endpoint, method, payload=None, params=None, headers=None):
+        return self._parse(self._send(endpoint, method, payload, params, headers))
+
     def get(self, endpoint, params=None):
-        if params is None:
-            params = {}
+        """
+        First page of a list endpoint, see `paginate` for all of them.
+        """
+        params = {**(params or {}), "per_page": PER_PAGE}
 
-        # TODO: fetch all available pages
-        params["per_page"] = 100
+        return self._make_request(endpoint, "GET", params=params)
 
-        url = "{}{}".format(self._url, endpoint)
+    def paginate(self, endpoint, params=None) -> Iterator[Dict]:
+        """
+        All items of a list endpoint, fetched page by page while iterating.
+        """
+        page = 1
+
+        while True:
+            response = self._send(
+                endpoint,
+                "GET",
+                params={**(params or {}), "per_page": PER_PAGE, "page": page},
+            )
+            items = self._parse(response)
 
-        return self._make_request(url, "GET", params=params)
+            yield from items
 
-    def post(self, endpoint, payload=None):
+            pages = response.headers.get("X-Number-Pages")
+
+            if len(items) < PER_PAGE or (pages is not None and page >= int(pages)):
+                break
+
+            page += 1
+
+    def post(self, endpoint, payload=None, headers=None):
         if payload is None:
             payload = {}
 
-        url = "{}{}".format(self._url, endpoint)
-
-        return self._make_request(url, "post", payload=payload)
+        return self._make_request(endpoint, "post", payload=payload, headers=headers)
 
     def put(self, endpoint, payload=None):
         if payload is None:
             payload = {}
 
-        url = "{}{}".format(self._url, endpoint)
-
-        return self._make_request(url, "put", payload=payload)
+        return self._make_request(endpoint, "put", payload=payload)
 
     def delete(self, endpoint, params=None):
         if params is None:
             params = {}
 
-        url = "{}{}".format(self._url, endpoint)
-
-        return self._make_request(url, "DELETE", params=params)
+        return self._make_request(endpoint, "DELETE", params=params)
 
     def wallet_transactions(self, wallet_id: str):
-        page = 1
-        while True:
-            transactions = self.get(
-                f"/wallets/{wallet_id}/transactions", {"page": page}
-            )
-            if not transactions:
-                break
-            page += 1
-
-            for transaction in transactions:
-                yield transaction
+        return self.paginate(f"/wallets/{wallet_id}/transactions")
 
     def create_bank_account(
         self,
@@ -203,7 +311,7 @@ class MangopayClient:
         return self.get(f"/wallets/{wallet_id}")
 
     def get_user_wallets(self, user_id: str):
-        return self.get(f"/users/{user_id}/wallets")
+        return list(self.paginate(f"/users/{user_id}/wallets"))
 
     def create_banking_alias_iban(
         self, wallet_id: str, user_id: str, name: str, country: str = "FR"
@@ -224,14 +332,16 @@ class MangopayClient:
         The Mangopay API will return a list of banking aliases for given wallet
         but there will be only one alias maximum.
         """
-        return self.get(f"/wallets/{wallet_id}/bankingaliases/")
+        return list(self.paginate(f"/wallets/{wallet_id}/bankingaliases/"))
 
     def get_banking_alias(self, baking_alias_id: str):
         return self.get(f"/bankingaliases/{baking_alias_id}")
 
     def get_bank_accounts(self, mangopay_user_id: str, active: bool = True):
-        return self.get(
-            f"/users/{mangopay_user_id}/bankaccounts", params={"Active": active}
+        return list(
+            self.paginate(
+                f"/users/{mangopay_user_id}/bankaccounts", params={"Active": active}
+            )
         )
 
     def create_mangopay_natural_user(
@@ -310,7 +420,7 @@ class MangopayClient:
         return self.get(f"/users/{mangopay_user_id}")
 
     def get_user_kyc_documents(self, mangopay_user_id: str):
-        return self.get(f"/users/{mangopay_user_id}/kyc/documents")
+        return list(self.paginate(f"/users/{mangopay_user_id}/kyc/documents"))
 
     def get_pay_in(self, pay_in_id: str):
         return self.get(f"/payins/{pay_in_id}")
@@ -327,7 +437,12 @@ class MangopayClient:
         fees_amount: int = 0,
         fees_currency: str = "EUR",
         wire_reference: str = None,
+        idempotency_key: str = None,
     ):
+        """
+        Mangopay answers a pay-out with an `idempotency_key` it got before
+        with the first pay-out, so retries do not pay out twice.
+        """
         payload = {
             "AuthorId": author_id,
             "DebitedFunds": {"Amount": amount, "Currency": "EUR"},
@@ -339,7 +454,9 @@ class MangopayClient:
         if wire_reference:
             payload["BankWireRef"] = wire_reference
 
-        return self.post("/payouts/bankwire", payload)
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+
+        return self.post("/payouts/bankwire", payload, headers=headers)
 
     def create_kyc_document(self, user_mangopay_id: str, document_type: str):
         return self.post(
@@ -389,3 +506,26 @@ class MangopayClient:
                 },
             },
         )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_mangopay_client() -> MangopayClient:
+    """
+    Process-wide Mangopay client for the credentials of the settings.
+    """
+    global _client
+
+    credentials = (
+        settings.MANGOPAY_URL,
+        settings.MANGOPAY_CLIENT_ID,
+        settings.MANGOPAY_PASSWORD,
+    )
+
+    with _client_lock:
+        if _client is None or _client[0] != credentials:
+            _client = (credentials, MangopayClient(*credentials))
+
+        return _client[1]
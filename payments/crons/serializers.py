@@ -5,6 +5,8 @@ from orders.models import Order
 
 class PayoutSerializer(serializers.Serializer):
     order_id = serializers.IntegerField(required=True)
+    # Optional for tasks enqueued without it, their payouts are not deduplicated
+    document_id = serializers.IntegerField(required=False, allow_null=True)
     amount = serializers.FloatField(required=True)
 
     def validate(self, data):
@@ -19,3 +21,27 @@ class PayoutSerializer(serializers.Serializer):
                 )
 
         return data
+
+
+class BatchPayoutSerializer(serializers.Serializer):
+    mangopay_user_id = serializers.CharField(required=True)
+    order_id = serializers.IntegerField(required=True)
+    document_id = serializers.IntegerField(required=False, allow_null=True)
+    amount = serializers.FloatField(required=True)
+
+
+class PayoutsSerializer(serializers.Serializer):
+    payouts = BatchPayoutSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        order_ids = {payout["order_id"] for payout in data["payouts"]}
+        missing = order_ids - set(
+            Order.objects.filter(id__in=order_ids).values_list("id", flat=True)
+        )
+
+        if missing:
+            raise serializers.ValidationError(
+                f"Orders with IDs {sorted(missing)} do not exist"
+            )
+
+        return data
@@ -0,0 +1,43 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from loguru import logger
+from rest_framework import status, views
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from core.permissions.cron import IsCron
+from core.tasks.mixin import TasksMixin
+from payments.models import WebhookEvent
+
+
+class EnqueuePendingWebhookEventsView(TasksMixin, views.APIView):
+    """
+    Enqueues webhook events again which are pending for longer than
+    `MANGOPAY_WEBHOOK_PENDING_TIMEOUT` seconds, e.g. because sending their
+    task failed.
+    """
+
+    permission_classes = (AllowAny, IsCron)
+
+    def get(self, request, format=None):
+        events = WebhookEvent.objects.filter(
+            status=WebhookEvent.STATUSES.get_value("pending"),
+            updated_at__lt=timezone.now()
+            - datetime.timedelta(seconds=settings.MANGOPAY_WEBHOOK_PENDING_TIMEOUT),
+        ).order_by("created_at")
+
+        tasks = [
+            {
+                "url": event.task_url,
+                "queue_name": WebhookEvent.QUEUE_NAME,
+                "http_method": "POST",
+            }
+            for event in events
+        ]
+        logger.info(f"Enqueueing {len(tasks)} pending webhook events again")
+
+        self.raise_first_error(self.send_tasks(tasks))
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
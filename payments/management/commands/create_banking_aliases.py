@@ -1,11 +1,10 @@
 import csv
 import datetime
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.management import BaseCommand
 
-from payments.client.client import MangopayClient
+from payments.client.client import get_mangopay_client
 
 User = get_user_model()
 
@@ -15,11 +14,7 @@ class Command(BaseCommand):
 
     @property
     def mangopay_client(self):
-        return MangopayClient(
-            settings.MANGOPAY_URL,
-            settings.MANGOPAY_CLIENT_ID,
-            settings.MANGOPAY_PASSWORD,
-        )
+        return get_mangopay_client()
 
     def handle(self, *args, **options):
         users = User.objects.all()
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.15 on 2026-10-18 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="WebhookEvent",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "event_type",
+                    models.CharField(max_length=64, verbose_name="Event type"),
+                ),
+                (
+                    "resource_id",
+                    models.CharField(max_length=64, verbose_name="Resource ID"),
+                ),
+                (
+                    "skip_checks",
+                    models.BooleanField(default=False, verbose_name="Skip checks"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("processed", "Processed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Attempts"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Last attempt started at"
+                    ),
+                ),
+                (
+                    "processed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Processed at"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="Last error")),
+            ],
+            options={
+                "verbose_name": "Webhook event",
+                "verbose_name_plural": "Webhook events",
+                "unique_together": {("resource_id", "event_type")},
+            },
+        ),
+    ]
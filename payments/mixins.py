@@ -2,26 +2,32 @@ import base64
 from decimal import Decimal
 from typing import Dict
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from loguru import logger
 
 from core import utils
 from core.calculators.utils import round_float
-from payments.client.client import MangopayClient
+from payments.client.cache import MangopayReadCache
+from payments.client.client import MangopayClient, get_mangopay_client
 from payments.utils import lookup_legal_person_type, lookup_user_type
 
 User = get_user_model()
 
 
 class MangopayMixin:
+    # Cache Mangopay reads for the lifetime of the instance, i.e. the request
+    # of a view. See `MangopayReadCache`.
+    cache_mangopay_reads = False
+
     @property
-    def mangopay(self):
-        return MangopayClient(
-            settings.MANGOPAY_URL,
-            settings.MANGOPAY_CLIENT_ID,
-            settings.MANGOPAY_PASSWORD,
-        )
+    def mangopay(self) -> MangopayClient:
+        if not self.cache_mangopay_reads:
+            return get_mangopay_client()
+
+        if "_mangopay_read_cache" not in self.__dict__:
+            self._mangopay_read_cache = MangopayReadCache(get_mangopay_client())
+
+        return self._mangopay_read_cache
 
     def update_legal_user(self, mangopay_user_id: str, **kwargs):
         address = {
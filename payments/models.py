@@ -0,0 +1,137 @@
+import datetime
+from enum import Enum
+
+from django.conf import settings
+from django.db import models
+from django.db.models import F, Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from core.db.base import BaseAbstractModel
+
+
+class WebhookEvent(BaseAbstractModel):
+    """
+    Mangopay webhook notification, stored when it is received and processed
+    later by a task. Mangopay may notify about the same event more than once,
+    so there is one per resource and event type.
+    """
+
+    class Meta:
+        verbose_name = _("Webhook event")
+        verbose_name_plural = _("Webhook events")
+        unique_together = ["resource_id", "event_type"]
+
+    QUEUE_NAME = "mangopay-webhooks"
+
+    class STATUSES(Enum):
+        pending = ("pending", _("Pending"))
+        processing = ("processing", _("Processing"))
+        processed = ("processed", _("Processed"))
+        failed = ("failed", _("Failed"))
+
+        @classmethod
+        def get_value(cls, member):
+            return getattr(cls, member).value[0]
+
+    event_type = models.CharField(max_length=64, verbose_name=_("Event type"))
+    resource_id = models.CharField(max_length=64, verbose_name=_("Resource ID"))
+    skip_checks = models.BooleanField(default=False, verbose_name=_("Skip checks"))
+    status = models.CharField(
+        max_length=16,
+        default="pending",
+        choices=[s.value for s in STATUSES],
+        verbose_name=_("Status"),
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Attempts"))
+    started_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Last attempt started at")
+    )
+    processed_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Processed at")
+    )
+    last_error = models.TextField(blank=True, verbose_name=_("Last error"))
+
+    @property
+    def lag(self) -> datetime.timedelta:
+        """
+        Time from receiving the event until it was processed, or until now.
+        """
+        return (self.processed_at or timezone.now()) - self.created_at
+
+    @property
+    def task_url(self) -> str:
+        return reverse("mangopay-webhook-event", kwargs={"event_id": self.id})
+
+    def claim(self) -> bool:
+        """
+        Marks the event as being processed, unless it was processed already
+        or another attempt is running. Attempts running for longer than
+        `MANGOPAY_WEBHOOK_PROCESSING_TIMEOUT` seconds are considered dead.
+        Returns whether the event was claimed.
+        """
+        now = timezone.now()
+        stalled = now - datetime.timedelta(
+            seconds=settings.MANGOPAY_WEBHOOK_PROCESSING_TIMEOUT
+        )
+
+        claimed = (
+            WebhookEvent.objects.filter(id=self.id)
+            .filter(
+                Q(
+                    status__in=[
+                        self.STATUSES.get_value("pending"),
+                        self.STATUSES.get_value("failed"),
+                    ]
+                )
+                | Q(
+                    status=self.STATUSES.get_value("processing"),
+                    started_at__lt=stalled,
+                )
+            )
+            .update(
+                status=self.STATUSES.get_value("processing"),
+                attempts=F("attempts") + 1,
+                started_at=now,
+                updated_at=now,
+            )
+        )
+
+        if claimed:
+            self.refresh_from_db()
+
+        return bool(claimed)
+
+    def set_processed(self):
+        self.status = self.STATUSES.get_value("processed")
+        self.processed_at = timezone.now()
+        self.last_error = ""
+        self.save(update_fields=["status", "processed_at", "last_error", "updated_at"])
+
+    def set_failed(self, error: str):
+        self.status = self.STATUSES.get_value("failed")
+        self.last_error = error
+        self.save(update_fields=["status", "last_error", "updated_at"])
+
+    def reopen(self) -> bool:
+        """
+        Makes a processed or failed event pending again, e.g. to process it
+        with `skip_checks`. Returns whether it was reopened.
+        """
+        reopened = WebhookEvent.objects.filter(
+            id=self.id,
+            status__in=[
+                self.STATUSES.get_value("processed"),
+                self.STATUSES.get_value("failed"),
+            ],
+        ).update(
+            status=self.STATUSES.get_value("pending"),
+            skip_checks=self.skip_checks,
+            updated_at=timezone.now(),
+        )
+
+        if reopened:
+            self.refresh_from_db()
+
+        return bool(reopened)
@@ -0,0 +1,266 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import mail_admins
+from loguru import logger
+
+from payments.client.exceptions import MangopayError
+from payments.mixins import MangopayMixin
+
+User = get_user_model()
+
+# Namespace of the idempotency keys of pay-outs
+PAYOUTS_NAMESPACE = uuid.UUID("5d0b1c9e-1f3c-4d8e-9a57-3f0c2b7e6a41")
+
+
+@dataclass
+class Payout:
+    mangopay_user_id: str
+    # Cents
+    amount: int
+    order_id: Optional[int] = None
+    # The document paid out, e.g. a producer invoice
+    document_id: Optional[int] = None
+
+    @property
+    def wire_reference(self) -> Optional[str]:
+        return f"order #{self.order_id}" if self.order_id else None
+
+    @property
+    def idempotency_key(self) -> Optional[str]:
+        """
+        The same for every attempt to pay out a document to the user. Pay-outs
+        without a document are not deduplicated.
+        """
+        if not self.document_id:
+            return None
+
+        return str(
+            uuid.uuid5(PAYOUTS_NAMESPACE, f"{self.document_id}:{self.mangopay_user_id}")
+        )
+
+
+@dataclass
+class PayoutResult:
+    class STATUSES:
+        created = "created"
+        insufficient_funds = "insufficient_funds"
+        invalid_iban = "invalid_iban"
+        failed = "failed"
+
+    payout: Payout
+    status: str
+    pay_out_id: Optional[str] = None
+    error: Optional[Exception] = field(default=None, repr=False)
+
+    def as_dict(self) -> Dict:
+        return {
+            "mangopay_user_id": self.payout.mangopay_user_id,
+            "order_id": self.payout.order_id,
+            "document_id": self.payout.document_id,
+            "amount": self.payout.amount,
+            "status": self.status,
+            "pay_out_id": self.pay_out_id,
+            "error": str(self.error) if self.error else None,
+        }
+
+
+class PayoutDispatcher(MangopayMixin):
+    """
+    Pays out amounts from the wallets of users to their bank accounts.
+
+    Wallets and bank accounts of all users are fetched at once and the
+    pay-outs of different users are issued at the same time, at most
+    `MANGOPAY_PAYOUT_WORKERS` requests at a time. Pay-outs of one user are
+    issued one after another, as long as the balance of the wallet covers
+    them. Missing bank accounts are created from the IBAN of the user.
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or settings.MANGOPAY_PAYOUT_WORKERS
+
+    def _map(self, function: Callable, items: Iterable) -> List:
+        items = list(items)
+
+        if len(items) < 2 or self.workers < 2:
+            return [function(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            return list(executor.map(function, items))
+
+    def _create_user_bank_account(self, user: Optional[User], mangopay_user_id: str):
+        if user is None:
+            raise User.DoesNotExist(f"No user with mangopay user id {mangopay_user_id}")
+
+        if not user.has_valid_iban:
+            raise ValueError(
+                f"User {user.id} has invalid iban {user.iban}. Cannot create "
+                f"account in mangopay"
+            )
+
+        bank_account = self.mangopay.create_bank_account(
+            mangopay_user_id,
+            user.street,
+            user.city,
+            user.zip,
+            user.company_name,
+            user.iban,
+        )
+        logger.debug(bank_account)
+
+        return bank_account
+
+    @staticmethod
+    def _call(function: Callable, *args):
+        """
+        Result of the function and None, or None and the exception it raised.
+        """
+        try:
+            return function(*args), None
+        except Exception as error:
+            logger.exception(error)
+            return None, error
+
+    def _pay_out_to_user(
+        self,
+        payouts: List[Payout],
+        author_id: str,
+        wallet: Dict,
+        bank_account: Optional[Dict],
+        user: Optional[User],
+    ) -> List[PayoutResult]:
+        if bank_account is None:
+            bank_account, error = self._call(
+                self._create_user_bank_account, user, payouts[0].mangopay_user_id
+            )
+
+            if error is not None:
+                status = (
+                    PayoutResult.STATUSES.invalid_iban
+                    if isinstance(error, ValueError)
+                    else PayoutResult.STATUSES.failed
+                )
+                return [PayoutResult(payout, status, error=error) for payout in payouts]
+
+        results = []
+
+        for payout in payouts:
+            pay_out, error = self._call(
+                lambda: self.mangopay.create_pay_out(
+                    author_id=author_id,
+                    amount=payout.amount,
+                    bank_account_id=bank_account["Id"],
+                    wallet_id=wallet["Id"],
+                    wire_reference=payout.wire_reference,
+                    idempotency_key=payout.idempotency_key,
+                )
+            )
+
+            if error is not None:
+                results.append(
+                    PayoutResult(payout, PayoutResult.STATUSES.failed, error=error)
+                )
+            else:
+                results.append(
+                    PayoutResult(
+                        payout,
+                        PayoutResult.STATUSES.created,
+                        pay_out_id=pay_out.get("Id"),
+                    )
+                )
+
+        return results
+
+    @staticmethod
+    def _report_error(result: PayoutResult):
+        if isinstance(result.error, MangopayError):
+            mail_admins(
+                subject="Mangopay payout error",
+                message=(
+                    f"Could not pay out {result.payout.amount} cents to mangopay "
+                    f"user {result.payout.mangopay_user_id}. Mangopay response: "
+                    f"{result.error}"
+                ),
+            )
+
+    def dispatch(self, payouts: List[Payout]) -> List[PayoutResult]:
+        """
+        Issues the pay-outs and returns their results in the same order.
+        Admins are e-mailed about errors of Mangopay.
+        """
+        if not payouts:
+            return []
+
+        payouts_by_user = {}
+        for index, payout in enumerate(payouts):
+            payouts_by_user.setdefault(payout.mangopay_user_id, []).append(index)
+
+        user_ids = list(payouts_by_user)
+        users = {
+            user.mangopay_user_id: user
+            for user in User.objects.filter(mangopay_user_id__in=user_ids)
+        }
+        author_id = User.central_platform_user().mangopay_user_id
+
+        lookups = self._map(
+            lambda lookup: self._call(*lookup),
+            [(self.get_user_wallet, user_id) for user_id in user_ids]
+            + [(self.get_user_bank_account, user_id) for user_id in user_ids],
+        )
+        wallets = dict(zip(user_ids, lookups[: len(user_ids)]))
+        bank_accounts = dict(zip(user_ids, lookups[len(user_ids) :]))
+
+        results = [None] * len(payouts)
+        payable = []
+
+        for user_id, indexes in payouts_by_user.items():
+            wallet, wallet_error = wallets[user_id]
+            bank_account, bank_account_error = bank_accounts[user_id]
+            error = wallet_error or bank_account_error
+
+            if error is not None:
+                for index in indexes:
+                    results[index] = PayoutResult(
+                        payouts[index], PayoutResult.STATUSES.failed, error=error
+                    )
+                continue
+
+            balance = wallet["Balance"]["Amount"] if wallet else 0
+            covered = []
+
+            for index in indexes:
+                if payouts[index].amount > balance:
+                    results[index] = PayoutResult(
+                        payouts[index], PayoutResult.STATUSES.insufficient_funds
+                    )
+                else:
+                    balance -= payouts[index].amount
+                    covered.append(index)
+
+            if covered:
+                payable.append((user_id, covered))
+
+        user_results = self._map(
+            lambda payable_payouts: self._pay_out_to_user(
+                [payouts[index] for index in payable_payouts[1]],
+                author_id,
+                wallets[payable_payouts[0]][0],
+                bank_accounts[payable_payouts[0]][0],
+                users.get(payable_payouts[0]),
+            ),
+            payable,
+        )
+
+        for (user_id, indexes), payable_results in zip(payable, user_results):
+            for index, result in zip(indexes, payable_results):
+                results[index] = result
+
+        for result in results:
+            if result.error is not None:
+                self._report_error(result)
+
+        return results
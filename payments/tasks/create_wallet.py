@@ -1,4 +1,3 @@
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import views
 from rest_framework.permissions import AllowAny
@@ -6,7 +5,7 @@ from rest_framework.response import Response
 
 from core.permissions.task import IsTask
 from core.tasks.mixin import TasksMixin
-from payments.client.client import MangopayClient
+from payments.client.client import get_mangopay_client
 
 User = get_user_model()
 
@@ -17,14 +16,10 @@ class CreateWalletView(views.APIView, TasksMixin):
     def post(self, request, format=None):
         user = User.objects.get(pk=request.data["user_id"])
 
-        mangopay_client = MangopayClient(
-            settings.MANGOPAY_URL,
-            settings.MANGOPAY_CLIENT_ID,
-            settings.MANGOPAY_PASSWORD,
+        mangopay_wallet = get_mangopay_client().create_wallet(
+            user_id=user.mangopay_user_id
         )
 
-        mangopay_wallet = mangopay_client.create_wallet(user_id=user.mangopay_user_id)
-
         wallet_id = mangopay_wallet["Id"]
 
         self.send_task(
@@ -0,0 +1,76 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class FakeMangopay(BaseHTTPRequestHandler):
+    """
+    Answers like the Mangopay API: `/wallets/<id>/transactions` lists
+    `transactions` transactions page by page, posted objects are returned
+    with an ID and any other path is not found. The idempotency key of posts
+    is recorded with the request.
+    """
+
+    protocol_version = "HTTP/1.1"
+    transactions = 0
+    connections = set()
+    requests = []
+
+    def do_GET(self):
+        self.connections.add(self.client_address)
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.requests.append(("GET", url.path, query))
+
+        if not url.path.endswith("/transactions"):
+            return self.respond(404, {"Message": "Not found"})
+
+        per_page = int(query["per_page"])
+        page = int(query["page"])
+        pages = max(1, -(-self.transactions // per_page))
+        ids = range((page - 1) * per_page, min(page * per_page, self.transactions))
+
+        self.respond(
+            200, [{"Id": str(id)} for id in ids], {"X-Number-Pages": str(pages)}
+        )
+
+    def do_POST(self):
+        self.connections.add(self.client_address)
+        url = urlparse(self.path)
+        self.requests.append(("POST", url.path, self.headers["Idempotency-Key"]))
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        self.respond(200, {"Id": "wallet-1", **payload})
+
+    def respond(self, status, data, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mangopay_server(settings):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMangopay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    settings.MANGOPAY_URL = f"http://127.0.0.1:{server.server_port}/v2.01"
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    FakeMangopay.transactions = 0
+    FakeMangopay.connections.clear()
+    FakeMangopay.requests.clear()
@@ -0,0 +1,114 @@
+from unittest import mock
+
+import pytest
+
+from payments.client.client import PER_PAGE, get_mangopay_client, metrics
+from payments.client.exceptions import MangopayError
+from payments.mixins import MangopayMixin
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+
+
+def test_client_is_shared(mangopay_server):
+    assert MangopayMixin().mangopay is MangopayMixin().mangopay
+    assert MangopayMixin().mangopay is get_mangopay_client()
+
+
+def test_client_of_other_credentials(mangopay_server, settings):
+    client = get_mangopay_client()
+    settings.MANGOPAY_CLIENT_ID = "other"
+
+    assert get_mangopay_client() is not client
+
+
+def test_connection_is_reused(mangopay_server):
+    client = get_mangopay_client()
+
+    for index in range(5):
+        assert client.create_wallet(f"user-{index}")["Id"] == "wallet-1"
+
+    assert len(mangopay_server.RequestHandlerClass.connections) == 1
+
+
+def test_paginate_all_pages(mangopay_server):
+    mangopay_server.RequestHandlerClass.transactions = 2 * PER_PAGE + 1
+
+    transactions = list(get_mangopay_client().wallet_transactions("10"))
+
+    assert [transaction["Id"] for transaction in transactions] == [
+        str(id) for id in range(2 * PER_PAGE + 1)
+    ]
+    assert [
+        (path, query["page"])
+        for _, path, query in mangopay_server.RequestHandlerClass.requests
+    ] == [
+        ("/v2.01/mangopayclient/wallets/10/transactions", "1"),
+        ("/v2.01/mangopayclient/wallets/10/transactions", "2"),
+        ("/v2.01/mangopayclient/wallets/10/transactions", "3"),
+    ]
+
+
+def test_paginate_stops_after_last_page(mangopay_server):
+    mangopay_server.RequestHandlerClass.transactions = PER_PAGE
+
+    transactions = list(get_mangopay_client().wallet_transactions("10"))
+
+    assert len(transactions) == PER_PAGE
+    assert len(mangopay_server.RequestHandlerClass.requests) == 1
+
+
+def test_paginate_while_iterating(mangopay_server):
+    mangopay_server.RequestHandlerClass.transactions = 2 * PER_PAGE
+
+    transactions = get_mangopay_client().wallet_transactions("10")
+    next(transactions)
+
+    assert len(mangopay_server.RequestHandlerClass.requests) == 1
+
+
+def test_metrics_per_endpoint(mangopay_server):
+    client = get_mangopay_client()
+    list(client.wallet_transactions("10"))
+    list(client.wallet_transactions("11"))
+    client.create_wallet("user-1")
+    with pytest.raises(MangopayError):
+        client.get_wallet("10")
+
+    stats = metrics.as_dict()
+
+    assert set(stats) == {
+        "GET /wallets/{id}/transactions",
+        "POST /wallets",
+        "GET /wallets/{id}",
+    }
+    assert stats["GET /wallets/{id}/transactions"]["requests"] == 2
+    assert stats["GET /wallets/{id}/transactions"]["errors"] == 0
+    assert stats["GET /wallets/{id}"]["errors"] == 1
+    assert 0 < stats["POST /wallets"]["max_seconds"]
+
+
+def test_log_metrics(mangopay_server, settings):
+    settings.METRICS_LOG_INTERVAL = 0
+
+    with mock.patch("core.metrics.logger") as logger:
+        get_mangopay_client().create_wallet("user-1")
+
+    ((message,), _) = logger.info.call_args
+    assert message.startswith("Mangopay requests: {'POST /wallets': {'requests': 1")
+
+
+def test_pay_out_with_idempotency_key(mangopay_server):
+    client = get_mangopay_client()
+
+    client.create_pay_out("user-1", 1000, "bank-account-1", "wallet-1")
+    client.create_pay_out(
+        "user-1", 1000, "bank-account-1", "wallet-1", idempotency_key="key-1"
+    )
+
+    assert mangopay_server.RequestHandlerClass.requests == [
+        ("POST", "/v2.01/mangopayclient/payouts/bankwire", None),
+        ("POST", "/v2.01/mangopayclient/payouts/bankwire", "key-1"),
+    ]
@@ -7,7 +7,7 @@ from payments.mixins import MangopayMixin
 
 @pytest.fixture
 def mangopay_client():
-    with mock.patch("payments.mixins.MangopayClient") as mangopay:
+    with mock.patch("payments.mixins.get_mangopay_client") as mangopay:
         yield mangopay.return_value
 
 
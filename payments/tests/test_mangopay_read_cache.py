@@ -0,0 +1,120 @@
+from unittest import mock
+
+import pytest
+import requests
+
+from payments.client.cache import MangopayReadCache
+from payments.client.exceptions import MangopayTransferError
+
+
+def wallet(wallet_id, amount):
+    return {"Id": wallet_id, "Balance": {"Currency": "EUR", "Amount": amount}}
+
+
+@pytest.fixture
+def client():
+    client = mock.Mock()
+    client.get_wallet.side_effect = lambda wallet_id: wallet(wallet_id, 1000)
+    client.get_user_wallets.return_value = [wallet("wallet-2", 50)]
+    return client
+
+
+def test_read_once(client):
+    cache = MangopayReadCache(client)
+
+    for _ in range(3):
+        cache.get_wallet("wallet-1")
+        cache.get_user("user-1")
+        cache.get_banking_alias("alias-1")
+        cache.get_bank_accounts("user-1")
+
+    client.get_wallet.assert_called_once_with("wallet-1")
+    client.get_user.assert_called_once_with("user-1")
+    client.get_banking_alias.assert_called_once_with("alias-1")
+    client.get_bank_accounts.assert_called_once_with("user-1", True)
+
+
+def test_user_wallets_are_cached_as_wallets(client):
+    cache = MangopayReadCache(client)
+
+    assert cache.get_user_wallets("user-2") == [wallet("wallet-2", 50)]
+    assert cache.get_wallet("wallet-2") == wallet("wallet-2", 50)
+    assert cache.get_user_wallets("user-2") == [wallet("wallet-2", 50)]
+
+    client.get_user_wallets.assert_called_once_with("user-2")
+    client.get_wallet.assert_not_called()
+
+
+def test_changes_of_read_data_are_not_cached(client):
+    cache = MangopayReadCache(client)
+
+    cache.get_wallet("wallet-1")["Balance"]["Amount"] = 0
+
+    assert cache.get_wallet("wallet-1")["Balance"]["Amount"] == 1000
+
+
+def test_balances_after_transfer(client):
+    client.transfer.return_value = {
+        "Status": "SUCCEEDED",
+        "DebitedFunds": {"Amount": 300},
+        "CreditedFunds": {"Amount": 280},
+    }
+    cache = MangopayReadCache(client)
+    cache.get_wallet("wallet-1")
+    cache.get_user_wallets("user-2")
+
+    cache.transfer("user-1", "wallet-1", "wallet-2", amount=3, fees=0.2, tag="tag")
+
+    client.transfer.assert_called_once_with(
+        "user-1", "wallet-1", "wallet-2", 3, 0.2, tag="tag"
+    )
+    assert cache.get_wallet("wallet-1")["Balance"]["Amount"] == 700
+    assert cache.get_wallet("wallet-2")["Balance"]["Amount"] == 330
+    client.get_wallet.assert_called_once_with("wallet-1")
+
+
+def test_balances_after_transfer_without_funds_in_response(client):
+    client.transfer.return_value = {"Status": "SUCCEEDED"}
+    cache = MangopayReadCache(client)
+    cache.get_wallet("wallet-1")
+
+    cache.transfer("user-1", "wallet-1", "wallet-2", amount=1.5)
+
+    assert cache.get_wallet("wallet-1")["Balance"]["Amount"] == 850
+
+
+def test_balances_after_failed_transfer(client):
+    client.transfer.side_effect = MangopayTransferError("Insufficient balance")
+    cache = MangopayReadCache(client)
+    cache.get_wallet("wallet-1")
+
+    with pytest.raises(MangopayTransferError):
+        cache.transfer("user-1", "wallet-1", "wallet-2", amount=3)
+
+    assert cache.get_wallet("wallet-1")["Balance"]["Amount"] == 1000
+    client.get_wallet.assert_called_once_with("wallet-1")
+
+
+def test_wallets_are_read_again_after_unknown_transfer_outcome(client):
+    client.transfer.side_effect = requests.Timeout()
+    cache = MangopayReadCache(client)
+    cache.get_wallet("wallet-1")
+    cache.get_user_wallets("user-2")
+
+    with pytest.raises(requests.Timeout):
+        cache.transfer("user-1", "wallet-1", "wallet-2", amount=3)
+
+    cache.get_wallet("wallet-1")
+    cache.get_user_wallets("user-2")
+
+    assert client.get_wallet.call_count == 2
+    assert client.get_user_wallets.call_count == 2
+
+
+def test_other_calls_are_passed_on(client):
+    cache = MangopayReadCache(client)
+
+    cache.create_pay_out("user-1", 100, "bank-account-1", "wallet-1")
+    cache.create_pay_out("user-1", 100, "bank-account-1", "wallet-1")
+
+    assert client.create_pay_out.call_count == 2
@@ -0,0 +1,234 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from model_bakery import baker
+
+from orders.models import Order
+from payments.client.exceptions import MangopayError
+from payments.payouts import Payout, PayoutDispatcher, PayoutResult
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db
+
+
+def wallet(mangopay_user_id, amount):
+    return {
+        "Id": f"wallet-{mangopay_user_id}",
+        "Currency": "EUR",
+        "Description": "Default",
+        "Balance": {"Amount": amount},
+    }
+
+
+@pytest.fixture
+def mangopay(mangopay):
+    balances = {"1": 1000, "2": 500, "3": 0}
+    mangopay.return_value.get_user_wallets.side_effect = lambda user_id: [
+        wallet(user_id, balances[user_id])
+    ]
+    mangopay.return_value.get_bank_accounts.side_effect = lambda user_id: [
+        {"Id": f"bank-account-{user_id}"}
+    ]
+    mangopay.return_value.create_pay_out.side_effect = lambda **kwargs: {
+        "Id": f"payout-{kwargs['wallet_id']}-{kwargs['amount']}"
+    }
+    yield mangopay
+
+
+@pytest.fixture
+def sellers():
+    yield [
+        baker.make(User, mangopay_user_id=mangopay_user_id)
+        for mangopay_user_id in ["1", "2", "3"]
+    ]
+
+
+def test_idempotency_key():
+    key = Payout("1", 1000, order_id=10, document_id=20).idempotency_key
+
+    assert Payout("1", 1000, order_id=10, document_id=20).idempotency_key == key
+    assert Payout("1", 999, order_id=10, document_id=20).idempotency_key == key
+    assert Payout("1", 1000, order_id=10, document_id=21).idempotency_key != key
+    assert Payout("2", 1000, order_id=10, document_id=20).idempotency_key != key
+    assert Payout("1", 1000, order_id=10).idempotency_key is None
+
+
+def test_dispatch_payouts(
+    mangopay, sellers, central_platform_user, django_assert_max_num_queries
+):
+    payouts = [
+        Payout("1", 600, order_id=10, document_id=20),
+        Payout("2", 500, order_id=10, document_id=21),
+        Payout("1", 300, order_id=11, document_id=22),
+    ]
+
+    with django_assert_max_num_queries(2):
+        results = PayoutDispatcher(workers=4).dispatch(payouts)
+
+    assert [result.status for result in results] == ["created"] * 3
+    assert [result.pay_out_id for result in results] == [
+        "payout-wallet-1-600",
+        "payout-wallet-2-500",
+        "payout-wallet-1-300",
+    ]
+    assert mangopay.return_value.get_user_wallets.call_count == 2
+    assert mangopay.return_value.get_bank_accounts.call_count == 2
+    mangopay.return_value.create_pay_out.assert_any_call(
+        author_id=central_platform_user.mangopay_user_id,
+        amount=300,
+        bank_account_id="bank-account-1",
+        wallet_id="wallet-1",
+        wire_reference="order #11",
+        idempotency_key=payouts[2].idempotency_key,
+    )
+
+
+def test_do_not_pay_out_more_than_balance(mangopay, sellers, central_platform_user):
+    results = PayoutDispatcher().dispatch(
+        [Payout("1", 600), Payout("1", 600), Payout("1", 400), Payout("3", 1)]
+    )
+
+    assert [result.status for result in results] == [
+        "created",
+        "insufficient_funds",
+        "created",
+        "insufficient_funds",
+    ]
+    assert mangopay.return_value.create_pay_out.call_count == 2
+
+
+def test_create_missing_bank_account(mangopay, central_platform_user):
+    user = baker.make(
+        User, mangopay_user_id="1", iban="DE89370400440532013000", company_name="ACME"
+    )
+    mangopay.return_value.get_bank_accounts.side_effect = None
+    mangopay.return_value.get_bank_accounts.return_value = []
+    mangopay.return_value.create_bank_account.return_value = {"Id": "new-account"}
+
+    (result,) = PayoutDispatcher().dispatch([Payout("1", 100)])
+
+    assert result.status == "created"
+    mangopay.return_value.create_bank_account.assert_called_once_with(
+        "1", user.street, user.city, user.zip, "ACME", "DE89370400440532013000"
+    )
+    assert (
+        mangopay.return_value.create_pay_out.call_args[1]["bank_account_id"]
+        == "new-account"
+    )
+
+
+def test_do_not_create_bank_account_with_invalid_iban(
+    mangopay, sellers, central_platform_user
+):
+    User.objects.filter(mangopay_user_id="1").update(iban="-")
+    mangopay.return_value.get_bank_accounts.side_effect = None
+    mangopay.return_value.get_bank_accounts.return_value = []
+
+    (result,) = PayoutDispatcher().dispatch([Payout("1", 100)])
+
+    assert result.status == PayoutResult.STATUSES.invalid_iban
+    mangopay.return_value.create_bank_account.assert_not_called()
+    mangopay.return_value.create_pay_out.assert_not_called()
+
+
+@mock.patch("payments.payouts.mail_admins")
+def test_report_failed_payout(mail_admins, mangopay, sellers, central_platform_user):
+    def create_pay_out(**kwargs):
+        if kwargs["wallet_id"] == "wallet-2":
+            raise MangopayError("Bank account inactive")
+        return {"Id": "payout-1"}
+
+    mangopay.return_value.create_pay_out.side_effect = create_pay_out
+
+    results = PayoutDispatcher(workers=2).dispatch(
+        [Payout("1", 100, order_id=10), Payout("2", 100, order_id=10)]
+    )
+
+    assert [result.as_dict() for result in results] == [
+        {
+            "mangopay_user_id": "1",
+            "order_id": 10,
+            "document_id": None,
+            "amount": 100,
+            "status": "created",
+            "pay_out_id": "payout-1",
+            "error": None,
+        },
+        {
+            "mangopay_user_id": "2",
+            "order_id": 10,
+            "document_id": None,
+            "amount": 100,
+            "status": "failed",
+            "pay_out_id": None,
+            "error": "Bank account inactive",
+        },
+    ]
+    mail_admins.assert_called_once()
+    assert "Bank account inactive" in mail_admins.call_args[1]["message"]
+
+
+def test_failed_wallet_lookup_fails_payouts_of_user(
+    mangopay, sellers, central_platform_user
+):
+    get_user_wallets = mangopay.return_value.get_user_wallets.side_effect
+
+    def get_failing_user_wallets(user_id):
+        if user_id == "2":
+            raise MangopayError("Timeout")
+        return get_user_wallets(user_id)
+
+    mangopay.return_value.get_user_wallets.side_effect = get_failing_user_wallets
+
+    results = PayoutDispatcher().dispatch([Payout("1", 100), Payout("2", 100)])
+
+    assert [result.status for result in results] == ["created", "failed"]
+
+
+def test_retry_failed_payout_task(mangopay, sellers, central_platform_user, api_client):
+    baker.make(Order, id=99)
+    mangopay.return_value.create_pay_out.side_effect = MangopayError("Timeout")
+
+    with pytest.raises(MangopayError):
+        api_client.post(
+            reverse("payouts-user", kwargs={"mangopay_user_id": "1"}),
+            data={"amount": 5, "order_id": 99},
+            HTTP_X_APPENGINE_QUEUENAME="mangopay-payouts",
+        )
+
+
+def test_payouts_batch(mangopay, sellers, central_platform_user, api_client):
+    baker.make(Order, id=99)
+
+    response = api_client.post(
+        reverse("payouts"),
+        data={
+            "payouts": [
+                {"mangopay_user_id": "1", "amount": 5, "order_id": 99},
+                {"mangopay_user_id": "2", "amount": 6, "order_id": 99},
+            ]
+        },
+        format="json",
+        HTTP_X_APPENGINE_QUEUENAME="mangopay-payouts",
+    )
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()] == [
+        "created",
+        "insufficient_funds",
+    ]
+
+
+def test_payouts_batch_of_unknown_order(mangopay, api_client):
+    response = api_client.post(
+        reverse("payouts"),
+        data={"payouts": [{"mangopay_user_id": "1", "amount": 5, "order_id": 99}]},
+        format="json",
+        HTTP_X_APPENGINE_QUEUENAME="mangopay-payouts",
+    )
+
+    assert response.status_code == 400
+    mangopay.return_value.create_pay_out.assert_not_called()
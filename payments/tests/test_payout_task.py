@@ -6,6 +6,7 @@ from django.urls import reverse
 from model_bakery import baker
 
 from orders.models import Order
+from payments.payouts import Payout
 
 User = get_user_model()
 
@@ -48,7 +49,7 @@ def test_create_payout_for_order(mangopay, api_client, central_platform_user):
 
     api_client.post(
         reverse("payouts-user", kwargs={"mangopay_user_id": "999"}),
-        data={"amount": 10, "order_id": "99"},
+        data={"amount": 10, "order_id": "99", "document_id": "5"},
         HTTP_X_APPENGINE_CRON="True",
     )
 
@@ -60,4 +61,5 @@ def test_create_payout_for_order(mangopay, api_client, central_platform_user):
         bank_account_id="bank-account-1",
         wallet_id="wallet-1",
         wire_reference="order #99",
+        idempotency_key=Payout("999", 1000, 99, document_id=5).idempotency_key,
     )
@@ -0,0 +1,24 @@
+from unittest import mock
+
+import pytest
+
+from core.tasks.backends import LocalTasksBackend
+
+
+@pytest.fixture(autouse=True, scope="function")
+def send_task():
+    """
+    Processes webhook events right away, other tasks are only recorded.
+    """
+    recorder = mock.Mock()
+
+    def send_task(self, url, *args, **kwargs):
+        queue_name = kwargs.get("queue_name", args[0] if args else "default")
+
+        if queue_name == "mangopay-webhooks":
+            return LocalTasksBackend().send(url, *args, **kwargs)
+
+        return recorder(url, *args, **kwargs)
+
+    with mock.patch("core.tasks.mixin.TasksMixin.send_task", send_task):
+        yield recorder
@@ -11,9 +11,13 @@ from documents import factories
 from mails.utils import get_admin_emails
 from orders.models import Order, OrderItem
 from payments.client.exceptions import MangopayError, MangopayTransferError
+from payments.mixins import MangopayMixin
 
 pytestmark = pytest.mark.django_db
 
+# The original, `mangopay` is mocked by the `mangopay` fixture
+MANGOPAY = MangopayMixin.mangopay
+
 
 @pytest.fixture
 def mangopay_successful_payin_processing(
@@ -372,7 +376,14 @@ def test_mark_documents_and_invoice_as_paid_after_processing_payin(
 
 
 def test_create_payouts_tasks_after_paying_invoices(
-    mangopay_bank_alias_payin, send_task, api_client, order
+    mangopay_bank_alias_payin,
+    send_task,
+    api_client,
+    order,
+    producer_invoice,
+    logistics_invoice,
+    credit_note,
+    platform_invoice,
 ):
     api_client.get(
         reverse("webhook"),
@@ -383,7 +394,11 @@ def test_create_payouts_tasks_after_paying_invoices(
         "/mangopay/cron/payouts/10",
         queue_name="mangopay-payouts",
         http_method="POST",
-        payload={"order_id": order.id, "amount": 178.98},
+        payload={
+            "order_id": order.id,
+            "document_id": producer_invoice.id,
+            "amount": 178.98,
+        },
         headers={"Region": "traidoo", "Content-Type": "application/json"},
     )
 
@@ -391,7 +406,11 @@ def test_create_payouts_tasks_after_paying_invoices(
         "/mangopay/cron/payouts/30",
         queue_name="mangopay-payouts",
         http_method="POST",
-        payload={"order_id": order.id, "amount": 17.03},
+        payload={
+            "order_id": order.id,
+            "document_id": logistics_invoice.id,
+            "amount": 17.03,
+        },
         headers={"Region": "traidoo", "Content-Type": "application/json"},
     )
 
@@ -399,7 +418,11 @@ def test_create_payouts_tasks_after_paying_invoices(
         "/mangopay/cron/payouts/40",
         queue_name="mangopay-payouts",
         http_method="POST",
-        payload={"order_id": order.id, "amount": 9.71},
+        payload={
+            "order_id": order.id,
+            "document_id": credit_note.id,
+            "amount": 9.71,
+        },
         headers={"Region": "traidoo", "Content-Type": "application/json"},
     )
 
@@ -409,6 +432,7 @@ def test_create_payouts_tasks_after_paying_invoices(
         http_method="POST",
         payload={
             "order_id": order.id,
+            "document_id": platform_invoice.id,
             "amount": 6.47 - 1.08,
         },  # We can payout transfer value - mangopay fees
         headers={"Region": "traidoo", "Content-Type": "application/json"},
@@ -425,6 +449,7 @@ def test_pay_in_for_order_confirmation_bankwire_pay_in_to_wallet(
     logistics_invoice,
     producer_invoice,
     platform_invoice,
+    credit_note,
     send_task,
     traidoo_region,
 ):
@@ -471,28 +496,44 @@ def test_pay_in_for_order_confirmation_bankwire_pay_in_to_wallet(
         mock.call(
             "/mangopay/cron/payouts/10",
             http_method="POST",
-            payload={"order_id": order.id, "amount": 178.98},
+            payload={
+                "order_id": order.id,
+                "document_id": producer_invoice.id,
+                "amount": 178.98,
+            },
             queue_name="mangopay-payouts",
             headers={"Region": traidoo_region.slug, "Content-Type": "application/json"},
         ),
         mock.call(
             "/mangopay/cron/payouts/30",
             http_method="POST",
-            payload={"order_id": order.id, "amount": 17.03},
+            payload={
+                "order_id": order.id,
+                "document_id": logistics_invoice.id,
+                "amount": 17.03,
+            },
             queue_name="mangopay-payouts",
             headers={"Region": traidoo_region.slug, "Content-Type": "application/json"},
         ),
         mock.call(
             "/mangopay/cron/payouts/40",
             http_method="POST",
-            payload={"order_id": order.id, "amount": 9.71},
+            payload={
+                "order_id": order.id,
+                "document_id": credit_note.id,
+                "amount": 9.71,
+            },
             queue_name="mangopay-payouts",
             headers={"Region": traidoo_region.slug, "Content-Type": "application/json"},
         ),
         mock.call(
             "/mangopay/cron/payouts/50",
             http_method="POST",
-            payload={"order_id": order.id, "amount": 6.47 - 1.08},
+            payload={
+                "order_id": order.id,
+                "document_id": platform_invoice.id,
+                "amount": 6.47 - 1.08,
+            },
             queue_name="mangopay-payouts",
             headers={"Region": traidoo_region.slug, "Content-Type": "application/json"},
         ),
@@ -1001,3 +1042,29 @@ def test_do_not_try_pay_to_the_same_wallet(
         fees=1.08,
         tag=f"v2 Order: {order.id} Document: Platform Invoice Seller: Traidoo Buyer: Best apples",
     )
+
+
+def test_read_mangopay_once_while_processing_payin(
+    mangopay_bank_alias_payin, api_client, order, mailoutbox
+):
+    client = mangopay_bank_alias_payin.return_value
+
+    with mock.patch.object(MangopayMixin, "mangopay", MANGOPAY), mock.patch(
+        "payments.mixins.get_mangopay_client", return_value=client
+    ):
+        api_client.get(
+            reverse("webhook"),
+            data={"RessourceId": "payin-1", "EventType": "PAYIN_NORMAL_SUCCEEDED"},
+        )
+
+    order.refresh_from_db()
+    assert order.is_paid
+    assert client.transfer.call_count == 4
+    client.get_pay_in.assert_called_once_with("payin-1")
+    client.get_banking_alias.assert_called_once_with("234514543")
+    client.get_wallet.assert_called_once_with("buyer-wallet-1")
+    assert client.get_user_wallets.call_count == 4
+
+    # Balance after the transfers of 178.98, 17.03, 9.71 and 6.47
+    assert mailoutbox[-1].subject == "User has extra cash in wallet"
+    assert "balance 921972 cents" in mailoutbox[-1].body
@@ -0,0 +1,198 @@
+import datetime
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from core.tasks.backends import TaskError
+from core.tasks.mixin import TasksMixin
+from payments.client.exceptions import MangopayError
+from payments.models import WebhookEvent
+
+pytestmark = pytest.mark.django_db
+
+PAYOUT_SUCCEEDED = {"RessourceId": "100", "EventType": "PAYOUT_NORMAL_SUCCEEDED"}
+
+
+@pytest.fixture
+def mangopay_payout(mangopay, platform_user):
+    mangopay.return_value.get_pay_out.return_value = {
+        "Status": "SUCCEEDED",
+        "CreditedFunds": {"Currency": "EUR", "Amount": 1000},
+        "DebitedWalletId": "wallet-1",
+        "AuthorId": platform_user.mangopay_user_id,
+    }
+    mangopay.return_value.get_wallet.return_value = {
+        "Owners": [platform_user.mangopay_user_id]
+    }
+    yield mangopay
+
+
+def test_acknowledge_webhook_before_processing(mangopay, api_client):
+    with mock.patch.object(TasksMixin, "send_task") as send_task:
+        response = api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+
+    assert response.status_code == 200
+    event = WebhookEvent.objects.get()
+    assert event.event_type == "PAYOUT_NORMAL_SUCCEEDED"
+    assert event.resource_id == "100"
+    assert event.status == "pending"
+    send_task.assert_called_once_with(
+        f"/mangopay/tasks/webhook-events/{event.id}",
+        queue_name="mangopay-webhooks",
+        http_method="POST",
+    )
+    mangopay.return_value.get_pay_out.assert_not_called()
+
+
+@pytest.mark.parametrize("data", [{"EventType": "PAYOUT_NORMAL_SUCCEEDED"}, {}])
+def test_webhook_without_event(api_client, data):
+    response = api_client.get(reverse("webhook"), data=data)
+
+    assert response.status_code == 400
+    assert not WebhookEvent.objects.exists()
+
+
+def test_process_webhook_event(mangopay_payout, api_client, mailoutbox):
+    api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+
+    event = WebhookEvent.objects.get()
+    assert event.status == "processed"
+    assert event.attempts == 1
+    assert event.processed_at
+    assert len(mailoutbox) == 1
+
+
+def test_process_redelivered_webhook_once(mangopay_payout, api_client, mailoutbox):
+    for _ in range(3):
+        response = api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+        assert response.status_code == 200
+
+    assert WebhookEvent.objects.get().attempts == 1
+    assert len(mailoutbox) == 1
+
+
+def test_process_webhook_again_with_skip_checks(
+    mangopay_payout, api_client, mailoutbox
+):
+    api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+    api_client.get(reverse("webhook"), data={**PAYOUT_SUCCEEDED, "skip_checks": "true"})
+
+    event = WebhookEvent.objects.get()
+    assert event.skip_checks
+    assert event.attempts == 2
+    assert len(mailoutbox) == 2
+
+
+def test_retry_failed_webhook_event(mangopay_payout, api_client, mailoutbox):
+    get_wallet = mangopay_payout.return_value.get_wallet
+    get_wallet.side_effect = [MangopayError("Timeout"), get_wallet.return_value]
+
+    with pytest.raises(MangopayError):
+        api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+
+    event = WebhookEvent.objects.get()
+    assert event.status == "failed"
+    assert event.last_error == "MangopayError('Timeout')"
+    assert len(mailoutbox) == 0
+
+    api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+
+    event.refresh_from_db()
+    assert event.status == "processed"
+    assert event.attempts == 2
+    assert event.last_error == ""
+    assert len(mailoutbox) == 1
+
+
+def test_do_not_process_event_being_processed(mangopay, client):
+    event = baker.make(
+        WebhookEvent, status="processing", started_at=timezone.now(), attempts=1
+    )
+
+    response = client.post(
+        reverse("mangopay-webhook-event", kwargs={"event_id": event.id}),
+        HTTP_X_APPENGINE_QUEUENAME="mangopay-webhooks",
+    )
+
+    assert response.status_code == 409
+    event.refresh_from_db()
+    assert event.attempts == 1
+
+
+def test_process_stalled_event_again(mangopay_payout, client, settings, mailoutbox):
+    event = baker.make(
+        WebhookEvent,
+        event_type="PAYOUT_NORMAL_SUCCEEDED",
+        resource_id="100",
+        status="processing",
+        attempts=1,
+        started_at=timezone.now()
+        - datetime.timedelta(seconds=settings.MANGOPAY_WEBHOOK_PROCESSING_TIMEOUT + 1),
+    )
+
+    response = client.post(
+        reverse("mangopay-webhook-event", kwargs={"event_id": event.id}),
+        HTTP_X_APPENGINE_QUEUENAME="mangopay-webhooks",
+    )
+
+    assert response.status_code == 200
+    event.refresh_from_db()
+    assert event.status == "processed"
+    assert event.attempts == 2
+    assert len(mailoutbox) == 1
+
+
+def test_process_webhook_event_only_as_task(mangopay, client):
+    event = baker.make(WebhookEvent)
+
+    response = client.post(
+        reverse("mangopay-webhook-event", kwargs={"event_id": event.id})
+    )
+
+    assert response.status_code == 401
+
+
+def test_enqueue_webhook_event_again_after_failed_enqueue(
+    mangopay_payout, api_client, mailoutbox
+):
+    with mock.patch.object(
+        TasksMixin, "send_task", side_effect=TaskError("Queue unavailable")
+    ):
+        with pytest.raises(TaskError):
+            api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+
+    assert WebhookEvent.objects.get().status == "pending"
+
+    api_client.get(reverse("webhook"), data=PAYOUT_SUCCEEDED)
+
+    assert WebhookEvent.objects.get().status == "processed"
+    assert len(mailoutbox) == 1
+
+
+def test_enqueue_pending_webhook_events_again(
+    mangopay_payout, client, settings, mailoutbox
+):
+    stale, recent = baker.make(
+        WebhookEvent,
+        event_type="PAYOUT_NORMAL_SUCCEEDED",
+        resource_id=iter(["100", "101"]),
+        _quantity=2,
+    )
+    WebhookEvent.objects.filter(id=stale.id).update(
+        updated_at=timezone.now()
+        - datetime.timedelta(seconds=settings.MANGOPAY_WEBHOOK_PENDING_TIMEOUT + 1)
+    )
+
+    response = client.get(
+        reverse("mangopay-pending-webhook-events"), HTTP_X_APPENGINE_CRON="true"
+    )
+
+    assert response.status_code == 204
+    stale.refresh_from_db()
+    assert stale.status == "processed"
+    recent.refresh_from_db()
+    assert recent.status == "pending"
+    assert len(mailoutbox) == 1
@@ -1,10 +1,11 @@
 from django.conf.urls import url
 from django.urls import path
 
-from payments.crons.payouts import MangopayPayoutView
+from payments.crons.payouts import MangopayPayoutsView, MangopayPayoutView
+from payments.crons.webhook_events import EnqueuePendingWebhookEventsView
 from payments.tasks.create_banking_alias_iban import CreateBankingAliasIbanView
 from payments.tasks.create_wallet import CreateWalletView
-from payments.views import MangopayWebhookHandler
+from payments.views import MangopayWebhookHandler, ProcessWebhookEventView
 
 tasks = [
     path(
@@ -17,13 +18,24 @@ tasks = [
         CreateBankingAliasIbanView.as_view(),
         name="mangopay-create-banking-alias-iban",
     ),
+    path(
+        r"tasks/webhook-events/<int:event_id>",
+        ProcessWebhookEventView.as_view(),
+        name="mangopay-webhook-event",
+    ),
 ]
 
-urlpatterns = [
+urlpatterns = tasks + [
+    path(
+        "cron/webhook-events",
+        EnqueuePendingWebhookEventsView.as_view(),
+        name="mangopay-pending-webhook-events",
+    ),
     url("webhook", MangopayWebhookHandler.as_view(), name="webhook"),
     url(
         "cron/payouts/(?P<mangopay_user_id>.+)",
         MangopayPayoutView.as_view(),
         name="payouts-user",
     ),
-] + tasks
+    path("cron/payouts", MangopayPayoutsView.as_view(), name="payouts"),
+]
@@ -1,9 +1,10 @@
-import itertools
 from decimal import Decimal
 from typing import Dict, Optional
 
 from django.contrib.auth import get_user_model
 from django.db import transaction, OperationalError
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from loguru import logger
 from rest_framework import views
@@ -14,12 +15,15 @@ from rest_framework.response import Response
 from common.models import Region
 from core.currencies import CURRENT_CURRENCY_CODE
 from core.mixins.storage import StorageMixin
+from core.permissions.task import IsTask
 from core.tasks.mixin import TasksMixin
 from documents.models import Document
 from mails.utils import get_admin_emails, send_mail
 from orders.models import Order
+from payments.client.client import MangopayClient
 from payments.client.exceptions import MangopayError, MangopayTransferError
 from payments.mixins import MangopayMixin
+from payments.models import WebhookEvent
 from Traidoo.errors import PaymentError
 
 User = get_user_model()
@@ -39,33 +43,26 @@ class DuplicateTransferError(Exception):
 
 
 def sufficient_wallet_balance_for_order(order_id, buyer_id, wallet):
-    unpaid_invoices = itertools.chain(
-        Document.objects.filter(
-            paid=False,
+    unpaid_amount_cents = Document.objects.filter(
+        Q(
             document_type__in=[
                 Document.TYPES.get_value("logistics_invoice"),
                 Document.TYPES.get_value("producer_invoice"),
-            ],
-            order_id=order_id,
-        ),
+            ]
+        )
         # todo: remove when there are no more unpaid buyer invoices with this type,
         # we have migrated to "buyer_platform_invoice"
-        Document.objects.filter(
-            paid=False,
-            order_id=order_id,
+        | Q(
             document_type=Document.TYPES.get_value("platform_invoice"),
             buyer__user_id=buyer_id
             # we consider only buyer platform invoices since
             # seller platform invoices are deducted from product invoices
-        ),
-        Document.objects.filter(
-            paid=False,
-            order_id=order_id,
-            document_type=Document.TYPES.get_value("buyer_platform_invoice"),
-        ),
-    )
+        )
+        | Q(document_type=Document.TYPES.get_value("buyer_platform_invoice")),
+        paid=False,
+        order_id=order_id,
+    ).gross_cents()
 
-    unpaid_amount_cents = sum(invoice.price_gross_cents for invoice in unpaid_invoices)
     logger.debug(f"Unpaid amount of order {order_id} is {unpaid_amount_cents}")
     return wallet["Balance"]["Amount"] >= unpaid_amount_cents
 
@@ -88,9 +85,7 @@ def calculate_platform_fee_for_order(order_id: int) -> Decimal:
             Document.TYPES.get_value("buyer_platform_invoice"),
         ],
     )
-    platform_fees_cents = sum(
-        [invoice.price_gross_cents for invoice in platform_invoices]
-    )
+    platform_fees_cents = platform_invoices.gross_cents()
     return Decimal(str(platform_fees_cents)) / 100
 
 
@@ -116,6 +111,7 @@ def pay_for_document(
     amount: float,
     fees: float = 0,
     db="default",
+    mangopay: MangopayClient = None,
 ):
     """
     Atomic transaction to pay for the document an mark document as paid
@@ -125,9 +121,11 @@ def pay_for_document(
     :param destination_wallet_id:
     :param amount:
     :param fees:
+    :param mangopay: client to transfer with, by default the shared one
     :return:
     """
-    mangopay = MangopayMixin()
+    if mangopay is None:
+        mangopay = MangopayMixin().mangopay
     with transaction.atomic(using=db):
         try:
             document = (
@@ -145,7 +143,7 @@ def pay_for_document(
             raise DuplicateTransferError(f"Document {document.id} already paid")
 
         if source_wallet_id != destination_wallet_id and not document.paid:
-            mangopay.mangopay.transfer(
+            mangopay.transfer(
                 author_id,
                 source_wallet_id,
                 destination_wallet_id,
@@ -160,18 +158,19 @@ def pay_for_document(
 @method_decorator(transaction.non_atomic_requests, name="dispatch")
 class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIView):
     permission_classes = (AllowAny,)
+    cache_mangopay_reads = True
 
     @property
     def event_type(self) -> str:
-        return self.request.query_params.get("EventType")
+        return self.event.event_type
 
     @property
     def resource_id(self) -> str:
-        return self.request.query_params.get("RessourceId")
+        return self.event.resource_id
 
     @property
     def skip_checks(self) -> bool:
-        return self.request.query_params.get("skip_checks") == "true"
+        return self.event.skip_checks
 
     @property
     def document(self):
@@ -608,6 +607,7 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
                 source_wallet_id=buyer_mangopay_wallet_id,
                 destination_wallet_id=local_platform_owner_wallet["Id"],
                 amount=credit_note_for_local_platform_owner.price_gross,
+                mangopay=self.mangopay,
             )
         except MangopayTransferError as mangopay_error:
             error_message = (
@@ -631,6 +631,7 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
             http_method="POST",
             payload={
                 "order_id": order_id,
+                "document_id": credit_note_for_local_platform_owner.id,
                 "amount": credit_note_for_local_platform_owner.price_gross,
             },
             headers={
@@ -664,6 +665,9 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
         if not invoice:
             return
 
+        # All platform invoices are paid out at once
+        payout_document_id = invoice.id
+
         local_platform_fee_due = calculate_local_platform_fee_for_order(
             order_id, global_platform_user.id
         )
@@ -745,6 +749,7 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
             http_method="POST",
             payload={
                 "order_id": invoice.order_id,
+                "document_id": payout_document_id,
                 "amount": float(amount_to_payout_from_global_platform_owner_wallet),
             },
             headers={
@@ -802,6 +807,7 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
                 destination_wallet_id=seller_mangopay_wallet["Id"],
                 amount=amount,
                 fees=0,
+                mangopay=self.mangopay,
             )
         except MangopayTransferError as mangopay_error:
             error_message = (
@@ -841,7 +847,11 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
             f"/mangopay/cron/payouts/{seller_profile.mangopay_user_id}",
             queue_name="mangopay-payouts",
             http_method="POST",
-            payload={"order_id": invoice.order_id, "amount": amount},
+            payload={
+                "order_id": invoice.order_id,
+                "document_id": invoice.id,
+                "amount": amount,
+            },
             headers={
                 "Region": invoice.order.region.slug,
                 "Content-Type": "application/json",
@@ -934,7 +944,41 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
         else:
             logger.error("Weird, hook status different than real payout status")
 
+    def enqueue(self, event: WebhookEvent):
+        self.send_task(
+            event.task_url, queue_name=WebhookEvent.QUEUE_NAME, http_method="POST"
+        )
+
     def get(self, request: Request, format: str = None):
+        event_type = request.query_params.get("EventType")
+        resource_id = request.query_params.get("RessourceId")
+        skip_checks = request.query_params.get("skip_checks") == "true"
+
+        if not event_type or not resource_id:
+            return Response("Missing EventType or RessourceId", status=400)
+
+        event, created = WebhookEvent.objects.get_or_create(
+            resource_id=resource_id,
+            event_type=event_type,
+            defaults={"skip_checks": skip_checks},
+        )
+
+        if not created:
+            # Mangopay notifies again if it did not get a response in time,
+            # e.g. because the event could not be enqueued
+            failed = event.status == WebhookEvent.STATUSES.get_value("failed")
+            pending = event.status == WebhookEvent.STATUSES.get_value("pending")
+            event.skip_checks = event.skip_checks or skip_checks
+
+            if not (pending or ((skip_checks or failed) and event.reopen())):
+                logger.info(f"Webhook {event_type} {resource_id} already received")
+                return Response("Webhook received")
+
+        self.enqueue(event)
+
+        return Response("Webhook received")
+
+    def handle_event(self):
         # figure out region from mangopay object
         if self.event_type.startswith("KYC"):
             document = self.document
@@ -951,4 +995,37 @@ class MangopayWebhookHandler(MangopayMixin, StorageMixin, TasksMixin, views.APIV
         if self.event_type == "PAYOUT_NORMAL_FAILED":
             self.handle_failed_payout()
 
-        return Response("Webhook complete")
+
+class ProcessWebhookEventView(MangopayWebhookHandler):
+    """
+    Processes a webhook event stored by `MangopayWebhookHandler`. Errors are
+    stored in the event and raised again, so that the task is retried with
+    the backoff of its queue.
+    """
+
+    permission_classes = (AllowAny, IsTask)
+    http_method_names = ["post"]
+
+    def post(self, request: Request, event_id: int, format: str = None):
+        self.event = get_object_or_404(WebhookEvent, id=event_id)
+
+        if not self.event.claim():
+            if self.event.status == WebhookEvent.STATUSES.get_value("processed"):
+                return Response("Webhook event already processed")
+
+            # Retried later, the other attempt may still fail
+            return Response("Webhook event is being processed", status=409)
+
+        try:
+            self.handle_event()
+        except Exception as error:
+            logger.exception(
+                f"Could not process webhook {self.event_type} {self.resource_id}, "
+                f"attempt {self.event.attempts}"
+            )
+            self.event.set_failed(repr(error))
+            raise
+
+        self.event.set_processed()
+
+        return Response("Webhook event processed")
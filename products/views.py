@@ -1,18 +1,6 @@
-import datetime
 from distutils import util
 
-from django.db.models import (
-    BooleanField,
-    Case,
-    IntegerField,
-    OuterRef,
-    Q,
-    Subquery,
-    Sum,
-    Value,
-    When,
-)
-from django.db.models.functions import Coalesce
+from django.db.models import BooleanField, Case, IntegerField, Q, Value, When
 from rest_framework import viewsets
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny
@@ -20,7 +8,7 @@ from rest_framework.permissions import AllowAny
 from core.permissions.get_permissions import GetPermissionsMixin
 from core.permissions.owner import IsOwnerOrAdmin
 from core.permissions.seller import IsSellerOrAdminUser
-from items.models import Item
+from items.models import available_quantity
 from products.models import Product
 from products.serializers import (
     AnonymousProductSerializer,
@@ -55,18 +43,8 @@ class ProductViewSet(GetPermissionsMixin, viewsets.ModelViewSet):
     ordering_fields = filterset_fields + ("category__id", "created_at")
 
     def get_queryset(self):
-        utcnow = datetime.datetime.utcnow().date()
         params = self.request.query_params
 
-        subquery_items = (
-            Item.objects.filter(product_id=OuterRef("id")).order_by().values("product")
-        )
-        subquery_quantity = subquery_items.annotate(
-            total=Coalesce(
-                Sum("quantity", filter=Q(latest_delivery_date__gt=utcnow)), Value(0)
-            )
-        ).values("total")
-
         queryset = (
             Product.objects.select_related(
                 "category", "seller", "container_type", "category__parent", "region"
@@ -76,7 +54,7 @@ class ProductViewSet(GetPermissionsMixin, viewsets.ModelViewSet):
                 Q(region_id=self.request.region.id)
                 | Q(regions__in=[self.request.region.id])
             )
-            .annotate(items_available=Subquery(subquery_quantity))
+            .annotate(items_available=available_quantity())
             .annotate(
                 is_available=Case(
                     When(items_available__gt=0, then=Value(1)),
@@ -96,12 +74,8 @@ class ProductViewSet(GetPermissionsMixin, viewsets.ModelViewSet):
                 )
 
         if "category__id" in params:
-            # TODO: how many subcategories do we want to support?
             queryset = queryset.filter(
-                Q(category__id=params["category__id"])
-                | Q(category__parent__id=params["category__id"])
-                | Q(category__parent__parent__id=params["category__id"])
-                | Q(category__parent__parent__parent__id=params["category__id"])
+                category__ancestors__ancestor_id=params["category__id"]
             )
 
         # TODO: return error if anonymous and my=
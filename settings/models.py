@@ -1,10 +1,12 @@
 from django.conf import settings
 from django.core import validators
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 from django_better_admin_arrayfield.models.fields import ArrayField
 
-from common.models import Region
+from common.models import Region, clear_region_cache
 from core.db.base import BaseAbstractModel
 
 
@@ -103,3 +105,6 @@ class Setting(BaseAbstractModel):
 
 def get_setting(region_id: int) -> Setting:
     return Setting.objects.filter(region_id=region_id).first()
+
+
+receiver([post_save, post_delete], sender=Setting)(clear_region_cache)